@@ -1,80 +1,166 @@
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit
 import os
-import psutil
-import threading
-import logging
-import time
+import sys
+
+# Startup profile: re-runs this file under -X importtime and times the first request
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    from core.startup_profile import main as profile_startup
+    sys.exit(profile_startup(os.path.abspath(__file__)))
+
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 # Load environment variables
 load_dotenv()
+
+# Server concurrency: 'threading' (an OS thread per client) or 'eventlet' (green threads).
+# Eventlet has to patch the standard library before anything else is imported.
+ASYNC_MODE = os.getenv('JARVIS_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+    # Green threads can't wait on gRPC calls; the SDK's REST transport uses patched sockets
+    os.environ.setdefault('JARVIS_GEMINI_TRANSPORT', 'rest')
+
+from flask import Flask, render_template, request
+from flask_socketio import SocketIO, emit, join_room, leave_room
+import atexit
+import threading
+import logging
+import time
+
 from core.jarvis_engine import JarvisEngine
 from core.speech_service import SpeechService
+from core.log_stream import LogStream, LOGS_ROOM
+from core.Gemini import warm_up as warm_up_model, DEFAULT_GENERATION, SYSTEM_INSTRUCTION
+from core.response_cache import ResponseCache, is_standalone
+from core.semantic_cache import SemanticIndex
+from core.conversation import ConversationStore
+from core.token_ledger import TokenLedger, BudgetExceeded, estimate_tokens
+from core.generation import GenerationManager
+from core.chunk_coalescer import ChunkCoalescer
+from core.timer_wheel import TimerWheel
+from core.executor import BlockingExecutor, ASYNC_MODES
+
+if ASYNC_MODE not in ASYNC_MODES:
+    raise ValueError(f"JARVIS_ASYNC_MODE must be one of {ASYNC_MODES}, not {ASYNC_MODE!r}")
+DEBUG = os.getenv('JARVIS_DEBUG', '0') == '1'
+HOST = os.getenv('JARVIS_HOST', '127.0.0.1')
+PORT = int(os.getenv('JARVIS_PORT', '5000'))
 
 # Initialize Flask and SocketIO
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
-socketio = SocketIO(app, async_mode='threading')
-
-# Logging Setup
-log_buffer = []
-class ListHandler(logging.Handler):
-    def emit(self, record):
-        try:
-            log_entry = self.format(record)
-            log_buffer.append(log_entry)
-            if len(log_buffer) > 500:
-                log_buffer.pop(0)
-            # Emit logs to client if connected
-            socketio.emit('logs_update', {'logs': '\n'.join(log_buffer)})
-        except:
-            pass
+socketio = SocketIO(app, async_mode=ASYNC_MODE)
 
+# Logging Setup: last 500 lines, streamed in batches to clients with the logs panel open
+log_stream = LogStream(socketio, capacity=500, flush_interval=0.25)
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
 logger = logging.getLogger()
-logger.addHandler(ListHandler())
+logger.addHandler(log_stream)
 
 # Initialize Jarvis Engine and Speech Service
 jarvis = JarvisEngine()
 speech_service = None  # Will be initialized after socketio
 
+# AI Mode response cache (repeated questions are replayed instead of regenerated)
+RESPONSE_CACHE_ENABLED = os.getenv('JARVIS_RESPONSE_CACHE', '1') != '0'
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('JARVIS_RESPONSE_CACHE_ENTRIES', '256')),
+    max_bytes=int(float(os.getenv('JARVIS_RESPONSE_CACHE_MB', '4')) * 1024 * 1024),
+    ttl=float(os.getenv('JARVIS_RESPONSE_CACHE_TTL', '3600')),
+    path=os.getenv('JARVIS_RESPONSE_CACHE_FILE') or None,
+    # Near-duplicate tier: reworded prompts reuse the closest cached answer
+    semantic=SemanticIndex(
+        capacity=int(os.getenv('JARVIS_SEMANTIC_CACHE_ENTRIES', '10000')),
+        threshold=float(os.getenv('JARVIS_SEMANTIC_CACHE_THRESHOLD', '0.85')),
+    ) if os.getenv('JARVIS_SEMANTIC_CACHE', '1') != '0' else None,
+)
+atexit.register(response_cache.save)
+
 # State
 current_model = 'gemini-2.0-flash-lite'
-context_history = []
 MAX_CONTEXT_TOKENS = 32000
-total_tokens_used = 0
+conversations = ConversationStore(max_tokens=MAX_CONTEXT_TOKENS)  # per-client AI Mode history
+
+# Token usage per session, model and hour; totals survive restarts
+TOKEN_LEDGER_FILE = os.getenv('JARVIS_TOKEN_LEDGER_FILE', 'data/token_usage.json')
+token_ledger = TokenLedger(
+    # relative paths are relative to this file, not the working directory
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), TOKEN_LEDGER_FILE) if TOKEN_LEDGER_FILE else None,
+    session_budget=int(os.getenv('JARVIS_SESSION_TOKEN_BUDGET', '0')),
+    budget_window=int(os.getenv('JARVIS_TOKEN_BUDGET_WINDOW', '86400')),
+)
+atexit.register(token_ledger.flush)
+generations = GenerationManager()  # streaming replies, cancellable per client
+
+# Streamed replies are sent in merged frames: at most every CHUNK_WINDOW seconds or CHUNK_MAX_BYTES
+CHUNK_WINDOW = int(os.getenv('JARVIS_CHUNK_WINDOW_MS', '40')) / 1000
+CHUNK_MAX_BYTES = int(os.getenv('JARVIS_CHUNK_MAX_BYTES', '512'))
+timers = TimerWheel()  # shared with the speech service
+# Blocking calls (Gemini stream, task commands, speech recognition) share a bounded pool of slots
+# and, under eventlet, CPU-bound speech work (VAD, wake word) runs on a few OS threads
+executor = BlockingExecutor(max_workers=int(os.getenv('JARVIS_BLOCKING_WORKERS', '32')), green=ASYNC_MODE == 'eventlet',
+                            compute_threads=int(os.getenv('JARVIS_COMPUTE_THREADS', '2')))
 
 # Background Thread for System Stats
 thread = None
 thread_lock = threading.Lock()
 
+def system_stats(process, cpu):
+    """The system_stats payload: JARVIS's CPU/RAM share and every component's counters"""
+    ram_bytes = process.memory_info().rss
+    ram_mb = ram_bytes / (1024 * 1024) # MB
+    
+    # Calculate RAM % of system
+    import psutil
+    total_ram = psutil.virtual_memory().total
+    ram_percent = (ram_bytes / total_ram) * 100
+    
+    return {
+        'cpu': cpu, 
+        'ram': round(ram_percent, 1),
+        'ram_mb': round(ram_mb, 1),
+        'tokens': token_ledger.total,
+        'usage': token_ledger.stats(),
+        'generations': generations.stats(),
+        'commands': jarvis.command_stats(),
+        'executor': dict(executor.stats(), mode=ASYNC_MODE),
+        'speech': speech_service.stats() if speech_service else None,
+        'response_cache': response_cache.stats()
+    }
+
 def background_thread():
     """Emit system stats periodically."""
+    import psutil
     process = psutil.Process(os.getpid())
     while True:
         try:
             # JARVIS-specific usage
             cpu = process.cpu_percent(interval=0.1)
-            ram_bytes = process.memory_info().rss
-            ram_mb = ram_bytes / (1024 * 1024) # MB
-            
-            # Calculate RAM % of system
-            total_ram = psutil.virtual_memory().total
-            ram_percent = (ram_bytes / total_ram) * 100
-            
-            socketio.emit('system_stats', {
-                'cpu': cpu, 
-                'ram': round(ram_percent, 1),
-                'ram_mb': round(ram_mb, 1),
-                'tokens': total_tokens_used
-            })
+            socketio.emit('system_stats', system_stats(process, cpu))
+            response_cache.save()
+            token_ledger.flush()
             socketio.sleep(2)
         except Exception as e:
             logger.error(f"Error in background thread: {e}")
             socketio.sleep(5)
 
+def warm_up():
+    """Load what the first requests need (recognizer, ffmpeg, Wikipedia, Gemini SDK) off the request path"""
+    start = time.perf_counter()
+    if speech_service:
+        speech_service.warm_up()
+    if jarvis.wiki.mode != 'offline':
+        import wikipedia  # noqa: F401
+    logger.info(f"Dependencies loaded in {(time.perf_counter() - start) * 1000:.0f}ms")
+    # Imports google.generativeai on first use, then configures the client and connects the model
+    warm_up_model(current_model)
+
+def describe_match(match):
+    """Which command a task query resolved to, and how confidently (1.0 = exact phrase)"""
+    if match is None:
+        return None
+    return {'command': match.command.name, 'phrase': match.phrase, 'score': match.score}
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -82,13 +168,14 @@ def index():
 @socketio.on('user_message')
 def handle_message(data):
     """Handle incoming text messages from the client."""
-    global total_tokens_used
     query = data.get('message')
     mode = data.get('mode', 'ai')
     
     if not query:
         return
 
+    # A new message replaces whatever this client was still waiting for
+    generations.cancel(request.sid, 'superseded')
     start_time = time.time()
     # --- ROUTING LOGIC ---
     is_task_command = False
@@ -112,8 +199,8 @@ def handle_message(data):
             return
         else:
             try:
-                response = jarvis.process_command(query, mode='task', model_name=current_model)
-                emit('bot_response', {'response': response}) 
+                response, match = executor.run(jarvis.execute_task, query)
+                emit('bot_response', {'response': response, 'match': describe_match(match)})
             except Exception as e:
                 logger.error(f"Task Error: {e}")
                 emit('system_message', {'type': 'error', 'message': f"Task failed: {str(e)}"})
@@ -124,8 +211,8 @@ def handle_message(data):
     if is_task_command:
         logger.info(f"Routing '{query}' to Task Execution (AI Mode Override)")
         try:
-            response = jarvis.process_command(query, mode='task', model_name=current_model)
-            emit('bot_response', {'response': f"[Task Executed] {response}"})
+            response, match = executor.run(jarvis.execute_task, query)
+            emit('bot_response', {'response': f"[Task Executed] {response}", 'match': describe_match(match)})
         except Exception as e:
             logger.error(f"Task Error: {e}")
             emit('system_message', {'type': 'error', 'message': f"Task failed: {str(e)}"})
@@ -133,8 +220,14 @@ def handle_message(data):
         return
 
     # AI Conversation
-    user_tokens = len(query) // 4
-    context_history.append({'role': 'user', 'content': query, 'tokens': user_tokens})
+    conversation = conversations.get(request.sid)
+    history = conversation.history()
+    user_tokens = estimate_tokens(query)
+    prompt_estimate = estimate_tokens(SYSTEM_INSTRUCTION) + conversation.tokens + user_tokens
+    usage = {}
+    reserved = 0
+    budget_key = request.remote_addr or request.sid  # budgets outlive reconnects
+    generation = generations.start(request.sid)
     
     try:
         model_start = time.time()
@@ -142,19 +235,60 @@ def handle_message(data):
         # Import streaming function
         from core.Gemini import gemini_chat_stream
         
+        # Repeated questions replay the cached chunks through the same events. Cached
+        # answers saw no earlier turns, so mid-conversation only greetings and
+        # questions about JARVIS itself may use them, and only answers without
+        # history are stored.
+        use_cache = RESPONSE_CACHE_ENABLED and (not history or is_standalone(query))
+        cached, matched = response_cache.lookup(query, current_model, DEFAULT_GENERATION) if use_cache else (None, None)
+        if cached is None:
+            reserved = token_ledger.reserve(budget_key, prompt_estimate)
+            stream = executor.iterate(gemini_chat_stream(query, model_name=current_model, history=history,
+                                                         usage=usage, generation=generation))
+        else:
+            stream = iter(cached)
+        
         # Emit streaming start
         emit('bot_response_start')
         
-        full_response = ""
-        for chunk in gemini_chat_stream(query, model_name=current_model):
-            full_response += chunk
-            emit('bot_response_chunk', {'chunk': chunk})
-            socketio.sleep(0)  # Allow other events to process
+        sid = request.sid
+        frames = ChunkCoalescer(
+            lambda text: generation.cancelled or socketio.emit('bot_response_chunk', {'chunk': text}, to=sid),
+            window=CHUNK_WINDOW, max_bytes=CHUNK_MAX_BYTES, timers=timers)
+        chunks = []
+        try:
+            for chunk in stream:
+                if generation.cancelled:
+                    break
+                chunks.append(chunk)
+                if frames.push(chunk):
+                    socketio.sleep(0)  # Allow other events to process
+        finally:
+            if cached is None:
+                stream.close()  # ends the upstream request if we stopped early
+            if generation.cancelled:
+                frames.discard()
+            else:
+                frames.close()
         
-        response = full_response
+        response = "".join(chunks)
+        cancelled = generation.cancelled
+        failed = cancelled or not chunks or chunks[-1].startswith("Error: ")
+        if cached is not None:
+            logger.info(f"AI response served from cache (matched: {matched!r})")
+        elif use_cache and not failed and not history:
+            response_cache.store(query, current_model, DEFAULT_GENERATION, chunks)
         model_end = time.time()
         model_duration = model_end - model_start
+    except BudgetExceeded as e:
+        generations.finish(generation)
+        logger.warning(f"{request.sid}: {e}")
+        emit('system_message', {'type': 'error', 'message': str(e)})
+        emit('processing_end')
+        return
     except Exception as e:
+        token_ledger.release(budget_key, reserved)
+        generations.finish(generation)
         logger.error(f"Error processing command: {e}")
         response = f"I encountered an error: {str(e)}"
         emit('system_message', {'type': 'error', 'message': str(e)})
@@ -162,11 +296,29 @@ def handle_message(data):
         return
     
     
-    bot_tokens = len(response) // 4
-    context_history.append({'role': 'model', 'content': response, 'tokens': bot_tokens})
-    total_tokens_used += (user_tokens + bot_tokens)
+    # Prefer the usage the API reported; estimate locally otherwise
+    bot_tokens = usage.get('output_tokens', estimate_tokens(response))
+    if cached is None and (usage or chunks):
+        token_ledger.record(request.sid, current_model, usage.get('prompt_tokens', prompt_estimate), bot_tokens,
+                            reported=bool(usage), budget_key=budget_key, reserved=reserved)
+    else:
+        token_ledger.release(budget_key, reserved)
+    saved = generations.finish(generation, bot_tokens if cached is None and (cancelled or not failed) else None)
+    if cancelled:
+        logger.info(f"Generation cancelled ({generation.reason}) after {bot_tokens} tokens, ~{saved} saved")
+        if generation.reason == 'superseded':
+            return  # the client has already moved on to its newer message
+        emit('bot_response_complete', {
+            'cancelled': True,
+            'context_usage': {'current': conversation.tokens, 'max': MAX_CONTEXT_TOKENS},
+            'stats': {'time': f"{(time.time() - start_time) * 1000:.0f}ms", 'tokens': bot_tokens},
+        })
+        emit('processing_end')
+        return
+    if not failed:
+        conversation.add_exchange(query, response, user_tokens, bot_tokens)
     
-    current_context_tokens = sum(msg['tokens'] for msg in context_history)
+    current_context_tokens = conversation.tokens
     
     end_time = time.time()
     total_duration = end_time - start_time
@@ -196,9 +348,24 @@ def handle_message(data):
         
     emit('processing_end')
 
-@socketio.on('get_logs')
-def handle_get_logs():
-    emit('logs_update', {'logs': '\n'.join(log_buffer)})
+@socketio.on('cancel_generation')
+def handle_cancel_generation():
+    """Stop the response currently streaming to this client"""
+    if not generations.cancel(request.sid, 'client'):
+        emit('processing_end')
+
+@socketio.on('logs_subscribe')
+def handle_logs_subscribe(data=None):
+    """Stream logs to this client, starting after the sequence number it last saw in this server run"""
+    data = data or {}
+    after = data.get('after')
+    join_room(LOGS_ROOM)
+    emit('logs_append', log_stream.subscribe(request.sid, after if isinstance(after, int) else None, data.get('run')))
+
+@socketio.on('logs_unsubscribe')
+def handle_logs_unsubscribe():
+    leave_room(LOGS_ROOM)
+    log_stream.unsubscribe(request.sid)
 
 @socketio.on('get_models')
 def handle_get_models():
@@ -217,6 +384,7 @@ def handle_set_model(data):
     global current_model
     current_model = data.get('model')
     logger.info(f"Model switched to: {current_model}")
+    socketio.start_background_task(executor.run, warm_up_model, current_model)
     emit('model_changed', {'model': current_model})
 
 @socketio.on('connect')
@@ -231,6 +399,11 @@ def test_connect():
 @socketio.on('disconnect')
 def test_disconnect():
     logger.info('Client disconnected')
+    generations.cancel(request.sid, 'disconnect')
+    log_stream.unsubscribe(request.sid)
+    conversations.drop(request.sid)
+    token_ledger.drop_session(request.sid)
+    token_ledger.prune_budgets()
     # Clean up speech session
     if speech_service:
         speech_service.destroy_session(request.sid)
@@ -253,7 +426,7 @@ def handle_stop_speech():
 
 @socketio.on('audio_chunk')
 def handle_audio_chunk(data):
-    """Receive and process audio chunk"""
+    """Receive and process audio chunk (binary attachment or base64 string)"""
     audio_data = data.get('audio')
     if audio_data:
         speech_service.process_audio_chunk(request.sid, audio_data)
@@ -279,12 +452,17 @@ def handle_manual_sleep():
 
 if __name__ == '__main__':
     # Initialize speech service after socketio is ready
-    speech_service = SpeechService(socketio)
+    speech_service = SpeechService(socketio, timers=timers, executor=executor)
+    
+    # Heavy imports, the Gemini client and the default model's connection, before the first message
+    socketio.start_background_task(executor.run, warm_up)
     
     print("--------------------------------------------------")
-    print("JARVIS AI System Starting...")
-    print("Access the GUI at: http://127.0.0.1:5000")
+    print(f"JARVIS AI System Starting... ({ASYNC_MODE} mode{', debug' if DEBUG else ''})")
+    print(f"Access the GUI at: http://{HOST}:{PORT}")
     print("Press Ctrl+C to stop.")
     print("--------------------------------------------------")
-    socketio.run(app, debug=True, port=5000)
+    # The threading mode is served by Werkzeug, which Flask-SocketIO only runs outside debug when told to
+    socketio.run(app, host=HOST, port=PORT, debug=DEBUG, use_reloader=DEBUG,
+                 allow_unsafe_werkzeug=ASYNC_MODE == 'threading')
 
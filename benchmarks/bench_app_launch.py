@@ -0,0 +1,98 @@
+"""
+Application index benchmark: scan, incremental refresh, resolve and launch latency.
+
+Fills --dirs synthetic PATH directories with --apps executables in total,
+plus one .desktop launcher for every tenth of them, then times the
+initial scan, a refresh with nothing changed, a refresh after installing
+one application, and name resolution. Finally compares resolve+spawn
+through the non-blocking launcher with a shell call that waits for an
+application running --app-seconds (what ``os.system`` did).
+
+Usage:
+    python benchmarks/bench_app_launch.py [--apps 20000] [--dirs 20] [--launches 50]
+"""
+import os
+import sys
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.app_index import AppIndex, Launcher
+
+
+def make_tree(root, apps, dirs, rng):
+    path_dirs = [os.path.join(root, f'bin{i}') for i in range(dirs)]
+    desktop_dir = os.path.join(root, 'applications')
+    for d in path_dirs + [desktop_dir]:
+        os.makedirs(d)
+    names = []
+    for i in range(apps):
+        name = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10))) + f'-{i}'
+        path = os.path.join(path_dirs[i % dirs], name)
+        with open(path, 'w') as fh:
+            fh.write('#!/bin/sh\nexit 0\n')
+        os.chmod(path, 0o755)
+        names.append(name.replace('-', ' '))
+        if i % 10 == 0:
+            with open(os.path.join(desktop_dir, f'{name}.desktop'), 'w') as fh:
+                fh.write(f"[Desktop Entry]\nType=Application\nName=App {i}\nExec={path} %U\n")
+    return path_dirs, desktop_dir, names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--apps', type=int, default=20000)
+    parser.add_argument('--dirs', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--launches', type=int, default=50)
+    parser.add_argument('--app-seconds', type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = random.Random(22)
+    q = lambda v, p: statistics.quantiles(v, n=100)[p - 1]
+    with tempfile.TemporaryDirectory() as tmp:
+        path_dirs, desktop_dir, names = make_tree(tmp, args.apps, args.dirs, rng)
+        index = AppIndex(path_dirs=path_dirs, desktop_dirs=[desktop_dir])
+        for label, prepare in (('initial scan', None), ('refresh, unchanged', None),
+                               ('refresh, 1 app installed', lambda: open(os.path.join(path_dirs[0], 'new'), 'w').close())):
+            if prepare:
+                time.sleep(0.01)
+                prepare()
+            start = time.perf_counter()
+            rescanned = index.refresh()
+            print(f"{label:26s} {(time.perf_counter() - start) * 1000:8.1f} ms  ({rescanned} directories scanned)")
+        print(f"index: {index.stats()['names']} names")
+
+        queries = [rng.choice(names) for _ in range(args.queries)]
+        ms = []
+        for name in queries:
+            start = time.perf_counter()
+            index.resolve(name)
+            ms.append((time.perf_counter() - start) * 1000)
+        print(f"resolve                    p50 {q(ms, 50):.4f} ms  p99 {q(ms, 99):.4f} ms")
+
+        app = os.path.join(tmp, 'app')
+        with open(app, 'w') as fh:
+            fh.write(f'#!/bin/sh\nsleep {args.app_seconds}\n')
+        os.chmod(app, 0o755)
+        launcher = Launcher()
+        ms = []
+        for name in queries[:args.launches]:
+            start = time.perf_counter()
+            launcher.launch(index.resolve(name).argv, start=start)
+            ms.append((time.perf_counter() - start) * 1000)
+        print(f"resolve+spawn (Popen)      p50 {q(ms, 50):.2f} ms  p99 {q(ms, 99):.2f} ms")
+        start = time.perf_counter()
+        launcher.launch([app], start=start)
+        print(f"{f'spawn, {args.app_seconds}s app':26s} {(time.perf_counter() - start) * 1000:.2f} ms")
+        start = time.perf_counter()
+        os.system(app)
+        print(f"{f'shell call, {args.app_seconds}s app':26s} {(time.perf_counter() - start) * 1000:.0f} ms (waits for the app)")
+
+
+if __name__ == '__main__':
+    main()
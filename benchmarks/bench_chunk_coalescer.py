@@ -0,0 +1,89 @@
+"""
+Response streaming benchmark: one frame per chunk vs. the ChunkCoalescer.
+
+Replays fake model streams (token-sized chunks with random gaps, a
+slower stream with an upstream stall, and a cached reply replayed at
+once) and reports how many bot_response_chunk frames each approach
+sends, the time to the first frame, and the worst delay a piece of text
+spent held back.
+
+Usage:
+    python benchmarks/bench_chunk_coalescer.py [--window-ms 40] [--max-bytes 512]
+"""
+import os
+import sys
+import argparse
+import bisect
+import itertools
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.chunk_coalescer import ChunkCoalescer
+from core.timer_wheel import TimerWheel
+
+
+def fast_stream(rng, tokens=600):
+    """Token-sized chunks 1-6 ms apart"""
+    return [(rng.uniform(0.001, 0.006), rng.choice(['the ', 'answer ', 'is ', 'a ', 'list', ', ', 'of\n', '42 ']))
+            for _ in range(tokens)]
+
+
+def stalled_stream(rng, tokens=200):
+    """Slower chunks with a 400 ms stall in the middle"""
+    chunks = [(rng.uniform(0.005, 0.02), 'word ') for _ in range(tokens)]
+    chunks[tokens // 2] = (0.4, 'word ')
+    return chunks
+
+
+def cached_replay(rng, chunks=120):
+    return [(0.0, 'A cached sentence of a reply. ') for _ in range(chunks)]
+
+
+def run(stream, coalesce, window, max_bytes, timers):
+    sent = []  # (time, text)
+    arrivals = []  # (time, text)
+    send = lambda text: sent.append((time.perf_counter(), text))
+    coalescer = ChunkCoalescer(send, window=window, max_bytes=max_bytes, timers=timers) if coalesce else None
+    start = time.perf_counter()
+    for gap, text in stream:
+        if gap:
+            time.sleep(gap)
+        arrivals.append((time.perf_counter(), text))
+        if coalescer:
+            coalescer.push(text)
+        else:
+            send(text)
+    if coalescer:
+        coalescer.close()
+
+    # Worst hold: time from a chunk's arrival to the frame that carried its last character
+    frame_ends = list(itertools.accumulate(len(text) for _, text in sent))
+    worst, offset = 0.0, 0
+    for arrived, text in arrivals:
+        offset += len(text)
+        worst = max(worst, sent[bisect.bisect_left(frame_ends, offset)][0] - arrived)
+    return len(sent), (sent[0][0] - start) * 1000, worst * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--window-ms', type=float, default=40)
+    parser.add_argument('--max-bytes', type=int, default=512)
+    args = parser.parse_args()
+
+    timers = TimerWheel(tick=0.005)
+    rng = random.Random(5)
+    print(f"window {args.window_ms:.0f} ms, max {args.max_bytes} bytes per frame")
+    for name, stream in (('fast tokens', fast_stream(rng)), ('stalled', stalled_stream(rng)),
+                         ('cached replay', cached_replay(rng))):
+        for label, coalesce in (('per chunk', False), ('coalesced', True)):
+            frames, ttft, worst = run(stream, coalesce, args.window_ms / 1000, args.max_bytes, timers)
+            print(f"{name:13s} {label:9s}  {len(stream):4d} chunks -> {frames:4d} frames   "
+                  f"first frame {ttft:6.2f} ms   worst hold {worst:6.2f} ms")
+    timers.shutdown()
+
+
+if __name__ == '__main__':
+    main()
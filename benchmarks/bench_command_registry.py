@@ -0,0 +1,86 @@
+"""
+Task command matching benchmark: substring chain vs. the CommandRegistry.
+
+Registers thousands of synthetic "open <app>" commands and times a
+match over queries of growing length, for both the old approach (one
+substring test per phrase, in order) and the word-level Aho-Corasick
+automaton. The chain's cost grows with the number of commands; the
+automaton's only with the length of the query.
+
+Usage:
+    python benchmarks/bench_command_registry.py [--commands 1000 10000 100000] [--repeat 200]
+"""
+import os
+import sys
+import argparse
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.command_registry import Command, CommandRegistry
+
+SYLLABLES = ['ka', 'lo', 'mi', 'tor', 'vex', 'an', 'dre', 'su', 'pix', 'ol', 'ze', 'nu', 'ra', 'quo']
+
+
+def app_name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_commands(n, rng):
+    names = set()
+    while len(names) < n:
+        words = ' '.join(app_name(rng) for _ in range(rng.randint(1, 2)))
+        names.add(words)
+    return [Command(name, 'app', [f"open {name}"]) for name in sorted(names)]
+
+
+def make_query(rng, words, target):
+    """``words`` filler words with the target phrase at the end"""
+    filler = [rng.choice(['please', 'could', 'you', 'now', 'the', 'for', 'me', 'quickly']) for _ in range(words)]
+    return ' '.join(filler + [target])
+
+
+def chain_match(phrases, query):
+    for name, phrase in phrases:
+        if phrase in query:
+            return name
+    return None
+
+
+def per_call_us(fn, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--commands', nargs='+', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--lengths', nargs='+', type=int, default=[2, 8, 32, 128], help='filler words per query')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(19)
+    for n in args.commands:
+        commands = make_commands(n, rng)
+        start = time.perf_counter()
+        registry = CommandRegistry(commands)
+        build = time.perf_counter() - start
+        phrases = [(c.name, c.phrases[0]) for c in commands]
+        targets = [rng.choice(commands) for _ in range(20)]
+        print(f"{n} commands: automaton built in {build * 1000:.0f} ms, {registry.stats()['states']} states")
+        for words in args.lengths:
+            queries = [make_query(rng, words, c.phrases[0]) for c in targets]
+            assert all(registry.match(q).command is c for q, c in zip(queries, targets))
+            auto = per_call_us(registry.match, queries, args.repeat)
+            # The chain is too slow to repeat as often at large sizes
+            chain = per_call_us(lambda q: chain_match(phrases, q), queries, max(1, args.repeat * 1000 // n))
+            print(f"  {words + 2:4d}-word query  chain {chain:10.1f} us   registry {auto:7.1f} us "
+                  f"({auto / (words + 2):.2f} us/word)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Decoder benchmark: temp-file WebM -> WAV round trip vs. persistent streaming decoder.
+
+Feeds the same 3-second WebM/Opus window through both paths and reports
+chunks per second and p50/p95 decode latency. Every window must decode
+to the clip's length (within 5%), otherwise the run fails: a fast
+decoder that drops audio is no win.
+
+Usage:
+    python benchmarks/bench_decoder.py [--chunks 50] [--webm path/to/file.webm]
+"""
+import os
+import sys
+import argparse
+import subprocess
+import tempfile
+import time
+import statistics
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+from pydub import AudioSegment
+from core.audio_decoder import StreamingDecoder, BYTES_PER_SECOND, SAMPLE_WIDTH
+from core.speech_service import find_ffmpeg
+
+ffmpeg_path = find_ffmpeg()
+if ffmpeg_path:
+    AudioSegment.converter = ffmpeg_path  # the old path decodes through pydub
+
+
+def make_fixture(seconds=3.0):
+    """Encode a synthetic WebM/Opus window the way MediaRecorder would send it"""
+    result = subprocess.run(
+        [ffmpeg_path or 'ffmpeg', '-hide_banner', '-loglevel', 'error',
+         '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+         '-ac', '1', '-c:a', 'libopus', '-f', 'webm', 'pipe:1'],
+        check=True, stdout=subprocess.PIPE,
+    )
+    return result.stdout
+
+
+def decode_tempfile(webm_bytes):
+    """The previous SpeechService path: two temp files and one ffmpeg spawn per window"""
+    with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as webm_file:
+        webm_file.write(webm_bytes)
+        webm_path = webm_file.name
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
+        wav_path = wav_file.name
+    try:
+        audio = AudioSegment.from_file(webm_path, format="webm")
+        audio = audio.set_channels(1).set_frame_rate(16000)
+        audio.export(wav_path, format="wav")
+        with sr.AudioFile(wav_path) as source:
+            # as s16le, so both paths' PCM lengths compare
+            return sr.Recognizer().record(source).get_raw_data(convert_width=SAMPLE_WIDTH)
+    finally:
+        os.unlink(webm_path)
+        os.unlink(wav_path)
+
+
+def run(label, make_decode, chunks, sessions, webm_bytes, expected):
+    """Decode ``chunks`` windows in each of ``sessions`` concurrent sessions.
+
+    Returns the number of windows whose PCM length is off by more than 5%
+    from ``expected`` bytes.
+    """
+    latencies = []
+    short = []
+    lock = threading.Lock()
+
+    def session_loop():
+        decode, close = make_decode()
+        try:
+            for _ in range(chunks):
+                t0 = time.perf_counter()
+                size = len(decode(webm_bytes))
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+                    if abs(size - expected) > 0.05 * expected:
+                        short.append(size)
+        finally:
+            close()
+
+    threads = [threading.Thread(target=session_loop) for _ in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    print(f"{label:<10} {len(latencies) / elapsed:8.1f} chunks/s   "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+          f"p95 {p95 * 1000:7.1f} ms   "
+          f"{len(short)} windows off length")
+    return len(short)
+
+
+def tempfile_session():
+    return decode_tempfile, lambda: None
+
+
+def streaming_session():
+    decoder = StreamingDecoder(ffmpeg_path)
+
+    def decode(data):
+        decoder.feed(data)
+        # idle=0.01: windows are fed back to back, so settle quickly
+        return decoder.read(idle=0.01)
+
+    return decode, decoder.close
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=50, help='windows per session')
+    parser.add_argument('--sessions', type=int, default=8, help='concurrent sessions')
+    parser.add_argument('--webm', help='WebM file to decode (default: synthetic 3s tone)')
+    args = parser.parse_args()
+
+    if args.webm:
+        with open(args.webm, 'rb') as fh:
+            webm_bytes = fh.read()
+    else:
+        webm_bytes = make_fixture()
+
+    expected = len(decode_tempfile(webm_bytes))
+    print(f"{args.sessions} sessions x {args.chunks} windows of {len(webm_bytes)} WebM bytes, "
+          f"{expected / BYTES_PER_SECOND:.2f}s of PCM each")
+    failures = run('tempfile', tempfile_session, args.chunks, args.sessions, webm_bytes, expected)
+    failures += run('streaming', streaming_session, args.chunks, args.sessions, webm_bytes, expected)
+    if failures:
+        print(f"FAIL: {failures} windows decoded to the wrong length")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
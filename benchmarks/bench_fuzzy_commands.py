@@ -0,0 +1,89 @@
+"""
+Fuzzy command matching benchmark: n-gram candidates + edit-distance re-rank.
+
+Registers thousands of synthetic "open <app>" commands, then looks up
+misheard versions of them (a name split into words, a letter changed or
+dropped, filler words around it). Reports the time for the n-gram
+candidate lookup and for the full match, and how many misheard commands
+resolved to the right one.
+
+Usage:
+    python benchmarks/bench_fuzzy_commands.py [--commands 1000 10000 100000] [--queries 500]
+"""
+import os
+import sys
+import argparse
+import random
+import statistics
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.command_registry import Command
+from core.fuzzy_matcher import FuzzyCommandMatcher, fold
+
+# Consonant-vowel(-coda) syllables: about 1,500 of them, so names differ the way real app names do
+SYLLABLES = [c + v + e for c in 'bdfgklmnprstvwz' for v in ['a', 'e', 'i', 'o', 'u', 'ai', 'ou']
+             for e in ['', 'n', 'r', 'l', 'x', 's', 'm', 'k', 'st', 'nd', 'ng', 'rt', 'sh', 'll']]
+
+
+def make_commands(n, rng):
+    names = set()
+    while len(names) < n:
+        names.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return [Command(name, 'app', [f"open {name}"]) for name in sorted(names)]
+
+
+def mishear(name, rng):
+    """Split the name at a syllable-ish point and corrupt one letter"""
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    op = rng.choice(['sub', 'drop', 'none'])
+    if op == 'sub':
+        chars[i] = rng.choice('aeiou')
+    elif op == 'drop' and len(chars) > 6:
+        del chars[i]
+    text = ''.join(chars)
+    cut = rng.randint(2, len(text) - 2)
+    return f"{rng.choice(['', 'hey jarvis ', 'please '])}open {text[:cut]} {text[cut:]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--commands', nargs='+', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--threshold', type=float, default=0.75)
+    args = parser.parse_args()
+
+    rng = random.Random(20)
+    for n in args.commands:
+        commands = make_commands(n, rng)
+        start = time.perf_counter()
+        matcher = FuzzyCommandMatcher(commands, threshold=args.threshold)
+        build = time.perf_counter() - start
+        targets = [rng.choice(commands) for _ in range(args.queries)]
+        queries = [mishear(c.name, rng) for c in targets]
+
+        cand_ms, match_ms, correct, rejected = [], [], 0, 0
+        for query, target in zip(queries, targets):
+            text = ''.join(fold(w) for w in query.lower().split())
+            t0 = time.perf_counter()
+            matcher.candidates(text)
+            t1 = time.perf_counter()
+            match = matcher.match(query)
+            t2 = time.perf_counter()
+            cand_ms.append((t1 - t0) * 1000)
+            match_ms.append((t2 - t1) * 1000)
+            if match is None:
+                rejected += 1
+            elif match.command is target:
+                correct += 1
+        q = lambda v, p: statistics.quantiles(v, n=100)[p - 1]
+        print(f"{n} commands (index built in {build * 1000:.0f} ms)")
+        print(f"  candidates  p50 {q(cand_ms, 50):.3f} ms  p99 {q(cand_ms, 99):.3f} ms")
+        print(f"  full match  p50 {q(match_ms, 50):.3f} ms  p99 {q(match_ms, 99):.3f} ms")
+        print(f"  {correct}/{len(queries)} misheard commands resolved correctly, {rejected} below threshold")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Gemini client benchmark: per-request setup vs. the shared ModelRegistry.
+
+Runs against a fake local backend (a keep-alive HTTP server on
+127.0.0.1 plus a stand-in for the ``google.generativeai`` module whose
+``configure()`` drops its connections, as the SDK's does), so only the
+client-side overhead is measured:
+- before: configure + new GenerativeModel + config dicts on every request
+- after:  ModelRegistry.get() reusing the configured model and connection
+
+Also times the real SDK's configure + GenerativeModel construction
+(no network involved).
+
+Usage:
+    python benchmarks/bench_gemini_client.py [--requests 300]
+"""
+import os
+import sys
+import argparse
+import json
+import statistics
+import threading
+import time
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import Gemini
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({'text': 'Certainly. Here is a short reply.'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenAI:
+    """Minimal stand-in for ``google.generativeai`` talking to the local server"""
+
+    def __init__(self, port):
+        self.port = port
+        self.connections_opened = 0
+        self._connection = None
+
+    def configure(self, api_key=None):
+        # Like the SDK: reconfiguring throws away the cached client and its connection
+        if self._connection:
+            self._connection.close()
+        self._connection = None
+
+    def _post(self, payload):
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection('127.0.0.1', self.port)
+            self.connections_opened += 1
+        body = json.dumps(payload).encode()
+        self._connection.request('POST', '/generate', body, {'Content-Type': 'application/json'})
+        return json.loads(self._connection.getresponse().read())
+
+    def GenerativeModel(self, model_name, generation_config=None, safety_settings=None):
+        backend = self
+
+        class Model:
+            def generate_content(self, contents, generation_config=None, safety_settings=None, stream=False):
+                return _Response(backend._post({'model': model_name, 'contents': contents})['text'])
+
+            def count_tokens(self, text):
+                return backend._post({'model': model_name, 'count': text})
+
+        return Model()
+
+
+def per_request_setup(genai, prompt):
+    """The pre-registry request path"""
+    genai.configure(api_key='fake-key')
+    model = genai.GenerativeModel(model_name='gemini-2.0-flash-lite')
+    return model.generate_content(
+        [Gemini.build_prompt(prompt)],
+        generation_config=dict(Gemini.DEFAULT_GENERATION, response_mime_type="text/plain"),
+        safety_settings=dict(Gemini.SAFETY_SETTINGS),
+    ).text
+
+
+def timed(fn, count):
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        fn(f"question {i}")
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.mean(samples), samples[int(0.95 * (count - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    before = FakeGenAI(port)
+    mean_b, p95_b = timed(lambda p: per_request_setup(before, p), args.requests)
+
+    after = FakeGenAI(port)
+    registry = Gemini.ModelRegistry(backend=after, key_loader=lambda: 'fake-key')
+    registry.warm_up('gemini-2.0-flash-lite')
+    mean_a, p95_a = timed(lambda p: registry.get('gemini-2.0-flash-lite').generate_content([Gemini.build_prompt(p)]).text,
+                          args.requests)
+
+    print(f"{args.requests} requests against a local fake backend")
+    print(f"per-request setup  mean {mean_b * 1000:6.3f} ms   p95 {p95_b * 1000:6.3f} ms   connections {before.connections_opened}")
+    print(f"model registry     mean {mean_a * 1000:6.3f} ms   p95 {p95_a * 1000:6.3f} ms   connections {after.connections_opened}")
+    print(f"overhead removed per request: {(mean_b - mean_a) * 1000:.3f} ms")
+
+    # Object construction in the real SDK (local CPU only, no requests are sent)
+    import google.generativeai as genai
+    count = 200
+    start = time.perf_counter()
+    for _ in range(count):
+        genai.configure(api_key='fake-key')
+        genai.GenerativeModel(model_name='gemini-2.0-flash-lite',
+                              generation_config=dict(Gemini.DEFAULT_GENERATION, response_mime_type="text/plain"),
+                              safety_settings=Gemini.SAFETY_SETTINGS)
+    sdk = (time.perf_counter() - start) / count
+    start = time.perf_counter()
+    registry = Gemini.ModelRegistry(key_loader=lambda: 'fake-key')
+    for _ in range(count):
+        registry.get('gemini-2.0-flash-lite')
+    cached = (time.perf_counter() - start) / count
+    print(f"real SDK configure + GenerativeModel: {sdk * 1000:.3f} ms   registry lookup: {cached * 1000:.4f} ms")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
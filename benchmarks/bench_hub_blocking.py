@@ -0,0 +1,99 @@
+"""
+Hub blocking benchmark: how long CPU-bound speech work stalls the eventlet hub.
+
+Runs under eventlet (monkey-patched) with a ticker green thread that
+wakes every --tick-ms and records how late it woke. Meanwhile --sessions
+green threads each run VAD over 3-second PCM windows and a wake word
+check (MFCC + DTW) per window, first called directly in the green
+thread, then through ``BlockingExecutor.compute`` (eventlet's OS thread
+pool). The ticker's worst lateness is the longest time every other
+client on the server would have waited.
+
+Usage:
+    python benchmarks/bench_hub_blocking.py [--sessions 4] [--windows 25] [--tick-ms 5] [--compute-threads 2]
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio_decoder import SAMPLE_RATE
+from core.executor import BlockingExecutor
+from core.vad import VoiceActivityDetector
+from core.wake_word import WakeWordSpotter
+
+
+def make_window(rng, seconds=3.0):
+    """Noise with a 1-second tone burst in the middle, as s16le PCM"""
+    n = int(seconds * SAMPLE_RATE)
+    samples = rng.normal(0, 200, n)
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    start = n // 2 - SAMPLE_RATE // 2
+    samples[start:start + SAMPLE_RATE] += 6000 * np.sin(2 * np.pi * 220 * t) * np.sin(np.pi * t)
+    return np.clip(samples, -32768, 32767).astype('<i2').tobytes()
+
+
+def run(executor, windows, template, sessions, count, tick):
+    spotter = WakeWordSpotter(threshold=4.0, compute=executor.compute)
+    spotter.enroll(template)
+    assert spotter.ready
+    lateness = []
+    done = [0]
+
+    def ticker():
+        while done[0] < sessions:
+            start = time.perf_counter()
+            eventlet.sleep(tick)
+            lateness.append(time.perf_counter() - start - tick)
+
+    def session():
+        vad = VoiceActivityDetector()
+        for i in range(count):
+            pcm = windows[i % len(windows)]
+            executor.compute(vad.process, pcm)
+            spotter.detect(pcm)
+            eventlet.sleep(0)
+        done[0] += 1
+
+    start = time.perf_counter()
+    pool = eventlet.GreenPool()
+    pool.spawn(ticker)
+    for _ in range(sessions):
+        pool.spawn(session)
+    pool.waitall()
+    elapsed = time.perf_counter() - start
+    lateness.sort()
+    p99 = lateness[min(len(lateness) - 1, int(0.99 * len(lateness)))]
+    return elapsed, p99, lateness[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=4, help='concurrent sessions')
+    parser.add_argument('--windows', type=int, default=25, help='3-second windows per session')
+    parser.add_argument('--tick-ms', type=float, default=5, help='ticker interval')
+    parser.add_argument('--compute-threads', type=int, default=2, help='OS threads for compute (JARVIS_COMPUTE_THREADS)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    windows = [make_window(rng) for _ in range(4)]
+    template = windows[0][2 * SAMPLE_RATE:4 * SAMPLE_RATE]  # the burst (s16le: 2 bytes per sample)
+
+    print(f"{args.sessions} sessions x {args.windows} windows of 3s (VAD + wake word check), "
+          f"ticker every {args.tick_ms:.0f} ms")
+    for label, green in (('in hub', False), ('tpool', True)):
+        executor = BlockingExecutor(green=green, compute_threads=args.compute_threads)
+        elapsed, p99, worst = run(executor, windows, template, args.sessions, args.windows, args.tick_ms / 1000)
+        print(f"{label:<8} {elapsed:6.2f} s total   hub stalled p99 {p99 * 1000:7.1f} ms   "
+              f"worst {worst * 1000:7.1f} ms   avg compute {executor.stats()['avg_compute_ms']:6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
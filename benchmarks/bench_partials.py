@@ -0,0 +1,129 @@
+"""
+Voice input latency benchmark: fixed windows vs. VAD vs. incremental partials.
+
+Streams a synthetic utterance into a SpeechService in real time (250 ms
+fragments, PCM fed straight to the VAD stage) with the stub recognizer
+standing in for a cloud round trip, and reports how long after speech
+starts the user first sees text, and how long after it ends the final
+transcript arrives.
+
+Usage:
+    python benchmarks/bench_partials.py [--speech 4] [--asr-ms 400]
+"""
+import os
+import sys
+import argparse
+import time
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio_decoder import AudioBuffer, SAMPLE_RATE
+
+FRAGMENT = 0.25
+LEAD_IN = 0.5
+TAIL = 2.0
+
+MODES = {
+    'fixed 3s': {'JARVIS_VAD': '0', 'JARVIS_SPEECH_PARTIALS': '0'},
+    'vad': {'JARVIS_VAD': '1', 'JARVIS_SPEECH_PARTIALS': '0'},
+    'vad + partials': {'JARVIS_VAD': '1', 'JARVIS_SPEECH_PARTIALS': '1'},
+}
+
+
+class PcmFeed:
+    """Stands in for StreamingDecoder: chunks are already PCM"""
+
+    def __init__(self):
+        self._pcm = AudioBuffer()
+        self._lock = threading.Lock()
+
+    def feed(self, data):
+        with self._lock:
+            self._pcm.write(data)
+
+    def pending(self):
+        return bool(len(self._pcm))
+
+    def buffered(self):
+        return len(self._pcm)
+
+    def read(self, idle=0.05, timeout=1.0):
+        with self._lock:
+            return self._pcm.take()
+
+    def close(self):
+        pass
+
+
+class Recorder:
+    """Minimal socketio stand-in that timestamps emitted events"""
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data=None, room=None):
+        self.events.append((time.monotonic(), event, data))
+
+
+def synth(seconds, rng):
+    audio = rng.normal(0, 60, int((LEAD_IN + seconds + TAIL) * SAMPLE_RATE))
+    start = int(LEAD_IN * SAMPLE_RATE)
+    n = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = sum(np.sin(2 * np.pi * 140 * k * n) / k for k in range(1, 6))
+    audio[start:start + len(n)] += 4000 * voiced * (0.6 + 0.4 * np.cos(2 * np.pi * 4 * n))
+    return np.clip(audio, -32768, 32767).astype('<i2').tobytes()
+
+
+def run(mode, pcm, speech_seconds, asr_ms):
+    os.environ.update(MODES[mode])
+    os.environ.update({'JARVIS_ASR_BACKEND': 'stub', 'JARVIS_ASR_STUB_LATENCY_MS': str(asr_ms),
+                       'JARVIS_ASR_STUB_TRANSCRIPTS': 'turn on the lights in the kitchen please'})
+    from core.speech_service import SpeechService
+
+    recorder = Recorder()
+    service = SpeechService(recorder)
+    service.create_session('bench')
+    service.start_listening('bench', 'ai')
+    service.sessions['bench'].decoder = PcmFeed()
+
+    step = int(FRAGMENT * SAMPLE_RATE) * 2
+    began = time.monotonic()
+    for n, offset in enumerate(range(0, len(pcm), step)):
+        service.process_audio_chunk('bench', pcm[offset:offset + step])
+        time.sleep(max(0.0, began + (n + 1) * FRAGMENT - time.monotonic()))
+    service.stop_listening('bench')
+    deadline = time.monotonic() + 3 * asr_ms / 1000 + 1
+    while time.monotonic() < deadline and not any(e == 'speech_final' for _, e, _ in recorder.events):
+        time.sleep(0.01)
+    time.sleep(asr_ms / 1000)
+    service.scheduler.shutdown()
+
+    onset, speech_end = began + LEAD_IN, began + LEAD_IN + speech_seconds
+    shown = [t for t, event, data in recorder.events if event in ('speech_interim', 'speech_final') and data and data.get('text')]
+    finals = [t for t, event, data in recorder.events if event == 'speech_final' and data and data.get('text')]
+    interims = sum(1 for _, event, _ in recorder.events if event == 'speech_interim')
+    first = shown[0] - onset if shown else float('nan')
+    final = finals[-1] - speech_end if finals else float('nan')
+    return first, final, interims, len(finals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--speech', type=float, default=4.0, help="utterance length in seconds")
+    parser.add_argument('--asr-ms', type=int, default=400, help="simulated recognizer latency")
+    args = parser.parse_args()
+
+    pcm = synth(args.speech, np.random.default_rng(3))
+    print(f"{args.speech:.1f}s utterance, recognizer latency {args.asr_ms} ms")
+    for mode in MODES:
+        first, final, interims, finals = run(mode, pcm, args.speech, args.asr_ms)
+        print(f"{mode:15s} first text after speech onset {first * 1000:6.0f} ms   "
+              f"final after speech end {final * 1000:6.0f} ms   "
+              f"{interims:2d} interim / {finals} final updates")
+
+
+if __name__ == '__main__':
+    main()
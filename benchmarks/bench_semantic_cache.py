@@ -0,0 +1,117 @@
+"""
+Semantic cache lookup benchmark: brute-force cosine vs. the pruned SemanticIndex.
+
+Fills a SemanticIndex with synthetic voice-style prompts (templates over a
+Zipf-distributed vocabulary), then times lookups of reworded copies of
+indexed prompts (hits) and of unseen prompts (misses). The brute-force
+column scores every row of the same matrices, which is what a lookup
+would cost without the inverted index.
+
+Usage:
+    python benchmarks/bench_semantic_cache.py [--entries 100000] [--queries 2000]
+"""
+import os
+import sys
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.semantic_cache import SemanticIndex, canonicalize
+
+TEMPLATES = [
+    "what is the {0} of {1}",
+    "who made the {0}",
+    "how do i {0} my {1}",
+    "tell me about {0} and {1}",
+    "what's the {0} like in {1}",
+    "can you explain {0} {1} to me",
+    "why is the {0} so {1}",
+    "give me a {0} for {1} {2}",
+]
+FILLERS = ["please", "jarvis", "now", "quickly", "again"]
+
+
+def vocabulary(rng, size=20000):
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    words = {''.join(rng.choice(letters, rng.integers(3, 10))) for _ in range(size * 2)}
+    words = sorted(words)[:size]
+    weights = 1.0 / np.arange(1, len(words) + 1)
+    return words, weights / weights.sum()
+
+
+def prompts(rng, words, weights, count):
+    """``count`` distinct prompts"""
+    unique = {}
+    while len(unique) < count:
+        picks = rng.choice(len(words), size=(count, 3), p=weights)
+        templates = rng.integers(0, len(TEMPLATES), count)
+        for t, row in zip(templates, picks):
+            unique.setdefault(TEMPLATES[t].format(*(words[i] for i in row)), None)
+    return list(unique)[:count]
+
+
+def reword(rng, prompt):
+    """ASR-style variation: an extra filler word or a dropped article"""
+    if ' the ' in prompt and rng.random() < 0.5:
+        return prompt.replace(' the ', ' ', 1)
+    return f"{prompt} {FILLERS[rng.integers(len(FILLERS))]}"
+
+
+def brute_force(index, text):
+    indices, weights = index.vectorizer.transform(canonicalize(text))
+    query = np.zeros(index.vectorizer.buckets, np.float32)
+    query[indices] = weights
+    n = len(index)
+    scores = (query[index._feat[:n]] * index._wts[:n]).sum(axis=1)
+    return int(np.argmax(scores))
+
+
+def timed(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(0.95 * (len(samples) - 1))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--threshold', type=float, default=0.85)
+    parser.add_argument('--bits', type=int, default=128)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    words, weights = vocabulary(rng)
+    corpus = prompts(rng, words, weights, args.entries)
+    index = SemanticIndex(capacity=args.entries, threshold=args.threshold, bits=args.bits)
+    start = time.perf_counter()
+    for text in corpus:
+        index.add(text)
+    build = time.perf_counter() - start
+
+    indexed = [corpus[i] for i in rng.integers(0, args.entries, args.queries)]
+    hits = [reword(rng, text) for text in indexed]
+    misses = prompts(np.random.default_rng(99), words, weights, args.queries)
+
+    found = sum(1 for q, original in zip(hits, indexed) if (index.lookup(q) or ('',))[0] == original)
+    print(f"{len(index)} prompts indexed in {build:.1f}s, threshold {args.threshold}")
+    print(f"reworded prompts matched to their original: {found}/{args.queries}")
+    for label, queries in (('hits', hits), ('misses', misses)):
+        index.lookups = index.candidates = 0
+        p50, p95 = timed(index.lookup, queries)
+        avg = index.candidates / max(index.lookups, 1)
+        print(f"{label:6s} SemanticIndex  p50 {p50:6.3f} ms   p95 {p95:6.3f} ms   {avg:7.0f} rows scored")
+    p50, p95 = timed(lambda q: brute_force(index, q), hits[:200])
+    print(f"brute force   p50 {p50:6.3f} ms   p95 {p95:6.3f} ms   {len(index):7d} rows scored")
+
+
+if __name__ == '__main__':
+    main()
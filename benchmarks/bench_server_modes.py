@@ -0,0 +1,157 @@
+"""
+Server concurrency benchmark: how many streaming chat clients each
+JARVIS_ASYNC_MODE sustains at a fixed p99.
+
+Starts the real app (Jarvis.py) in a subprocess per mode with the Gemini
+registry pointed at core.fake_gemini (time to first token, then one
+token per interval, waiting the way the SDK's REST transport waits on
+its socket). Socket.IO clients are ramped through the given levels;
+each sends messages back to back and times user_message ->
+bot_response_complete. A level is sustained when no reply is lost and
+the p99 stays under --p99-ms. Every stream holds an executor slot, so
+--workers is set above the largest level.
+
+The clients run on the same machine, so the ceiling reported is a
+lower bound on small hosts.
+
+Usage:
+    python benchmarks/bench_server_modes.py [--modes threading eventlet]
+        [--levels 10 25 50 100 200] [--messages 5] [--p99-ms 3000] [--workers 512]
+"""
+import os
+import sys
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def serve(args):
+    """Run the app with the fake backend (subprocess side)"""
+    os.environ.update({'JARVIS_RESPONSE_CACHE': '0', 'JARVIS_TOKEN_LEDGER_FILE': '', 'JARVIS_DEBUG': '0'})
+    import logging
+    import Jarvis  # applies JARVIS_ASYNC_MODE (and eventlet's monkey patching) first
+    from core import Gemini
+    from core.fake_gemini import FakeGenAI
+    backend = FakeGenAI(ttft=args.ttft_ms / 1000, tokens_per_second=1000 / args.token_ms if args.token_ms else 0,
+                        tokens=args.tokens, chunk_tokens=1)
+    Gemini.registry = Gemini.ModelRegistry(backend=backend, key_loader=lambda: 'fake')
+    logging.getLogger().setLevel(logging.WARNING)
+    Jarvis.socketio.run(Jarvis.app, host='127.0.0.1', port=args.port, log_output=False,
+                        allow_unsafe_werkzeug=True)
+
+
+def run_level(url, clients, messages, timeout):
+    """``clients`` concurrent clients, ``messages`` each; returns (latencies, lost)"""
+    import threading
+    import time
+    import socketio
+
+    latencies, lost = [], [0]
+    lock = threading.Lock()
+    ready = threading.Barrier(clients + 1)
+
+    def client(n):
+        done = threading.Event()
+        sio = socketio.Client(reconnection=False)
+        sio.on('bot_response_complete', lambda data: done.set())
+        try:
+            sio.connect(url, transports=['websocket'], wait_timeout=timeout)
+        except Exception:
+            with lock:
+                lost[0] += messages
+            ready.wait()
+            return
+        ready.wait()
+        for i in range(messages):
+            done.clear()
+            start = time.perf_counter()
+            sio.emit('user_message', {'message': f"client {n} question {i}", 'mode': 'ai'})
+            ok = done.wait(timeout)
+            with lock:
+                if ok:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    lost[0] += 1
+        sio.disconnect()
+
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(clients)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    for t in threads:
+        t.join(timeout * (messages + 1))
+    return latencies, lost[0]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))] if values else float('inf')
+
+
+def bench_mode(mode, args):
+    import subprocess
+    import time
+    import urllib.request
+
+    env = dict(os.environ, JARVIS_ASYNC_MODE=mode, JARVIS_BLOCKING_WORKERS=str(args.workers),
+               PYTHONWARNINGS='ignore')
+    cmd = [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(args.port),
+           '--ttft-ms', str(args.ttft_ms), '--token-ms', str(args.token_ms), '--tokens', str(args.tokens)]
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(300):
+            try:
+                urllib.request.urlopen(url + '/socket.io/?EIO=4&transport=polling', timeout=1).read()
+                break
+            except Exception:
+                time.sleep(0.1)
+        else:
+            print(f"{mode}: server did not start")
+            return None
+
+        ceiling = 0
+        for level in args.levels:
+            latencies, lost = run_level(url, level, args.messages, args.p99_ms / 1000 * 4)
+            p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+            sustained = not lost and p99 <= args.p99_ms
+            print(f"{mode:9s} {level:4d} clients  p50 {p50:7.0f} ms  p99 {p99:7.0f} ms  "
+                  f"lost {lost:4d}  {'ok' if sustained else 'over'}")
+            if not sustained:
+                break
+            ceiling = level
+        return ceiling
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['threading', 'eventlet'])
+    parser.add_argument('--levels', nargs='+', type=int, default=[10, 25, 50, 100, 200])
+    parser.add_argument('--messages', type=int, default=5, help='messages per client per level')
+    parser.add_argument('--p99-ms', type=float, default=3000)
+    parser.add_argument('--ttft-ms', type=float, default=300)
+    parser.add_argument('--token-ms', type=float, default=25)
+    parser.add_argument('--tokens', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=512, help='JARVIS_BLOCKING_WORKERS for the server')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    base = args.ttft_ms + args.token_ms * (args.tokens - 1)
+    print(f"fake reply: {args.tokens} tokens, ~{base:.0f} ms unloaded; target p99 {args.p99_ms:.0f} ms")
+    ceilings = {mode: bench_mode(mode, args) for mode in args.modes}
+    for mode, ceiling in ceilings.items():
+        print(f"{mode}: sustains {ceiling} concurrent streaming clients" if ceiling is not None else
+              f"{mode}: failed to start")
+
+
+if __name__ == '__main__':
+    main()
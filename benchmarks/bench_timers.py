@@ -0,0 +1,82 @@
+"""
+Timer benchmark: one threading.Timer per timeout vs. the shared TimerWheel.
+
+Simulates Task Mode traffic: every session resets its silence (3s) and
+no-input (5s) timeouts on each recognized phrase, plus a 250 ms audio
+processing timer. Reports peak thread count, cost per reset and firing
+accuracy.
+
+Usage:
+    python benchmarks/bench_timers.py [--sessions 1000] [--phrases 5]
+"""
+import os
+import sys
+import argparse
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.timer_wheel import TimerWheel
+
+SCALE = 0.1  # shrink the 3s / 5s / 250ms timeouts so a run takes seconds
+
+
+def run(sessions, phrases, start_timer):
+    lateness = []
+    lock = threading.Lock()
+    peak = threading.active_count()
+
+    def fire(due):
+        late = time.monotonic() - due
+        with lock:
+            lateness.append(late)
+
+    timers = {}
+    began = time.perf_counter()
+    resets = 0
+    for _ in range(phrases):
+        for sid in range(sessions):
+            for name, delay in (('silence', 3.0), ('no_input', 5.0), ('process', 0.25)):
+                old = timers.get((sid, name))
+                if old:
+                    old.cancel()
+                delay *= SCALE
+                timers[(sid, name)] = start_timer(delay, fire, time.monotonic() + delay)
+                resets += 1
+            peak = max(peak, threading.active_count())
+    cost = (time.perf_counter() - began) / resets
+
+    deadline = time.monotonic() + 5.0 * SCALE + 2.0
+    while time.monotonic() < deadline and len(lateness) < sessions * 3:
+        peak = max(peak, threading.active_count())
+        time.sleep(0.01)
+    return peak, cost, sorted(lateness)
+
+
+def thread_timer(delay, callback, *args):
+    timer = threading.Timer(delay, callback, args)
+    timer.start()
+    return timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--phrases', type=int, default=5)
+    args = parser.parse_args()
+
+    wheel = TimerWheel()
+    print(f"{args.sessions} sessions x {args.phrases} phrases, 3 timers each")
+    print(f"threads before: {threading.active_count()}")
+    # Wheel first, so leftover Timer threads don't count against it
+    for name, start_timer in (('TimerWheel', wheel.schedule), ('threading.Timer', thread_timer)):
+        peak, cost, lateness = run(args.sessions, args.phrases, start_timer)
+        p99 = lateness[int(0.99 * (len(lateness) - 1))] if lateness else float('nan')
+        print(f"{name:16s} peak threads {peak:5d}   {cost * 1e6:7.1f} us per reset   "
+              f"fired {len(lateness):5d}   lateness p99 {p99 * 1000:6.1f} ms   max {lateness[-1] * 1000:6.1f} ms")
+    wheel.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+VAD benchmark: fixed 3-second windows vs. VAD utterance segmentation.
+
+Synthesizes a session of voiced bursts separated by pauses over low
+background noise, streams it in 250 ms fragments and reports:
+- recognizer calls made (and the share removed by the VAD)
+- end-of-speech -> window-submitted latency (recognizer time excluded)
+- VAD CPU cost per second of audio
+
+Usage:
+    python benchmarks/bench_vad.py [--seconds 120] [--seed 7]
+"""
+import os
+import sys
+import argparse
+import math
+import time
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio_decoder import SAMPLE_RATE
+from core.vad import VoiceActivityDetector
+
+FIXED_WINDOW = 3.0
+FRAGMENT = 0.25
+
+
+def synth_session(seconds, rng):
+    """Return (int16 samples, list of (speech_start, speech_end) in seconds)"""
+    audio = rng.normal(0, 60, int(seconds * SAMPLE_RATE))  # ~-55 dBFS room noise
+    segments = []
+    t = rng.uniform(0.5, 2.0)
+    while t < seconds - 4:
+        length = rng.uniform(0.8, 3.5)
+        start, end = int(t * SAMPLE_RATE), int((t + length) * SAMPLE_RATE)
+        n = np.arange(end - start) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * n) / k for k in range(1, 6))
+        syllables = 0.5 * (1 - np.cos(2 * np.pi * 4 * n))  # ~4 syllables per second
+        audio[start:end] += 4000 * voiced * syllables
+        segments.append((t, t + length))
+        t += length + rng.uniform(0.7, 5.0)
+    return np.clip(audio, -32768, 32767).astype('<i2'), segments
+
+
+def fixed_windows(seconds, segments):
+    calls = math.ceil(seconds / FIXED_WINDOW)
+    latencies = [math.ceil(end / FIXED_WINDOW) * FIXED_WINDOW - end for _, end in segments]
+    return calls, latencies
+
+
+def vad_windows(samples, segments):
+    vad = VoiceActivityDetector()
+    step = int(FRAGMENT * SAMPLE_RATE)
+    pcm = samples.tobytes()
+    completed_at = []
+    cpu = 0.0
+    for offset in range(0, len(samples), step):
+        chunk = pcm[offset * 2:(offset + step) * 2]
+        t0 = time.perf_counter()
+        utterances = vad.process(chunk)
+        cpu += time.perf_counter() - t0
+        now = (offset + step) / SAMPLE_RATE
+        for utterance in utterances:
+            completed_at.append(now)
+            utterance.release()
+    # Match each spoken segment to the first utterance completed after it ended
+    latencies = []
+    for _, end in segments:
+        later = [t for t in completed_at if t >= end]
+        if later:
+            latencies.append(later[0] - end)
+    return len(completed_at), latencies, cpu
+
+
+def describe(values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(0.95 * len(values)))]
+    return f"mean {statistics.mean(values) * 1000:6.0f} ms   p95 {p95 * 1000:6.0f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    samples, segments = synth_session(args.seconds, np.random.default_rng(args.seed))
+    speech = sum(end - start for start, end in segments)
+    print(f"{args.seconds:.0f}s session, {len(segments)} utterances, {speech / args.seconds:.0%} speech")
+
+    fixed_calls, fixed_latency = fixed_windows(args.seconds, segments)
+    vad_calls, vad_latency, cpu = vad_windows(samples, segments)
+
+    print(f"fixed 3s   {fixed_calls:5d} recognizer calls   end-of-speech -> submit {describe(fixed_latency)}")
+    print(f"vad        {vad_calls:5d} recognizer calls   end-of-speech -> submit {describe(vad_latency)}")
+    print(f"recognizer calls removed: {1 - vad_calls / fixed_calls:.0%}")
+    print(f"VAD cost: {cpu / args.seconds * 1000:.2f} ms CPU per second of audio")
+
+
+if __name__ == '__main__':
+    main()
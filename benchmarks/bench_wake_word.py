@@ -0,0 +1,105 @@
+"""
+Wake word benchmark: local MFCC/DTW spotter cost and detection quality.
+
+Synthesizes a formant-sequence "wake phrase" and a set of other phrases,
+enrolls a few wake-phrase takes as templates and reports:
+- detection / false-alarm rates on varied (pitch, tempo, noise) takes
+- detection latency (spotter time per utterance)
+- CPU cost per idle Task Mode session, assuming one utterance every N seconds
+
+Usage:
+    python benchmarks/bench_wake_word.py [--trials 40] [--utterance-interval 6]
+"""
+import os
+import sys
+import argparse
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio_decoder import SAMPLE_RATE
+from core.wake_word import WakeWordSpotter
+
+# (F1, F2, duration s, voiced) per segment
+WAKE = [(600, 1900, 0.22, True), (700, 1200, 0.20, True), (0, 0, 0.06, False),
+        (300, 2200, 0.16, True), (0, 0, 0.12, False)]
+OTHERS = [
+    [(300, 900, 0.2, True), (650, 1100, 0.25, True), (450, 1800, 0.2, True)],
+    [(700, 1100, 0.3, True), (0, 0, 0.1, False), (350, 2300, 0.25, True)],
+    [(500, 1500, 0.5, True), (300, 800, 0.2, True)],
+    [(0, 0, 0.1, False), (600, 1000, 0.2, True), (400, 2000, 0.2, True), (650, 1700, 0.25, True)],
+]
+
+
+def synth(segments, rng, pitch=140.0, tempo=1.0, noise=80.0):
+    out = []
+    for f1, f2, duration, voiced in segments:
+        n = np.arange(int(duration / tempo * SAMPLE_RATE)) / SAMPLE_RATE
+        if voiced:
+            wave_ = sum(np.sin(2 * np.pi * pitch * k * n) / k
+                        * (np.exp(-((pitch * k - f1) / 150) ** 2) + 0.7 * np.exp(-((pitch * k - f2) / 200) ** 2))
+                        for k in range(1, int(4000 / pitch)))
+            out.append(6000 * wave_ * np.hanning(len(n)) ** 0.3)
+        else:
+            hiss = rng.normal(0, 1, len(n))
+            hiss = np.diff(hiss, prepend=0)  # high-passed, like /s/
+            out.append(1500 * hiss)
+    pad = np.zeros(int(0.3 * SAMPLE_RATE))
+    audio = np.concatenate([pad] + out + [pad])
+    audio += rng.normal(0, noise, len(audio))
+    return np.clip(audio, -32768, 32767).astype('<i2').tobytes()
+
+
+def variant(segments, rng):
+    return synth(segments, rng, pitch=rng.uniform(120, 170), tempo=rng.uniform(0.85, 1.15),
+                 noise=rng.uniform(40, 200))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trials', type=int, default=40)
+    parser.add_argument('--templates', type=int, default=3)
+    parser.add_argument('--utterance-interval', type=float, default=6.0,
+                        help='seconds between utterances reaching an idle session')
+    args = parser.parse_args()
+    rng = np.random.default_rng(3)
+
+    spotter = WakeWordSpotter()
+    for _ in range(args.templates):
+        spotter.enroll(variant(WAKE, rng))
+    print(f"{args.templates} templates, threshold {spotter.threshold:.2f}")
+
+    hits, misses, false_alarms, latencies = 0, 0, 0, []
+    wake_scores, other_scores = [], []
+    for i in range(args.trials):
+        wake = variant(WAKE, rng)
+        other = variant(OTHERS[i % len(OTHERS)], rng)
+        # Wake phrase followed by a command, as people usually say it
+        with_command = wake + variant(OTHERS[(i + 1) % len(OTHERS)], rng)
+
+        for pcm, is_wake in ((wake, True), (with_command, True), (other, False)):
+            t0 = time.perf_counter()
+            found = spotter.detect(pcm)
+            latencies.append(time.perf_counter() - t0)
+            (wake_scores if is_wake else other_scores).append(spotter.score(pcm))
+            if is_wake:
+                hits += found
+                misses += not found
+            else:
+                false_alarms += found
+
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    cpu_per_check = spotter.stats()['avg_cpu_ms']
+    print(f"wake distance   median {np.median(wake_scores):.2f}   other distance median {np.median(other_scores):.2f}")
+    print(f"detection rate  {hits / (hits + misses):.0%}   false alarms {false_alarms / args.trials:.0%}")
+    print(f"detection latency  mean {np.mean(latencies) * 1000:.1f} ms   p95 {p95 * 1000:.1f} ms "
+          f"(vs. a full cloud recognition round trip per utterance)")
+    print(f"idle session CPU: {cpu_per_check / args.utterance_interval:.2f} ms per second "
+          f"({cpu_per_check:.1f} ms per utterance, one every {args.utterance_interval:g}s)")
+
+
+if __name__ == '__main__':
+    main()
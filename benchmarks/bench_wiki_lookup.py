@@ -0,0 +1,108 @@
+"""
+Wikipedia lookup benchmark: uncached online vs. cache vs. offline FTS5 index.
+
+Writes a synthetic abstracts dump (--articles entries), builds the offline
+index from it, and times exact-title, title-word and abstract lookups. A fake
+online source with --online-ms latency shows the repeated-lookup cost
+with and without the cache, and how long a caller waits for a stalled
+upstream (deadline --timeout).
+
+Usage:
+    python benchmarks/bench_wiki_lookup.py [--articles 200000] [--queries 2000]
+"""
+import os
+import sys
+import argparse
+import gzip
+import random
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.wiki_lookup import WikiLookup, WikiTimeout, OfflineWikiIndex, build_index
+
+_rng = random.Random(0)
+VOCAB = sorted({''.join(_rng.choice('abcdefghiklmnoprstuvwy') for _ in range(_rng.randint(4, 9)))
+                for _ in range(20000)})
+
+
+def write_dump(path, articles, rng):
+    titles = []
+    with gzip.open(path, 'wt', encoding='utf-8') as fh:
+        fh.write('<feed>\n')
+        for i in range(articles):
+            title = ' '.join(rng.choice(VOCAB) for _ in range(rng.randint(1, 3))).title() + f' {i}'
+            words = ' '.join(rng.choice(VOCAB) for _ in range(40))
+            fh.write(f"<doc><title>Wikipedia: {title}</title><url>u</url>"
+                     f"<abstract>{title} is {words}. It was {words}.</abstract></doc>\n")
+            titles.append(title)
+        fh.write('</feed>\n')
+    return titles
+
+
+def timed(fn, queries):
+    ms = []
+    for q in queries:
+        start = time.perf_counter()
+        try:
+            fn(q)
+        except (LookupError, WikiTimeout):
+            pass
+        ms.append((time.perf_counter() - start) * 1000)
+    return statistics.median(ms), statistics.quantiles(ms, n=100)[98]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--online-ms', type=float, default=300)
+    parser.add_argument('--timeout', type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(21)
+    with tempfile.TemporaryDirectory() as tmp:
+        dump, path = os.path.join(tmp, 'abstract.xml.gz'), os.path.join(tmp, 'wiki.db')
+        titles = write_dump(dump, args.articles, rng)
+        start = time.perf_counter()
+        build_index(dump, path)
+        print(f"offline index: {args.articles} articles built in {time.perf_counter() - start:.1f}s, "
+              f"{os.path.getsize(path) / 2 ** 20:.0f} MB")
+
+        index = OfflineWikiIndex(path)
+        exact = [rng.choice(titles) for _ in range(args.queries)]
+        partial = [' '.join(t.split()[:-1]) for t in exact]
+        fulltext = [' '.join(rng.sample(VOCAB, 2)) for _ in exact]
+        for label, queries in (('exact title', exact), ('title words', partial), ('abstract', fulltext)):
+            p50, p99 = timed(index.search, queries)
+            print(f"  offline {label:11s}  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms")
+
+        def fetch(query, sentences):
+            time.sleep(args.online_ms / 1000)
+            return 'summary'
+        # 50 popular topics asked for repeatedly
+        popular = [rng.choice(titles) for _ in range(50)]
+        repeated = [rng.choice(popular) for _ in range(200)]
+        uncached = WikiLookup(fetch=fetch, max_entries=0, timeout=5)  # every lookup goes online
+        cached = WikiLookup(fetch=fetch, timeout=5)
+        for label, wiki in (('uncached', uncached), ('cached', cached)):
+            start = time.perf_counter()
+            for q in repeated:
+                wiki.lookup(q)
+            print(f"  online {label:9s} 200 lookups of 50 topics: {time.perf_counter() - start:5.2f}s")
+
+        stalled = WikiLookup(fetch=lambda q, s: time.sleep(30), timeout=args.timeout, workers=2)
+        start = time.perf_counter()
+        try:
+            stalled.lookup('stalled')
+        except WikiTimeout:
+            pass
+        print(f"  stalled upstream: caller released after {time.perf_counter() - start:.2f}s "
+              f"(deadline {args.timeout}s)")
+        os._exit(0)  # don't wait for the stalled fetch
+
+
+if __name__ == '__main__':
+    main()
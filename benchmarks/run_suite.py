@@ -0,0 +1,272 @@
+"""
+Offline benchmark suite for the hot paths, checked against stored baselines.
+
+Needs no network or API key: Gemini is replaced by a local fake and
+speech recognition by the stub backend. Paths measured (time per
+operation in the fastest of at least --repeat rounds, which is the
+least disturbed by other load on the machine):
+
+    routing       JarvisEngine.process_command: task commands and AI Mode routing
+    routing_fuzzy the same for task queries no command matches (fuzzy fallback)
+    speech_*      a listening session over each WebM fixture in benchmarks/fixtures
+                  (ffmpeg decode, VAD, window cut in _process_accumulated_audio)
+    message       handle_message end to end with a streaming fake Gemini
+    logs          one log line through the LogStream handler, batches flushed to a subscriber
+    system_stats  building and emitting one system_stats payload
+
+Results are compared with benchmarks/baselines.json; the run fails (exit
+status 1) when a path is more than --threshold slower than its baseline.
+Baselines depend on the machine: refresh them with --save after a
+deliberate change or on new hardware.
+
+Usage:
+    python benchmarks/run_suite.py [--only routing logs] [--repeat 7] [--threshold 0.3] [--save]
+"""
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINES = os.path.join(ROOT, 'benchmarks', 'baselines.json')
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+
+# Offline, side-effect free app configuration; set before Jarvis.py is imported
+OFFLINE_ENV = {
+    'JARVIS_ASYNC_MODE': 'threading',
+    'JARVIS_RESPONSE_CACHE': '0',  # every message streams from the fake backend
+    'JARVIS_TOKEN_LEDGER_FILE': '',
+    'JARVIS_ASR_BACKEND': 'stub',
+    'JARVIS_ASR_STUB_LATENCY_MS': '0',
+    'JARVIS_WIKI_MODE': 'online',
+}
+
+
+class _Recorder:
+    """Socket.IO stand-in that keeps emitted events"""
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data=None, room=None, **kwargs):
+        self.events.append(event)
+
+    def start_background_task(self, target, *args):
+        pass
+
+
+def _offline_env():
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+def _app():
+    """Jarvis.py with offline settings and the fake Gemini backend (imported once)"""
+    _offline_env()
+    import logging
+    import Jarvis
+    from core import Gemini
+    from core.fake_gemini import FakeGenAI
+    # Instant replies, one token per chunk: only the app's own cost is measured
+    backend = FakeGenAI(ttft=0, tokens_per_second=0, tokens=50, chunk_tokens=1)
+    Gemini.registry = Gemini.ModelRegistry(backend=backend, key_loader=lambda: 'offline')
+    # Request logging is measured by the logs path; here it would only flood the terminal
+    logging.getLogger().setLevel(logging.WARNING)
+    return Jarvis
+
+
+# Rounds continue past --repeat until each path has run this long, so short paths get many chances at a quiet moment
+MIN_SECONDS = 1.0
+
+
+def measure(op, count, repeat):
+    """Seconds per call of ``op(i)`` in the fastest round of ``count`` calls (at least ``repeat`` rounds)"""
+    best = None
+    rounds = 0
+    deadline = time.perf_counter() + MIN_SECONDS
+    while rounds < repeat or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        for i in range(count):
+            op(i)
+        elapsed = (time.perf_counter() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+        rounds += 1
+    return best
+
+
+def bench_routing(repeat):
+    Jarvis = _app()
+    engine = Jarvis.jarvis
+    engine.apps.ready.wait(10)  # the application index is built in the background; don't compete with it
+    matched = [('what time is it', 'task'), ('date', 'task'), ('use gemini', 'task'),
+               ('please tell me the date', 'task'), ('explain photosynthesis briefly', 'ai')]
+    unmatched = [('sing me a song about rivers', 'task'), ('whats the whether like', 'task')]
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):  # task responses are printed
+        for name, queries, count in (('routing', matched, 1000), ('routing_fuzzy', unmatched, 200)):
+            seconds = measure(lambda i: engine.process_command(*queries[i % len(queries)]), count, repeat)
+            results[name] = {'per_op_us': seconds * 1e6, 'op': f"process_command over {len(queries)} queries"}
+    results['routing']['op'] += ' (task commands and one AI Mode prompt)'
+    results['routing_fuzzy']['op'] += ' that only the fuzzy fallback rejects'
+    return results
+
+
+def _speech_session(service, sid, data, chunk):
+    service.start_listening(sid, 'ai')
+    for offset in range(0, len(data), chunk):
+        service.process_audio_chunk(sid, data[offset:offset + chunk])
+    service._process_accumulated_audio(sid, wait=True)
+    service.destroy_session(sid)
+
+
+def bench_speech(repeat):
+    _offline_env()
+    from core.speech_service import SpeechService, find_ffmpeg
+    if not find_ffmpeg():
+        return None
+    results = {}
+    service = SpeechService(_Recorder())
+    for name in sorted(os.listdir(FIXTURES)):
+        if not name.endswith('.webm'):
+            continue
+        with open(os.path.join(FIXTURES, name), 'rb') as fh:
+            data = fh.read()
+        chunk = max(1, len(data) // 12)  # MediaRecorder sends a chunk every 250 ms of a 3 s clip
+        seconds = measure(lambda i: _speech_session(service, f'bench-{i}', data, chunk), 10, repeat)
+        results['speech_' + name[:-len('.webm')]] = {'per_op_us': seconds * 1e6, 'op': f'listening session over {name}'}
+    service.scheduler.shutdown()
+    service.timers.shutdown()
+    return results
+
+
+def bench_message(repeat):
+    Jarvis = _app()
+    client = Jarvis.socketio.test_client(Jarvis.app)
+    client.get_received()
+
+    def message(i):
+        client.emit('user_message', {'message': f'question number {i}', 'mode': 'ai'})
+        received = client.get_received()
+        assert any(event['name'] == 'bot_response_complete' for event in received), received
+
+    seconds = measure(message, 200, repeat)
+    client.disconnect()
+    return {'message': {'per_op_us': seconds * 1e6, 'op': 'user_message -> bot_response_complete (50 streamed tokens)'}}
+
+
+def bench_logs(repeat):
+    import logging
+    from core.log_stream import LogStream
+    stream = LogStream(_Recorder())
+    stream.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s'))
+    stream.subscribe('bench')
+    logger = logging.getLogger('bench.logs')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(stream)
+
+    def line(i):
+        logger.info("Received message: %s [Mode: %s]", f"question {i}", 'ai')
+        if i % 100 == 99:
+            stream.flush()
+
+    seconds = measure(line, 20000, repeat)
+    return {'logs': {'per_op_us': seconds * 1e6, 'op': 'log line (flushed every 100 lines)'}}
+
+
+def bench_system_stats(repeat):
+    import psutil
+    Jarvis = _app()
+    client = Jarvis.socketio.test_client(Jarvis.app)
+    process = psutil.Process(os.getpid())
+
+    def emit(i):
+        Jarvis.socketio.emit('system_stats', Jarvis.system_stats(process, 0.0))
+        client.get_received()
+
+    seconds = measure(emit, 1000, repeat)
+    client.disconnect()
+    return {'system_stats': {'per_op_us': seconds * 1e6, 'op': 'system_stats payload built and emitted to one client'}}
+
+
+# Each returns {result name: {'per_op_us': ..., 'op': description}}, or None when it can't run here
+BENCHMARKS = {
+    'routing': bench_routing,
+    'speech': bench_speech,
+    'message': bench_message,
+    'logs': bench_logs,
+    'system_stats': bench_system_stats,
+}
+
+
+def compare(results, baselines, threshold):
+    """``(name, baseline_us, current_us, change)`` for every result slower than its baseline by more than ``threshold``"""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        change = result['per_op_us'] / baseline['per_op_us'] - 1
+        if change > threshold:
+            regressions.append((name, baseline['per_op_us'], result['per_op_us'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--threshold', type=float, default=0.3, help='allowed slowdown (0.3 = 30%%)')
+    parser.add_argument('--baselines', default=BASELINES)
+    parser.add_argument('--save', action='store_true', help='store these results as the new baselines')
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        result = BENCHMARKS[name](args.repeat)
+        if result is None:
+            print(f"{name:28s} skipped (ffmpeg not found)")
+            continue
+        results.update(result)
+
+    stored = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, 'r', encoding='utf-8') as fh:
+            stored = json.load(fh)
+    baselines = stored.get('results', {})
+    print(f"{'path':28s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, result in results.items():
+        base = baselines.get(name)
+        if base:
+            change = result['per_op_us'] / base['per_op_us'] - 1
+            print(f"{name:28s} {base['per_op_us']:10.1f}us {result['per_op_us']:10.1f}us {change:+8.1%}")
+        else:
+            print(f"{name:28s} {'-':>12s} {result['per_op_us']:10.1f}us")
+
+    if args.save:
+        stored = {
+            'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+            'results': dict(baselines, **{name: dict(result, per_op_us=round(result['per_op_us'], 2))
+                                          for name, result in results.items()}),
+        }
+        with open(args.baselines, 'w', encoding='utf-8') as fh:
+            json.dump(stored, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+        print(f"Baselines saved to {args.baselines}")
+        return 0
+
+    regressions = compare(results, baselines, args.threshold)
+    for name, base, current, change in regressions:
+        print(f"REGRESSION {name}: {base:.1f}us -> {current:.1f}us ({change:+.0%}, threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
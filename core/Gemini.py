@@ -1,13 +1,142 @@
 import os
 import logging
+import threading
 import time
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from .functions import load_api_key
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
 
+SYSTEM_INSTRUCTION = (
+    "You are JARVIS, an AI assistant. "
+    "Be concise and short in your replies. "
+    "Only provide long, detailed explanations if the user explicitly asks for 'detailed mode' or 'detailed()'. "
+)
+
+# Names instead of the SDK's enums, which the SDK converts, so importing this module doesn't load it
+SAFETY_SETTINGS = {
+    'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
+    'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
+    'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
+    'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
+}
+
+DEFAULT_GENERATION = {
+    "temperature": 1.0,
+    "top_p": 0.95,
+    "top_k": 64,
+    "max_output_tokens": 4096,
+}
+
+
+class ModelRegistry:
+    """Configured Gemini model objects, reused across requests.
+
+    ``genai.configure()`` throws away the SDK's cached API clients (and
+    with them their open connections), so it is only called again when
+    the API key changes. Models are cached per model name and generation
+    parameters with the generation config and safety settings built in,
+    so each request only builds its prompt.
+
+    ``backend`` is the module providing ``configure`` and
+    ``GenerativeModel`` (``google.generativeai``, imported on first use
+    as it takes most of a second, unless a fake is passed in, e.g. for
+    benchmarks). ``transport`` is passed to ``configure``
+    when set (``'rest'`` for the eventlet server, whose green threads
+    can't wait on gRPC calls).
+    """
+
+    def __init__(self, backend=None, key_loader=load_api_key, transport=None):
+        self.backend = backend
+        self.key_loader = key_loader
+        self.transport = transport
+        self._models = {}
+        self._api_key = None
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def _configure(self):
+        if self.backend is None:
+            import google.generativeai
+            self.backend = google.generativeai
+        api_key = self.key_loader()
+        if api_key != self._api_key:
+            if self.transport:
+                self.backend.configure(api_key=api_key, transport=self.transport)
+            else:
+                self.backend.configure(api_key=api_key)
+            self._api_key = api_key
+            self._models.clear()  # bound to the old client
+
+    def get(self, model_name, **generation):
+        """Return the shared model for ``model_name`` with ``generation`` overrides"""
+        config = dict(DEFAULT_GENERATION, **generation)
+        key = (model_name,) + tuple(sorted(config.items()))
+        with self._lock:
+            self._configure()
+            model = self._models.get(key)
+            if model is not None:
+                self.hits += 1
+                return model
+            self.misses += 1
+            model = self.backend.GenerativeModel(
+                model_name=model_name,
+                generation_config=dict(config, response_mime_type="text/plain"),
+                safety_settings=SAFETY_SETTINGS,
+            )
+            self._models[key] = model
+            return model
+
+    def warm_up(self, model_name, **generation):
+        """Build the model and open its connection ahead of the first request"""
+        start = time.time()
+        try:
+            model = self.get(model_name, **generation)
+            model.count_tokens("ping")  # cheap round trip that sets up the transport
+            logging.info(f"Warmed up {model_name} in {(time.time() - start) * 1000:.0f}ms")
+            return True
+        except Exception as e:
+            logging.warning(f"Warm-up of {model_name} failed: {e}")
+            return False
+
+    def stats(self):
+        return {'models': len(self._models), 'hits': self.hits, 'misses': self.misses}
+
+
+def _create_registry():
+    """Shared registry; JARVIS_GEMINI_BACKEND=fake answers locally (load tests, no API traffic)"""
+    transport = os.getenv('JARVIS_GEMINI_TRANSPORT') or None
+    if os.getenv('JARVIS_GEMINI_BACKEND', 'google') == 'fake':
+        from .fake_gemini import FakeGenAI
+        logging.warning("Gemini backend is the local fake: replies are generated, not requested")
+        return ModelRegistry(backend=FakeGenAI.from_env(), key_loader=lambda: 'fake', transport=transport)
+    return ModelRegistry(transport=transport)
+
+
+registry = _create_registry()
+
+
+def warm_up(model_name: str) -> bool:
+    """Pre-build and connect ``model_name`` in the shared registry"""
+    return registry.warm_up(model_name)
+
+
+def build_prompt(inp: str) -> str:
+    return f"{SYSTEM_INSTRUCTION}\n\nUser: {inp}"
+
+
+def build_contents(inp: str, history=None) -> list:
+    """Multi-turn request: earlier ``(role, text)`` turns, then the new prompt"""
+    if not history:
+        return [build_prompt(inp)]
+    contents = [{'role': role, 'parts': [text]} for role, text in history]
+    contents.append({'role': 'user', 'parts': [build_prompt(inp)]})
+    return contents
+
+
 def takeInputGemini(
     inp: str,
     model_name: str = 'gemini-2.0-flash-lite',
@@ -26,37 +155,17 @@ def takeInputGemini(
     Returns:
         Cleaned response text or an error message.
     """
-    api_key = load_api_key()
-
     attempts = 0
     while attempts < 3:
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(model_name=model_name)
-            
-            system_instruction = (
-                "You are JARVIS, an AI assistant. "
-                "Be concise and short in your replies. "
-                "Only provide long, detailed explanations if the user explicitly asks for 'detailed mode' or 'detailed()'. "
-            )
-            full_prompt = f"{system_instruction}\n\nUser: {inp}"
-
-            response = model.generate_content(
-                [full_prompt],
-                generation_config={
-                    "temperature": temperature,
-                    "top_p": top_p,
-                    "top_k": top_k,
-                    "max_output_tokens": max_output_tokens,
-                    "response_mime_type": "text/plain",
-                },
-                safety_settings={
-                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                },
+            model = registry.get(
+                model_name,
+                temperature=temperature,
+                top_p=top_p,
+                top_k=top_k,
+                max_output_tokens=max_output_tokens,
             )
+            response = model.generate_content([build_prompt(inp)])
             formatted = format_response(str(response.text))
             return formatted
         except Exception as e:
@@ -78,54 +187,63 @@ def gemini_chat(prompt: str, **kwargs) -> str:
     """
     return takeInputGemini(prompt, **kwargs)
 
-def gemini_chat_stream(prompt: str, model_name: str = 'gemini-2.0-flash-lite'):
+def close_stream(response) -> None:
+    """Stop a streaming response: cancels the underlying gRPC call or closes the HTTP stream"""
+    iterator = getattr(response, '_iterator', None)
+    for name in ('cancel', 'close'):
+        method = getattr(iterator, name, None)
+        if callable(method):
+            method()
+            return
+
+def gemini_chat_stream(prompt: str, model_name: str = 'gemini-2.0-flash-lite', history=None, usage=None,
+                       generation=None):
     """Stream responses from Gemini API.
     
     Args:
         prompt: User prompt string.
         model_name: Gemini model identifier.
+        history: Earlier ``(role, text)`` turns of the conversation, oldest first.
+        usage: Optional dict; filled with ``prompt_tokens``/``output_tokens``
+            when the API reports usage for the request.
+        generation: Optional ``core.generation.Generation``; cancelling it
+            stops the upstream stream.
+
+    Closing the generator early (or cancelling ``generation``) ends the
+    upstream request instead of letting it run to completion.
         
     Yields:
         Text chunks as they are generated.
     """
-    api_key = load_api_key()
-    
+    response = None
+    finished = False
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(model_name=model_name)
-        
-        system_instruction = (
-            "You are JARVIS, an AI assistant. "
-            "Be concise and short in your replies. "
-            "Only provide long, detailed explanations if the user explicitly asks for 'detailed mode' or 'detailed()'. "
-        )
-        full_prompt = f"{system_instruction}\n\nUser: {prompt}"
-
-        response = model.generate_content(
-            [full_prompt],
-            generation_config={
-                "temperature": 1.0,
-                "top_p": 0.95,
-                "top_k": 64,
-                "max_output_tokens": 4096,
-                "response_mime_type": "text/plain",
-            },
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            },
-            stream=True,  # Enable streaming
-        )
+        model = registry.get(model_name)
+        response = model.generate_content(build_contents(prompt, history), stream=True)
+        if generation is not None:
+            generation.attach(lambda: close_stream(response))
         
         for chunk in response:
             if chunk.text:
                 yield chunk.text
+        finished = True
+        
+        metadata = getattr(response, 'usage_metadata', None)
+        if usage is not None and metadata and metadata.total_token_count:
+            usage['prompt_tokens'] = metadata.prompt_token_count
+            usage['output_tokens'] = metadata.candidates_token_count
                 
     except Exception as e:
+        if generation is not None and generation.cancelled:
+            return  # the stream was closed under us
         logging.error(f"Gemini streaming error: {e}")
         yield f"Error: {str(e)}"
+    finally:
+        if response is not None and not finished:
+            try:
+                close_stream(response)
+            except Exception:
+                pass
 
 def fn(hello: str) -> str:
     """Simple test function kept for backward compatibility."""
@@ -0,0 +1,282 @@
+"""
+Application Index for JARVIS
+Maps spoken application names to executables (PATH, XDG .desktop files,
+configured directories) and launches them without blocking
+"""
+import os
+import sys
+import time
+import shlex
+import logging
+import threading
+import subprocess
+
+from .command_registry import tokenize
+
+logger = logging.getLogger(__name__)
+
+_FIELD_CODES = {'%f', '%F', '%u', '%U', '%d', '%D', '%n', '%N', '%i', '%c', '%k', '%v', '%m'}
+_WINDOWS_APPS = ('.exe', '.lnk', '.bat', '.cmd')
+
+
+def app_key(name):
+    """Lookup key for a spoken or installed name: lowercase words, no punctuation"""
+    return ' '.join(tokenize(name))
+
+
+class AppEntry:
+    """An installed application: display name, argv to start it, and where it was found"""
+
+    __slots__ = ('name', 'argv', 'source')
+
+    def __init__(self, name, argv, source):
+        self.name = name
+        self.argv = argv
+        self.source = source
+
+    def __repr__(self):
+        return f"AppEntry({self.name!r}, {self.argv!r}, {self.source!r})"
+
+
+def parse_desktop_file(path):
+    """``AppEntry`` for an XDG ``.desktop`` launcher, or None if it isn't a visible application"""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as fh:
+            for line in fh:
+                line = line.strip()
+                if line.startswith('['):
+                    in_entry = line == '[Desktop Entry]'
+                elif in_entry and '=' in line:
+                    key, value = line.split('=', 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if (fields.get('Type', 'Application') != 'Application' or fields.get('NoDisplay') == 'true'
+            or fields.get('Hidden') == 'true' or not fields.get('Name') or not fields.get('Exec')):
+        return None
+    try:
+        argv = [arg for arg in shlex.split(fields['Exec']) if arg not in _FIELD_CODES]
+    except ValueError:
+        return None
+    return AppEntry(fields['Name'], argv, path) if argv else None
+
+
+def xdg_application_dirs():
+    data_home = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    data_dirs = os.getenv('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    return [os.path.join(d, 'applications') for d in [data_home] + data_dirs.split(':') if d]
+
+
+class AppIndex:
+    """In-memory map of spoken name -> ``AppEntry``.
+
+    Built on a background thread (``start``) and refreshed every
+    ``refresh_interval`` seconds. A refresh only rescans directories
+    whose modification time changed since the last scan. When names
+    collide, ``.desktop`` entries win over configured directories, which
+    win over PATH.
+    """
+
+    def __init__(self, dirs=(), path_dirs=None, desktop_dirs=None, refresh_interval=300):
+        self.dirs = list(dirs)
+        self.path_dirs = path_dirs if path_dirs is not None else os.getenv('PATH', '').split(os.pathsep)
+        self.desktop_dirs = desktop_dirs if desktop_dirs is not None else xdg_application_dirs()
+        self.refresh_interval = refresh_interval
+        self.ready = threading.Event()
+        self._scanned = {}  # directory -> (mtime_ns, {key: AppEntry})
+        self._names = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Stats
+        self.scans = 0
+        self.dirs_rescanned = 0
+        self.last_scan_ms = 0.0
+        self.resolves = 0
+        self.misses = 0
+
+    def start(self):
+        """Build the index in the background, then keep it fresh"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='app-index', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"App index refresh failed: {e}")
+            self.ready.set()
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    def _sources(self):
+        """(priority, kind, directory), lowest priority first so later ones win"""
+        sources = [(0, 'path', d) for d in self.path_dirs if d]
+        sources += [(1, 'dir', d) for d in self.dirs]
+        sources += [(2, 'desktop', d) for d in self.desktop_dirs]
+        return sources
+
+    def refresh(self):
+        """Rescan directories that changed; returns how many were rescanned"""
+        start = time.perf_counter()
+        rescanned = 0
+        seen = set()
+        for _, kind, directory in self._sources():
+            seen.add(directory)
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._scanned.pop(directory, None)
+                continue
+            cached = self._scanned.get(directory)
+            if cached is not None and cached[0] == mtime:
+                continue
+            self._scanned[directory] = (mtime, self._scan(kind, directory))
+            rescanned += 1
+        for directory in set(self._scanned) - seen:
+            del self._scanned[directory]
+        if rescanned or not self.scans:
+            names = {}
+            for _, kind, directory in self._sources():
+                names.update(self._scanned.get(directory, (0, {}))[1])
+            with self._lock:
+                self._names = names
+        self.scans += 1
+        self.dirs_rescanned += rescanned
+        self.last_scan_ms = (time.perf_counter() - start) * 1000
+        return rescanned
+
+    def _scan(self, kind, directory):
+        found = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if kind == 'desktop':
+                        if entry.name.endswith('.desktop'):
+                            app = parse_desktop_file(entry.path)
+                            if app is not None:
+                                found[app_key(app.name)] = app
+                                found.setdefault(app_key(os.path.basename(app.argv[0])), app)
+                        continue
+                    name, ext = os.path.splitext(entry.name)
+                    if sys.platform == 'win32':
+                        if ext.lower() not in _WINDOWS_APPS:
+                            continue
+                    elif not (entry.is_file() and os.access(entry.path, os.X_OK)):
+                        continue
+                    else:
+                        name = entry.name
+                    key = app_key(name)
+                    if key:
+                        found[key] = AppEntry(name, [entry.path], kind)
+        except OSError as e:
+            logger.debug(f"Skipping {directory}: {e}")
+        return found
+
+    def resolve(self, name, listed_only=False):
+        """``AppEntry`` for a spoken name ("vs code", "visual studio code"), or None.
+
+        ``listed_only`` skips bare PATH executables (``reboot``), keeping
+        ``.desktop`` launchers and the configured directories.
+        """
+        key = app_key(name)
+        with self._lock:
+            names = self._names
+        app = names.get(key)
+        if app is None and ' ' in key:
+            app = names.get(key.replace(' ', ''))  # "tele gram" -> "telegram"
+        if app is not None and listed_only and app.source == 'path':
+            app = None
+        self.resolves += 1
+        if app is None:
+            self.misses += 1
+        return app
+
+    def stats(self):
+        return {
+            'ready': self.ready.is_set(),
+            'names': len(self._names),
+            'directories': len(self._scanned),
+            'scans': self.scans,
+            'dirs_rescanned': self.dirs_rescanned,
+            'last_scan_ms': round(self.last_scan_ms, 1),
+            'resolves': self.resolves,
+            'misses': self.misses,
+        }
+
+
+class Launcher:
+    """Starts applications and opens files/URIs without waiting for them.
+
+    Started processes are kept and ``poll()``ed on the next launch, so the
+    ones that have exited are reaped instead of staying zombies of the
+    server.
+    """
+
+    def __init__(self):
+        self._children = []
+        self._lock = threading.Lock()
+
+        # Stats
+        self.launches = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+    def _spawn(self, argv):
+        kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL,
+                  'close_fds': True}
+        if sys.platform == 'win32':
+            if argv[0].lower().endswith('.lnk'):
+                return os.startfile(argv[0])  # shortcuts only start through the shell
+            kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True  # own session: keeps running when the server stops
+        process = subprocess.Popen(argv, **kwargs)
+        with self._lock:
+            self._children = [child for child in self._children if child.poll() is None]
+            self._children.append(process)
+        return process
+
+    def _timed(self, start, action, *args):
+        try:
+            action(*args)
+        except OSError as e:
+            self.failures += 1
+            logger.error(f"Launch failed: {e}")
+            return False
+        elapsed = (time.perf_counter() - start) * 1000
+        self.launches += 1
+        self.total_ms += elapsed
+        self.last_ms = elapsed
+        logger.info(f"Launched {args[0]!r} in {elapsed:.1f}ms")
+        return True
+
+    def launch(self, argv, start=None):
+        """Start ``argv``; ``start`` is when resolving began, to include it in the latency"""
+        return self._timed(start or time.perf_counter(), self._spawn, argv)
+
+    def open(self, target, start=None):
+        """Open a file, URL or URI (``whatsapp:``) with the desktop's default handler"""
+        if sys.platform == 'win32':
+            return self._timed(start or time.perf_counter(), os.startfile, target)
+        opener = 'open' if sys.platform == 'darwin' else 'xdg-open'
+        return self._timed(start or time.perf_counter(), lambda t: self._spawn([opener, t]), target)
+
+    def stats(self):
+        return {
+            'launches': self.launches,
+            'failures': self.failures,
+            'avg_ms': round(self.total_ms / self.launches, 2) if self.launches else 0.0,
+            'last_ms': round(self.last_ms, 2),
+            'running': len(self._children),
+        }
@@ -0,0 +1,164 @@
+"""
+Speech Recognition Backends for JARVIS
+Interchangeable engines that turn one 16 kHz mono PCM utterance into text:
+Google Web Speech (online), Vosk (offline, CPU) and a scripted stub for
+offline load testing
+"""
+import os
+import json
+import time
+import threading
+import logging
+from itertools import cycle
+
+from .audio_decoder import SAMPLE_RATE, SAMPLE_WIDTH, BYTES_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionBackend:
+    """Base class for recognition engines.
+
+    ``recognize(pcm, on_partial=None)`` returns the transcript of a PCM
+    utterance. Like ``speech_recognition`` (imported on first use, not
+    at startup), it raises ``sr.UnknownValueError`` when nothing
+    intelligible was heard and ``sr.RequestError`` when the engine
+    itself failed. Backends with
+    ``supports_partials`` call ``on_partial(text)`` with the running
+    hypothesis while they work through the audio. ``cpu_bound`` backends
+    decode locally instead of waiting on the network.
+    """
+
+    name = 'base'
+    supports_partials = False
+    cpu_bound = False
+
+    def recognize(self, pcm, on_partial=None):
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognitionBackend):
+    """Google Web Speech API through ``speech_recognition`` (network round trip per call)"""
+
+    name = 'google'
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer
+
+    def recognize(self, pcm, on_partial=None):
+        import speech_recognition as sr
+        if self.recognizer is None:
+            self.recognizer = sr.Recognizer()
+        # pcm may be a view into the decoder's buffer; AudioData takes it without copying
+        return self.recognizer.recognize_google(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+
+
+class VoskBackend(RecognitionBackend):
+    """Offline recognition with a Vosk (Kaldi) model, run on the CPU.
+
+    The model is loaded once and shared; each call gets its own
+    recognizer, so concurrent workers don't interfere. Audio is fed in
+    ``chunk_seconds`` slices and the partial hypothesis after each slice is
+    reported through ``on_partial``.
+    """
+
+    name = 'vosk'
+    supports_partials = True
+    cpu_bound = True
+
+    def __init__(self, model_path, chunk_seconds=0.5):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("Vosk backend requires the 'vosk' package (pip install vosk)")
+        if not model_path or not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model directory not found: {model_path!r} (set JARVIS_VOSK_MODEL)")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)
+        self.chunk_bytes = int(chunk_seconds * BYTES_PER_SECOND)
+        logger.info(f"Loaded Vosk model from {model_path}")
+
+    def recognize(self, pcm, on_partial=None):
+        recognizer = self._vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
+        segments = []
+        with memoryview(pcm) as view:
+            for offset in range(0, len(view), self.chunk_bytes):
+                if recognizer.AcceptWaveform(bytes(view[offset:offset + self.chunk_bytes])):
+                    text = json.loads(recognizer.Result()).get('text', '')
+                    if text:
+                        segments.append(text)
+                elif on_partial:
+                    partial = json.loads(recognizer.PartialResult()).get('partial', '')
+                    if partial:
+                        on_partial(' '.join(segments + [partial]))
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if text:
+            segments.append(text)
+        if not segments:
+            import speech_recognition as sr
+            raise sr.UnknownValueError()
+        return ' '.join(segments)
+
+
+class StubBackend(RecognitionBackend):
+    """Deterministic backend for tests and load generation.
+
+    Returns ``transcripts`` in order (cycling) after sleeping ``latency``
+    seconds; an empty transcript behaves like unintelligible audio. With
+    ``supports_partials`` the transcript is revealed word by word through
+    ``on_partial`` over the course of the latency.
+    """
+
+    name = 'stub'
+
+    def __init__(self, transcripts=('hello jarvis',), latency=0.0, supports_partials=False):
+        self.transcripts = list(transcripts) or ['']
+        self.latency = max(0.0, latency)
+        self.supports_partials = supports_partials
+        self._next = cycle(self.transcripts)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def recognize(self, pcm, on_partial=None):
+        with self._lock:
+            text = next(self._next)
+            self.calls += 1
+        words = text.split()
+        if self.supports_partials and on_partial and len(words) > 1:
+            step = self.latency / len(words)
+            for i in range(1, len(words)):
+                time.sleep(step)
+                on_partial(' '.join(words[:i]))
+            time.sleep(step)
+        else:
+            time.sleep(self.latency)
+        if not text:
+            import speech_recognition as sr
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = ('google', 'vosk', 'stub')
+
+
+def create_backend(name, recognizer=None):
+    """Build the backend called ``name``, reading its options from the environment.
+
+    - vosk: ``JARVIS_VOSK_MODEL`` (model directory)
+    - stub: ``JARVIS_ASR_STUB_TRANSCRIPTS`` ('|'-separated),
+      ``JARVIS_ASR_STUB_LATENCY_MS`` and ``JARVIS_ASR_STUB_PARTIALS``
+    """
+    name = (name or 'google').lower()
+    if name == 'google':
+        return GoogleBackend(recognizer)
+    if name == 'vosk':
+        return VoskBackend(os.getenv('JARVIS_VOSK_MODEL'))
+    if name == 'stub':
+        transcripts = os.getenv('JARVIS_ASR_STUB_TRANSCRIPTS', 'hello jarvis').split('|')
+        return StubBackend(
+            transcripts=[t.strip() for t in transcripts],
+            latency=float(os.getenv('JARVIS_ASR_STUB_LATENCY_MS', '0')) / 1000,
+            supports_partials=os.getenv('JARVIS_ASR_STUB_PARTIALS', '0') == '1',
+        )
+    raise ValueError(f"Unknown recognition backend '{name}', expected one of {BACKENDS}")
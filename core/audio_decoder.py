@@ -0,0 +1,249 @@
+"""
+Streaming Audio Decoder for JARVIS
+Keeps one long-lived ffmpeg process per speech session that turns WebM/Opus
+bytes written to its stdin into 16 kHz mono PCM read back from its stdout
+"""
+import os
+import subprocess
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes per sample (s16le)
+BYTES_PER_SECOND = SAMPLE_RATE * SAMPLE_WIDTH
+EBML_MAGIC = b'\x1a\x45\xdf\xa3'  # first bytes of every WebM/Matroska file
+
+
+class AudioBuffer:
+    """Preallocated, growable byte buffer for accumulating PCM.
+
+    Writes copy into a single ``bytearray`` and ``take()`` hands back a
+    ``memoryview`` over the unread region, so merging a window for
+    recognition costs no extra copy. When the end of the buffer is reached
+    the consumed space at the front is reused in place; if a view from
+    ``take()`` is still alive the data moves to a fresh ``bytearray``
+    instead, so the view is never overwritten.
+    """
+
+    def __init__(self, capacity=4 * BYTES_PER_SECOND):
+        self._buf = bytearray(capacity)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def write(self, data):
+        """Append bytes-like ``data`` to the buffer"""
+        size = len(data)
+        if self._end + size > len(self._buf):
+            self._make_room(size)
+        self._buf[self._end:self._end + size] = data
+        self._end += size
+
+    def _views_alive(self):
+        """True while a memoryview from take() still references the buffer"""
+        try:
+            self._buf.append(0)
+        except BufferError:
+            return True
+        del self._buf[-1]
+        return False
+
+    def _make_room(self, size):
+        unread = self._end - self._start
+        needed = unread + size
+        capacity = len(self._buf)
+        while capacity < needed:
+            capacity *= 2
+        if capacity != len(self._buf) or self._views_alive():
+            buf = bytearray(capacity)
+            buf[:unread] = memoryview(self._buf)[self._start:self._end]
+            self._buf = buf
+        elif unread:
+            self._buf[:unread] = self._buf[self._start:self._end]
+        self._start = 0
+        self._end = unread
+
+    def take(self):
+        """Consume everything buffered and return it as a zero-copy view.
+
+        Later writes never touch the returned view's bytes; call
+        ``release()`` on it when done so the space can be reused in place.
+        """
+        view = memoryview(self._buf)[self._start:self._end]
+        self._start = self._end
+        return view
+
+    def tail(self, size):
+        """Copy of the last ``size`` unread bytes, without consuming them"""
+        return bytes(self._buf[max(self._start, self._end - size):self._end])
+
+    def clear(self):
+        self._start = self._end
+
+
+class StreamingDecoder:
+    """Pipe-based WebM -> PCM decoder backed by a persistent ffmpeg process.
+
+    The browser sends fragments of one WebM stream per recording; legacy
+    clients send one complete WebM file per cycle. ffmpeg's matroska
+    demuxer stops at a second EBML header, so a chunk that starts one
+    ends the current process (flushing its PCM) and starts a new one.
+    Fragments of the same stream share one process.
+    """
+
+    def __init__(self, ffmpeg='ffmpeg'):
+        self.ffmpeg = ffmpeg or 'ffmpeg'
+        self._process = None
+        self._reader = None
+        self._pcm = AudioBuffer()
+        self._cond = threading.Condition()
+        self._last_feed = 0.0
+        self._last_output = 0.0
+        self._closed = False
+        self._fed = False  # the running process has received a header already
+        self.restarts = 0
+
+    def _command(self):
+        return [
+            self.ffmpeg, '-hide_banner', '-loglevel', 'quiet', '-nostdin',
+            '-fflags', 'nobuffer', '-probesize', '32', '-analyzeduration', '0',
+            '-f', 'matroska', '-i', 'pipe:0',
+            '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE),
+            'pipe:1',
+        ]
+
+    def _spawn(self):
+        """Start the ffmpeg process and its stdout reader thread"""
+        self._process = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        self._reader = threading.Thread(
+            target=self._read_loop, args=(self._process,), daemon=True
+        )
+        self._fed = False
+        self._reader.start()
+        logger.debug(f"Started ffmpeg decoder (pid {self._process.pid})")
+
+    def _read_loop(self, process):
+        """Move decoded PCM from the ffmpeg pipe into the session buffer"""
+        fd = process.stdout.fileno()
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                break
+            if not data:
+                break
+            with self._cond:
+                self._pcm.write(data)
+                self._last_output = time.monotonic()
+                self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def feed(self, data):
+        """Write encoded WebM bytes (any bytes-like object) to the decoder"""
+        if self._closed:
+            return
+        if self._fed and bytes(data[:4]) == EBML_MAGIC:
+            self.flush()
+            self.restarts += 1
+            logger.debug("New WebM stream: restarted the ffmpeg decoder")
+        if not self.is_alive():
+            self._spawn()
+        try:
+            self._process.stdin.write(data)
+            self._last_feed = time.monotonic()
+        except (BrokenPipeError, OSError) as e:
+            logger.warning(f"ffmpeg decoder pipe closed, restarting: {e}")
+            self._terminate()
+            self._spawn()
+            self._process.stdin.write(data)
+            self._last_feed = time.monotonic()
+        self._fed = True
+
+    def flush(self):
+        """End the current stream: EOF to ffmpeg, then wait until its last PCM is buffered.
+
+        ffmpeg exits as soon as it has decoded the rest, so this takes
+        milliseconds, where ``read()`` would wait out its timeout for
+        input that yields no PCM. The next ``feed()`` starts a new process.
+        """
+        reader = self._reader
+        self._terminate()
+        if reader is not None:
+            reader.join(timeout=1.0)
+        with self._cond:
+            # Everything fed so far has been decoded
+            self._last_output = max(self._last_output, self._last_feed)
+            self._cond.notify_all()
+        self._fed = False
+
+    def pending(self):
+        """True if PCM is buffered or input was fed since the last read"""
+        with self._cond:
+            return bool(self._pcm) or self._last_feed > self._last_output
+
+    def buffered(self):
+        """Bytes of decoded PCM waiting to be read"""
+        with self._cond:
+            return len(self._pcm)
+
+    def read(self, idle=0.05, timeout=1.0):
+        """Return all PCM decoded so far as a zero-copy ``memoryview``.
+
+        Waits (up to ``timeout`` seconds) until ffmpeg has produced output for
+        the latest input and then stayed quiet for ``idle`` seconds, so the
+        returned audio covers everything fed before the call.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                settled = (self._last_output >= self._last_feed
+                           and now - self._last_output >= idle)
+                if settled or now >= deadline or not self.is_alive():
+                    break
+                if self._last_output >= self._last_feed:
+                    wait = idle - (now - self._last_output)
+                else:
+                    wait = deadline - now
+                self._cond.wait(min(wait, deadline - now))
+            return self._pcm.take()
+
+    def _terminate(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def close(self):
+        """Stop the ffmpeg process and drop buffered audio"""
+        self._closed = True
+        self._terminate()
+        with self._cond:
+            self._pcm.clear()
@@ -0,0 +1,90 @@
+"""
+Response Chunk Coalescing for JARVIS
+Merges small streamed response chunks into fewer ``bot_response_chunk``
+frames without delaying the first one
+"""
+import threading
+import time
+
+
+class ChunkCoalescer:
+    """Buffers text chunks and passes them to ``send`` in batches.
+
+    The first chunk is sent at once (time to first token is unchanged).
+    After that, text is held until ``max_bytes`` have accumulated or
+    ``window`` seconds have passed since the oldest held chunk arrived,
+    whichever comes first. With a ``timers`` wheel the window deadline is
+    also enforced while the upstream stream is stalled; without one it
+    is checked as chunks arrive and at ``close()``.
+    """
+
+    def __init__(self, send, window=0.04, max_bytes=512, timers=None):
+        self.send = send
+        self.window = window
+        self.max_bytes = max_bytes
+        self.timers = timers
+        self._pending = []
+        self._pending_bytes = 0
+        self._held_since = None
+        self._timer = None
+        self._first = True
+        self._lock = threading.Lock()
+
+        # Stats
+        self.chunks = 0
+        self.frames = 0
+
+    def push(self, chunk):
+        """Add a chunk; returns True if a frame was sent"""
+        if not chunk:
+            return False
+        with self._lock:
+            self.chunks += 1
+            self._pending.append(chunk)
+            self._pending_bytes += len(chunk.encode('utf-8'))
+            now = time.monotonic()
+            if self._held_since is None:
+                self._held_since = now
+            if self._first or self._pending_bytes >= self.max_bytes or now - self._held_since >= self.window:
+                self._first = False
+                self._flush()
+                return True
+            if self.timers is not None and self._timer is None:
+                self._timer = self.timers.schedule(self._held_since + self.window - now, self._on_deadline)
+            return False
+
+    def _on_deadline(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        text = ''.join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        self._held_since = None
+        self.frames += 1
+        self.send(text)
+
+    def close(self):
+        """Send whatever is still held"""
+        with self._lock:
+            if self._pending:
+                self._flush()
+            elif self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def discard(self):
+        """Drop held text without sending it (the response was cancelled)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = []
+            self._pending_bytes = 0
+            self._held_since = None
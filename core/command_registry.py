@@ -0,0 +1,177 @@
+"""
+Command Registry for JARVIS
+Task Mode commands loaded from a config file and matched with a
+word-level Aho-Corasick automaton
+"""
+import json
+import re
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase words and numbers; punctuation and spacing are ignored"""
+    return _WORD.findall(text.lower())
+
+
+class Command:
+    """One registered command: the phrases that trigger it and its action.
+
+    ``action`` names the handler that runs it; the remaining config keys
+    (``target``, ``paths``, ``uri``, ...) are kept in ``options`` for it.
+    """
+
+    __slots__ = ('name', 'action', 'phrases', 'options')
+
+    def __init__(self, name, action, phrases, **options):
+        self.name = name
+        self.action = action
+        self.phrases = list(phrases)
+        self.options = options
+
+    def __repr__(self):
+        return f"Command({self.name!r}, {self.action!r})"
+
+
+class CommandMatch:
+    """A command found in a query, spanning query words ``start:end``.
+
+    ``score`` is 1.0 for an exact phrase match and lower for fuzzy ones.
+    """
+
+    __slots__ = ('command', 'phrase', 'tokens', 'start', 'end', 'score')
+
+    def __init__(self, command, phrase, tokens, start, end, score=1.0):
+        self.command = command
+        self.phrase = phrase
+        self.tokens = tokens
+        self.start = start
+        self.end = end
+        self.score = score
+
+    @property
+    def remainder(self):
+        """The query words outside the matched phrase (e.g. a search term)"""
+        return ' '.join(self.tokens[:self.start] + self.tokens[self.end:])
+
+
+class CommandRegistry:
+    """Phrase -> command lookup in one pass over the query's words.
+
+    Phrases are matched as whole words, so "open word" does not fire on
+    "open wordpad". When several phrases occur in a query the longest
+    (most words) wins, then the earliest; config order breaks exact
+    duplicates. Matching costs O(words in the query) however many
+    commands are registered.
+    """
+
+    def __init__(self, commands=()):
+        self.commands = []
+        # Automaton: per state its word transitions, failure link, depth, the
+        # phrase ending there as (command index, phrase), and the state holding
+        # the longest phrase that ends there (itself or a suffix; 0 for none)
+        self._goto = [{}]
+        self._fail = [0]
+        self._depth = [0]
+        self._own = [None]
+        self._out = [0]
+        for command in commands:
+            self.add(command, build=False)
+        self._build()
+
+    @classmethod
+    def load(cls, path, actions=None):
+        """Registry from a JSON file ``{"commands": [{"name", "action", "phrases", ...}]}``.
+
+        Entries whose action is not in ``actions`` (when given) are skipped.
+        """
+        with open(path, 'r', encoding='utf-8') as fh:
+            entries = json.load(fh).get('commands', [])
+        commands = []
+        for entry in entries:
+            entry = dict(entry)
+            try:
+                command = Command(entry.pop('name'), entry.pop('action'), entry.pop('phrases'), **entry)
+            except KeyError as e:
+                logger.warning(f"Skipping command without {e} in {path}")
+                continue
+            if actions is not None and command.action not in actions:
+                logger.warning(f"Skipping command {command.name!r}: unknown action {command.action!r}")
+                continue
+            commands.append(command)
+        registry = cls(commands)
+        logger.info(f"Loaded {len(registry.commands)} commands from {path}")
+        return registry
+
+    def add(self, command, build=True):
+        """Register ``command``; ``build=False`` defers the automaton rebuild"""
+        index = len(self.commands)
+        self.commands.append(command)
+        for phrase in command.phrases:
+            state = 0
+            for word in tokenize(phrase):
+                nxt = self._goto[state].get(word)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][word] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._depth.append(self._depth[state] + 1)
+                    self._own.append(None)
+                    self._out.append(0)
+                state = nxt
+            if state == 0:
+                continue  # no words
+            if self._own[state] is not None:
+                owner = self.commands[self._own[state][0]].name
+                if owner != command.name:
+                    logger.warning(f"Phrase {phrase!r} of {command.name!r} is already used by {owner!r}")
+                continue
+            self._own[state] = (index, phrase)
+        if build:
+            self._build()
+
+    def _build(self):
+        """Failure links and outputs, breadth first"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            self._out[state] = state if self._own[state] is not None else self._out[self._fail[state]]
+            for word, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(word, 0)
+                queue.append(child)
+
+    def match(self, query):
+        """Best ``CommandMatch`` in ``query``, or None"""
+        tokens = tokenize(query)
+        goto, fail, out, depth = self._goto, self._fail, self._out, self._depth
+        state = 0
+        best, best_end = 0, 0
+        for i, word in enumerate(tokens):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            found = out[state]
+            if found and depth[found] > depth[best]:
+                best, best_end = found, i + 1
+        if not best:
+            return None
+        index, phrase = self._own[best]
+        return CommandMatch(self.commands[index], phrase, tokens, best_end - depth[best], best_end)
+
+    def stats(self):
+        return {
+            'commands': len(self.commands),
+            'phrases': sum(len(c.phrases) for c in self.commands),
+            'states': len(self._goto),
+        }
@@ -0,0 +1,78 @@
+"""
+Conversation Context for JARVIS
+Per-client AI Mode history, bounded by a token budget, with running
+token totals so nothing is re-summed per message
+"""
+import threading
+from collections import deque
+
+from .token_ledger import estimate_tokens
+
+
+class Conversation:
+    """Alternating user/model turns of one client, oldest first.
+
+    ``tokens`` is kept up to date as turns are added and evicted. Once it
+    passes ``max_tokens`` the oldest exchanges (user turn + reply) are
+    dropped, so the history always starts with a user turn.
+    """
+
+    __slots__ = ('max_tokens', 'turns', 'tokens', 'evicted')
+
+    def __init__(self, max_tokens=32000):
+        self.max_tokens = max_tokens
+        self.turns = deque()  # (role, text, tokens)
+        self.tokens = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.turns)
+
+    def add_exchange(self, prompt, reply, prompt_tokens=None, reply_tokens=None):
+        """Record a completed question and answer, then trim to the budget"""
+        for role, text, tokens in (('user', prompt, prompt_tokens), ('model', reply, reply_tokens)):
+            tokens = estimate_tokens(text) if tokens is None else tokens
+            self.turns.append((role, text, tokens))
+            self.tokens += tokens
+        while self.tokens > self.max_tokens and self.turns:
+            for _ in range(2):
+                _, _, tokens = self.turns.popleft()
+                self.tokens -= tokens
+            self.evicted += 1
+
+    def history(self):
+        """Turns as ``[(role, text), ...]`` for the model"""
+        return [(role, text) for role, text, _ in self.turns]
+
+    def clear(self):
+        self.turns.clear()
+        self.tokens = 0
+
+
+class ConversationStore:
+    """Conversations keyed by Socket.IO sid; dropped when the client disconnects"""
+
+    def __init__(self, max_tokens=32000):
+        self.max_tokens = max_tokens
+        self._conversations = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            conversation = self._conversations.get(sid)
+            if conversation is None:
+                conversation = self._conversations[sid] = Conversation(self.max_tokens)
+            return conversation
+
+    def drop(self, sid):
+        with self._lock:
+            self._conversations.pop(sid, None)
+
+    def stats(self):
+        with self._lock:
+            conversations = list(self._conversations.values())
+        return {
+            'sessions': len(conversations),
+            'turns': sum(len(c) for c in conversations),
+            'tokens': sum(c.tokens for c in conversations),
+        }
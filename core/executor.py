@@ -0,0 +1,132 @@
+"""
+Blocking Call Executor for JARVIS
+Bounds how many blocking calls (Gemini SDK, speech recognition,
+Wikipedia) run at once, in either server concurrency mode
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ASYNC_MODES = ('threading', 'eventlet')
+
+
+class BlockingExecutor:
+    """Runs blocking calls through ``max_workers`` slots.
+
+    In ``threading`` mode every Socket.IO handler has its own OS thread,
+    so calls run in the caller's thread once a slot is free. In
+    ``eventlet`` mode the standard library is monkey-patched before this
+    module is imported: the semaphore is a green one, and the socket
+    waits inside the SDK's REST transport, ``urllib`` (Google speech
+    recognition), ``requests`` (Wikipedia) and ``subprocess`` (ffmpeg)
+    yield to the hub, so a call occupies its slot but not the server.
+
+    CPU-bound work (NumPy VAD, wake word MFCC/DTW, an offline
+    recognizer) never waits on a socket, so under eventlet it would hold
+    the hub for its whole duration. ``compute`` runs it on eventlet's
+    pool of real OS threads (``tpool``) when ``green`` is set; NumPy
+    releases the GIL in its kernels, so other clients keep being served.
+    The pool is kept at ``compute_threads``: DTW's Python-level loop
+    still takes the GIL between kernels, and each extra busy thread
+    makes the hub wait longer for it.
+    """
+
+    def __init__(self, max_workers=32, green=False, compute_threads=2):
+        self.max_workers = max_workers
+        self.green = green
+        self.compute_threads = compute_threads
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._execute = None
+        self._pool = None
+
+        # Stats
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.waiting = 0
+        self.wait_total = 0.0
+        self.computes = 0
+        self.compute_total = 0.0
+
+    def run(self, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)`` once a slot is free and return its result"""
+        queued = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        with self._slots:
+            with self._lock:
+                self.waiting -= 1
+                self.calls += 1
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                self.wait_total += time.monotonic() - queued
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Start ``run(fn, *args, **kwargs)`` in the background and return its ``Future``.
+
+        For callers that must not wait, such as timer wheel callbacks.
+        The pool's threads are green ones under eventlet.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='blocking')
+        return self._pool.submit(self.run, fn, *args, **kwargs)
+
+    def compute(self, fn, *args, **kwargs):
+        """Call CPU-bound ``fn(*args, **kwargs)`` off the eventlet hub and return its result.
+
+        In ``green`` mode ``fn`` runs on an OS thread, so it must not emit,
+        log or take locks (those are green after monkey patching). In
+        threading mode this is a plain call.
+        """
+        start = time.perf_counter()
+        try:
+            if not self.green:
+                return fn(*args, **kwargs)
+            if self._execute is None:
+                from eventlet import tpool
+                tpool.set_num_threads(self.compute_threads)
+                self._execute = tpool.execute
+            return self._execute(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self.computes += 1
+                self.compute_total += time.perf_counter() - start
+
+    def iterate(self, iterable):
+        """Iterate a blocking iterator, taking a slot for each item.
+
+        Streams hold a slot only while waiting for their next item.
+        Closing the returned generator closes the wrapped one as well.
+        """
+        iterator = iter(iterable)
+        sentinel = object()
+        try:
+            while True:
+                item = self.run(next, iterator, sentinel)
+                if item is sentinel:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'compute_threads': self.compute_threads if self.green else 0,
+            'calls': self.calls,
+            'active': self.active,
+            'peak': self.peak,
+            'waiting': self.waiting,
+            'avg_wait_ms': round(self.wait_total / self.calls * 1000, 2) if self.calls else 0.0,
+            'computes': self.computes,
+            'avg_compute_ms': round(self.compute_total / self.computes * 1000, 2) if self.computes else 0.0,
+        }
@@ -0,0 +1,180 @@
+"""
+Fake Gemini Backend for JARVIS
+Local stand-in for ``google.generativeai`` with a configurable latency,
+throughput, size and error profile, for load tests and capacity
+planning without API traffic
+"""
+import os
+import time
+import random
+import threading
+
+_WORDS = ('the', 'system', 'is', 'online', 'and', 'all', 'modules', 'report', 'nominal', 'sir', 'power',
+          'levels', 'are', 'stable', 'while', 'the', 'network', 'responds', 'within', 'expected', 'limits')
+_FILLER = _WORDS * 50  # reply text, sliced to length
+
+
+def _pause(seconds):
+    # sleep(0) still gives up the CPU; an instant profile must not
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+def _estimate_tokens(contents):
+    """~4 characters per token over a prompt string or ``Gemini.build_contents`` turns"""
+    if isinstance(contents, str):
+        return max(1, len(contents) // 4)
+    return max(1, sum(len(turn['parts'][0]) if isinstance(turn, dict) else len(turn) for turn in contents) // 4)
+
+
+class FakeGeminiError(Exception):
+    """Injected upstream failure (``error_rate``)"""
+
+
+class _Chunk:
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class _TokenCount:
+    def __init__(self, total_tokens):
+        self.total_tokens = total_tokens
+
+
+class _Reply:
+    """Non-streaming response: the whole text at once"""
+
+    usage_metadata = None
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStream:
+    """Iterates like a streaming ``GenerateContentResponse``.
+
+    ``close()`` (what ``Gemini.close_stream`` calls) ends it early. No
+    usage is reported, so the app keeps its own token estimates (as when
+    the API omits usage); counting a long history here would cost the
+    server CPU the load test is measuring.
+    """
+
+    usage_metadata = None
+
+    def __init__(self, backend, words):
+        self.backend = backend
+        self.words = words
+        self.closed = False
+        self._iterator = self
+
+    def __iter__(self):
+        backend = self.backend
+        _pause(backend.ttft)
+        step = backend.chunk_tokens
+        sent = 0
+        try:
+            for start in range(0, len(self.words), step):
+                if self.closed:
+                    return
+                if start:
+                    _pause(backend.chunk_interval)
+                chunk = self.words[start:start + step]
+                sent += len(chunk)
+                yield _Chunk(' '.join(chunk) + ' ')
+        finally:
+            backend._count_tokens(sent)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeModel:
+    """What ``FakeGenAI.GenerativeModel`` returns"""
+
+    def __init__(self, backend, model_name):
+        self.backend = backend
+        self.model_name = model_name
+
+    def generate_content(self, contents, stream=False):
+        backend = self.backend
+        words, failed = backend._next_request()
+        if failed:
+            _pause(backend.ttft)
+            raise FakeGeminiError("503 The model is overloaded (injected by the fake backend)")
+        if stream:
+            return FakeStream(backend, words)
+        _pause(backend.ttft + backend.chunk_interval * max(0, -(-len(words) // backend.chunk_tokens) - 1))
+        backend._count_tokens(len(words))
+        return _Reply(' '.join(words))
+
+    def count_tokens(self, contents):
+        return _TokenCount(_estimate_tokens(contents))
+
+
+class FakeGenAI:
+    """``google.generativeai`` stand-in for ``Gemini.ModelRegistry(backend=...)``.
+
+    A reply is ``tokens`` words long (an int, or a ``(low, high)`` range
+    drawn per request). The first chunk comes after ``ttft`` seconds and
+    the rest at ``tokens_per_second``, ``chunk_tokens`` words per chunk
+    (0 tokens per second streams without pauses). A share ``error_rate``
+    of requests fails with ``FakeGeminiError`` instead of answering.
+    Sleeps are ``time.sleep``, so they yield under eventlet like the
+    SDK's socket waits.
+    """
+
+    def __init__(self, ttft=0.3, tokens_per_second=50.0, tokens=(40, 120), chunk_tokens=4, error_rate=0.0,
+                 seed=None):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.tokens = (tokens, tokens) if isinstance(tokens, int) else tuple(tokens)
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.chunk_interval = self.chunk_tokens / tokens_per_second if tokens_per_second > 0 else 0.0
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Stats
+        self.requests = 0
+        self.errors = 0
+        self.tokens_sent = 0
+
+    @classmethod
+    def from_env(cls):
+        """Profile from JARVIS_FAKE_TTFT_MS, _TOKENS_PER_S, _TOKENS ("80" or "40-120"), _CHUNK_TOKENS, _ERROR_RATE"""
+        low, _, high = os.getenv('JARVIS_FAKE_TOKENS', '40-120').partition('-')
+        return cls(
+            ttft=float(os.getenv('JARVIS_FAKE_TTFT_MS', '300')) / 1000,
+            tokens_per_second=float(os.getenv('JARVIS_FAKE_TOKENS_PER_S', '50')),
+            tokens=(int(low), int(high or low)),
+            chunk_tokens=int(os.getenv('JARVIS_FAKE_CHUNK_TOKENS', '4')),
+            error_rate=float(os.getenv('JARVIS_FAKE_ERROR_RATE', '0')),
+        )
+
+    def _next_request(self):
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                return None, True
+            low, high = self.tokens
+            count = low if low == high else self._rng.randint(low, high)
+        words = _FILLER[:count]
+        while len(words) < count:
+            words += _FILLER[:count - len(words)]
+        return words, False
+
+    def _count_tokens(self, count):
+        with self._lock:
+            self.tokens_sent += count
+
+    def configure(self, api_key=None, transport=None, **kwargs):
+        pass
+
+    def GenerativeModel(self, model_name, generation_config=None, safety_settings=None, **kwargs):
+        return FakeModel(self, model_name)
+
+    def stats(self):
+        return {'requests': self.requests, 'errors': self.errors, 'tokens': self.tokens_sent}
@@ -1,15 +1,19 @@
-import pyttsx3
 import datetime
-import speech_recognition as sr
 import os
 
-# Initialize the speech engine (kept for legacy but not used in web app)
-try:
-    engine = pyttsx3.init('sapi5')
-    voices = engine.getProperty('voices')
-    engine.setProperty('voice', voices[0].id)
-except:
-    pass
+# Speech engine (kept for legacy but not used in web app); created on first use by _tts_engine()
+engine = None
+
+
+def _tts_engine():
+    """The pyttsx3 SAPI5 engine, created on first use rather than at import"""
+    global engine
+    if engine is None:
+        import pyttsx3
+        engine = pyttsx3.init('sapi5')
+        voices = engine.getProperty('voices')
+        engine.setProperty('voice', voices[0].id)
+    return engine
 
 def pspk(audio):
     """Makes the computer speak, as well as prints the statement."""
@@ -19,8 +23,8 @@ def pspk(audio):
 def speak(audio):
     """Makes the computer speak."""
     pass
-    # engine.say(audio)
-    # engine.runAndWait()
+    # _tts_engine().say(audio)
+    # _tts_engine().runAndWait()
 
 def wishMe():
     """Wishes you on starting of the program."""
@@ -36,6 +40,7 @@ def wishMe():
 
 def takeCommand():
     """Takes input from the microphone and converts it into Strings."""
+    import speech_recognition as sr
     r = sr.Recognizer()
     with sr.Microphone() as source:
         print("Listening...")
@@ -0,0 +1,230 @@
+"""
+Fuzzy Command Matching for JARVIS
+Finds the registered command phrase closest to a misheard query
+("open spot if I" -> "open spotify") with a character n-gram index and
+an edit-distance re-rank
+"""
+import re
+import threading
+import numpy as np
+
+from .command_registry import CommandMatch, tokenize
+
+# Spelling-to-sound folds applied to every word before comparing, so
+# spellings that sound alike compare equal ("spotify" / "spot if i")
+_FOLDS = [
+    (re.compile(r'ph'), 'f'),
+    (re.compile(r'ck'), 'k'),
+    (re.compile(r'c(?=[eiy])'), 's'),
+    (re.compile(r'[cq]'), 'k'),
+    (re.compile(r'x'), 'ks'),
+    (re.compile(r'z'), 's'),
+    (re.compile(r'y'), 'i'),
+    (re.compile(r'(.)\1+'), r'\1'),
+]
+
+
+def fold(word):
+    """Phonetic spelling of ``word`` (lowercase letters and digits)"""
+    for pattern, repl in _FOLDS:
+        word = pattern.sub(repl, word)
+    return word
+
+
+def best_substring_distance(pattern, text):
+    """Fewest edits turning ``pattern`` into some substring of ``text``.
+
+    Bit-parallel (Myers): O(len(text)) integer operations for patterns
+    of any length. Returns ``(distance, end)`` where ``text[:end]`` ends
+    the first best match.
+    """
+    m = len(pattern)
+    if not m:
+        return 0, 0
+    peq = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    best, best_end = m, 0
+    for j, ch in enumerate(text):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score < best:
+            best, best_end = score, j + 1
+    return best, best_end
+
+
+def prefix_distances(pattern, text, limit=None):
+    """Edit distances from ``pattern`` to each prefix of ``text``.
+
+    Same bit-parallel recurrence as ``best_substring_distance``, but the
+    match is anchored at the start of ``text``. Returns a list whose
+    ``j``-th entry is the distance to ``text[:j]`` (up to ``limit``
+    characters).
+    """
+    m = len(pattern)
+    peq = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    distances = [m]
+    for ch in text[:limit]:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask  # the empty pattern is one edit per character away
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        distances.append(score)
+    return distances
+
+
+# Actions never reached through an approximate match
+EXACT_ONLY_ACTIONS = frozenset({'shutdown'})
+
+
+class FuzzyCommandMatcher:
+    """Approximate lookup over the phrases of registered commands.
+
+    Every phrase is folded (``fold``) and its spaces removed. Its
+    character n-grams go into an inverted index. A query's n-grams vote
+    for the phrases containing them, weighted by how rare the n-gram is
+    (summed with ``np.bincount``). The best ``max_candidates`` are
+    re-ranked by the edit distance between the phrase and the closest
+    run of whole words of the query, so "open wordpad" is never "open
+    word". Score is ``1 - distance / len(phrase)``; matches under
+    ``threshold`` are rejected, and phrases shorter than
+    ``short_length`` folded characters need ``short_threshold`` (at most
+    one edit). Phrases under ``min_length`` ("date", "the time") and
+    commands with an action in ``exact_only`` only match exactly. N-grams
+    shared by more than ``max_postings`` phrases ("ope", "pen") don't vote.
+    """
+
+    def __init__(self, commands, threshold=0.75, ngram=3, max_candidates=16, max_postings=2048, min_length=8,
+                 short_length=12, short_threshold=0.85, exact_only=EXACT_ONLY_ACTIONS):
+        self.threshold = threshold
+        self.ngram = ngram
+        self.max_candidates = max_candidates
+        self.max_postings = max_postings
+        self.min_length = min_length
+        self.short_length = short_length
+        self.short_threshold = max(threshold, short_threshold)
+        self._phrases = []  # (command, phrase, folded)
+        postings = {}
+        for command in commands:
+            if command.action in exact_only:
+                continue
+            for phrase in command.phrases:
+                folded = ''.join(fold(w) for w in tokenize(phrase))
+                if len(folded) < min_length:
+                    continue
+                index = len(self._phrases)
+                self._phrases.append((command, phrase, folded))
+                for gram in self._grams(folded):
+                    postings.setdefault(gram, []).append(index)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()
+                          if len(ids) <= max_postings}
+        total = len(self._phrases)
+        self._idf = {gram: np.log1p(total / len(ids)) for gram, ids in self._postings.items()}
+        self._lock = threading.Lock()
+
+        # Stats
+        self.lookups = 0
+        self.matched = 0
+        self.rejected = 0
+
+    def _grams(self, text):
+        n = min(self.ngram, len(text))
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def candidates(self, folded_query):
+        """Indexes of the phrases sharing the most n-grams with the query"""
+        grams = [g for g in self._grams(folded_query) if g in self._postings]
+        if not grams:
+            return []
+        lists = [self._postings[g] for g in grams]
+        weights = np.repeat([self._idf[g] for g in grams], [len(ids) for ids in lists])
+        votes = np.bincount(np.concatenate(lists), weights=weights, minlength=len(self._phrases))
+        k = min(self.max_candidates, len(votes))
+        top = np.argpartition(-votes, k - 1)[:k]
+        return [int(i) for i in top[np.argsort(-votes[top])] if votes[i] > 0]
+
+    def _required(self, pattern):
+        return self.short_threshold if len(pattern) < self.short_length else self.threshold
+
+    @staticmethod
+    def _word_distance(pattern, folded, max_edits):
+        """``(distance, start, end)`` of the run of words ``folded[start:end]`` closest to ``pattern``"""
+        best = None
+        limit = len(pattern) + max_edits  # longer runs are more than max_edits away
+        for start in range(len(folded)):
+            text = ''.join(folded[start:])[:limit]
+            distances = prefix_distances(pattern, text)
+            offset = 0
+            for end in range(start + 1, len(folded) + 1):
+                offset += len(folded[end - 1])
+                if offset > limit:
+                    break
+                if best is None or distances[offset] < best[0]:
+                    best = (distances[offset], start, end)
+        return best
+
+    def match(self, query):
+        """Best ``CommandMatch`` (with ``score``) at or above the threshold, or None"""
+        tokens = tokenize(query)
+        folded = [fold(w) for w in tokens]
+        text = ''.join(folded)
+        best = None
+        for index in self.candidates(text):
+            command, phrase, pattern = self._phrases[index]
+            max_edits = int((1 - self._required(pattern)) * len(pattern) + 1e-9)
+            # Cheap lower bound first: no run of words beats the best substring
+            if best_substring_distance(pattern, text)[0] > max_edits:
+                continue
+            found = self._word_distance(pattern, folded, max_edits)
+            if found is None or found[0] > max_edits:
+                continue
+            score = 1 - found[0] / len(pattern)
+            if best is None or score > best[0]:
+                best = (score, index, found[1], found[2])
+        with self._lock:
+            self.lookups += 1
+            if best is None:
+                self.rejected += 1
+                return None
+            self.matched += 1
+        score, index, start, end = best
+        command, phrase, pattern = self._phrases[index]
+        return CommandMatch(command, phrase, tokens, start, end, score=round(score, 3))
+
+    def stats(self):
+        return {
+            'phrases': len(self._phrases),
+            'threshold': self.threshold,
+            'short_threshold': self.short_threshold,
+            'lookups': self.lookups,
+            'matched': self.matched,
+            'rejected': self.rejected,
+        }
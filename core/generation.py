@@ -0,0 +1,127 @@
+"""
+Generation Control for JARVIS
+Tracks the AI Mode response streaming for each client so it can be
+cancelled (stop button, newer message, disconnect) and its upstream
+stream closed
+"""
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPECTED_TOKENS = 256  # expected reply length until replies have been seen
+
+
+class Generation:
+    """One streaming response.
+
+    ``attach`` registers a callable that stops the upstream stream; it
+    runs (from the cancelling thread) when ``cancel`` is called, so a
+    handler blocked waiting for the next chunk is released at once.
+    """
+
+    __slots__ = ('sid', 'started', 'reason', '_cancelled', '_closers', '_lock')
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.started = time.time()
+        self.reason = None
+        self._cancelled = threading.Event()
+        self._closers = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def attach(self, closer):
+        with self._lock:
+            if not self.cancelled:
+                self._closers.append(closer)
+                return
+        self._close(closer)
+
+    def cancel(self, reason='client'):
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.reason = reason
+            self._cancelled.set()
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            self._close(closer)
+        return True
+
+    @staticmethod
+    def _close(closer):
+        try:
+            closer()
+        except Exception as e:
+            logger.debug(f"Closing cancelled stream failed: {e}")
+
+
+class GenerationManager:
+    """The running generation per sid, plus cancellation stats.
+
+    Tokens saved by a cancellation are estimated as the average length of
+    completed replies minus what was generated before the stop.
+    """
+
+    def __init__(self):
+        self._active = {}
+        self._lock = threading.Lock()
+
+        # Stats
+        self.completed = 0
+        self.cancelled = 0
+        self.tokens_saved = 0
+        self._output_tokens = 0
+
+    def start(self, sid):
+        """Begin a generation for ``sid``, superseding one still running"""
+        generation = Generation(sid)
+        with self._lock:
+            previous = self._active.get(sid)
+            self._active[sid] = generation
+        if previous is not None:
+            previous.cancel('superseded')
+        return generation
+
+    def cancel(self, sid, reason='client'):
+        """Cancel the running generation of ``sid``; returns False if there was none"""
+        with self._lock:
+            generation = self._active.get(sid)
+        return generation.cancel(reason) if generation is not None else False
+
+    def expected_tokens(self):
+        return self._output_tokens // self.completed if self.completed else DEFAULT_EXPECTED_TOKENS
+
+    def finish(self, generation, output_tokens=None):
+        """Record the end of ``generation`` after ``output_tokens`` were produced.
+
+        Returns the estimated tokens saved by a cancellation. Without
+        ``output_tokens`` (request failed, reply came from the cache) the
+        generation is only deregistered.
+        """
+        with self._lock:
+            if self._active.get(generation.sid) is generation:
+                del self._active[generation.sid]
+            if output_tokens is None:
+                return 0
+            if generation.cancelled:
+                self.cancelled += 1
+                saved = max(0, self.expected_tokens() - output_tokens)
+                self.tokens_saved += saved
+                return saved
+            self.completed += 1
+            self._output_tokens += output_tokens
+            return 0
+
+    def stats(self):
+        return {
+            'active': len(self._active),
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'tokens_saved': self.tokens_saved,
+        }
@@ -1,15 +1,68 @@
 import datetime
-import speech_recognition as sr
-import wikipedia
 import webbrowser
 import os
+import time
+import logging
 from . import functions as f
 from . import Gemini as g
+from .command_registry import Command, CommandMatch, CommandRegistry, tokenize
+from .fuzzy_matcher import FuzzyCommandMatcher
+from .wiki_lookup import WikiLookup, OfflineWikiIndex, WikiTimeout
+from .app_index import AppIndex, Launcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMANDS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'config', 'commands.json')
+
 
 class JarvisEngine:
-    def __init__(self):
+    def __init__(self, commands_file=None):
         self.is_active = True
         self._system_check()
+        # Task Mode commands: config entries name one of these actions
+        self._actions = {
+            'wikipedia': self._wikipedia,
+            'url': self._open_url,
+            'app': self._open_app,
+            'file': self._open_file,
+            'time': self._time,
+            'date': self._date,
+            'reply': self._reply,
+            'shutdown': self._shutdown,
+        }
+        self.commands = CommandRegistry.load(
+            commands_file or os.getenv('JARVIS_COMMANDS_FILE') or DEFAULT_COMMANDS_FILE, actions=self._actions)
+        # Misheard commands ("open spot if I") fall back to the closest phrase
+        self.fuzzy = FuzzyCommandMatcher(
+            self.commands.commands, threshold=float(os.getenv('JARVIS_FUZZY_THRESHOLD', '0.75')))
+        self.task_stats = {'exact': 0, 'fuzzy': 0, 'installed': 0, 'unmatched': 0}
+        self.wiki = self._create_wiki_lookup()
+        # Installed applications, indexed in the background so startup doesn't wait
+        app_dirs = os.getenv('JARVIS_APP_DIRS', '')
+        self.apps = AppIndex(
+            dirs=[d for d in app_dirs.split(os.pathsep) if d],
+            refresh_interval=float(os.getenv('JARVIS_APP_INDEX_REFRESH', '300')),
+        ).start()
+        self.launcher = Launcher()
+
+    def _create_wiki_lookup(self):
+        """Wikipedia source from JARVIS_WIKI_MODE (online | offline | auto) and the offline index"""
+        mode = os.getenv('JARVIS_WIKI_MODE', 'online')
+        index = None
+        if mode != 'online':
+            path = os.getenv('JARVIS_WIKI_INDEX', 'data/wiki_abstracts.db')
+            try:
+                index = OfflineWikiIndex(path)
+            except FileNotFoundError as e:
+                logger.warning(f"{e}; Wikipedia lookups stay online")
+                mode = 'online'
+        return WikiLookup(
+            mode=mode,
+            index=index,
+            timeout=float(os.getenv('JARVIS_WIKI_TIMEOUT', '3')),
+            ttl=float(os.getenv('JARVIS_WIKI_CACHE_TTL', '86400')),
+        )
 
     def _system_check(self):
         """Verify that essential components are available."""
@@ -43,268 +96,108 @@ class JarvisEngine:
         # If we are here, mode is NOT 'ai' (it's 'task')
         print(f"Processing Task Mode Command: {query}")
         
-        if 'wikipedia' in query:
-             # ... existing logic ...
-            f.pspk('Searching Wikipedia...')
-            query = query.replace("wikipedia", "")
-            try:
-                results = wikipedia.summary(query, sentences=2)
-                response = "According to Wikipedia: " + results
-                f.pspk(response)
-            except Exception as e:
-                response = f"Could not find results on Wikipedia. Error: {e}"
-                f.pspk(response)
-
-        elif 'open youtube' in query:
-            webbrowser.open("www.youtube.com")
-            response = "Opening YouTube"
-            f.pspk(response)
-
-        elif 'open google' in query:
-            webbrowser.open("www.google.com")
-            response = "Opening Google"
-            f.pspk(response)
-
-        elif 'open stackoverflow' in query:
-            webbrowser.open("www.stackoverflow.com")
-            response = "Opening Stack Overflow"
-            f.pspk(response)
-
-        elif 'open amazon' in query:
-            webbrowser.open("www.amazon.in")
-            response = "Opening Amazon"
-            f.pspk(response)
-
-        elif 'open facebook' in query:
-            webbrowser.open("www.facebook.com")
-            response = "Opening Facebook"
-            f.pspk(response)
-
-        elif 'open instagram' in query:
-            webbrowser.open("www.instagram.com")
-            response = "Opening Instagram"
-            f.pspk(response)
-
-        elif 'open snapchat' in query:
-            webbrowser.open("www.snapchat.com")
-            response = "Opening Snapchat"
-            f.pspk(response)
-        
-        elif 'open netflix' in query:
-            webbrowser.open("www.netflix.com")
-            response = "Opening Netflix"
-            f.pspk(response)
-        
-        elif 'open reddit' in query:
-            webbrowser.open("www.reddit.com")
-            response = "Opening Reddit"
-            f.pspk(response)
-
-        elif 'open chatgpt' in query or 'open chat gpt' in query:
-            webbrowser.open("www.openai.com/chatgpt")
-            response = "Opening ChatGPT"
-            f.pspk(response)
-
-        elif 'open sonyl' in query or 'open sonyliv' in query:
-            webbrowser.open("www.sonyliv.com")
-            response = "Opening SonyLIV"
-            f.pspk(response)
-
-        elif 'open gmail' in query:
-            webbrowser.open("www.gmail.com")
-            response = "Opening Gmail"
-            f.pspk(response)
-
-        elif 'open protonmail' in query or 'open proton mail' in query:
-            webbrowser.open("www.protonmail.com")
-            response = "Opening ProtonMail"
-            f.pspk(response)
-        
-        elif 'open e care' in query or 'open ecare' in query:
-            webbrowser.open("https://app.franciscanecare.com/Portal/Dashboard")
-            response = "Opening e-Care"
-            f.pspk(response)
-        
-        elif 'play soft songs' in query: # plays music
-            music_dir = "C:\\Users\\user\\Music\\Playlists\\SOFT SONGS.m3u8"
-            if os.path.exists(music_dir):
-                os.startfile(music_dir)
-                response = "Playing soft songs"
-            else:
-                response = "Playlist not found."
-            f.pspk(response)
-
-        elif 'the time' in query: # says the present time
-            strTime = datetime.datetime.now().strftime("%H:%M:%S")
-            response = f"Sir, it's {strTime} right now"
-            f.pspk(response)
-
-        elif 'date' in query: # says today's date
-            current_date = datetime.date.today()
-            date = current_date.strftime("%Y-%m-%d")
-            response = f"Sir, it's {date} today!"
-            f.pspk(response)
-
-        elif 'open' in query and 'v'in query and 's' in query and 'code' in query:
-            fdir='C:\\Users\\user\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening VS Code"
-            else:
-                response = "VS Code not found."
-            f.pspk(response)
-
-        elif 'open whatsapp' in query or 'open whats up' in query or 'open whats app' in query:
-            fdir='C:\\Program Files\\WindowsApps\\5319275A.WhatsAppDesktop_2.2422.7.0_x64__cv1g1gvanyjgm\\WhatsApp.exe'
-            # Note: WindowsApps folder is restricted, startfile might fail if permissions aren't right, but keeping logic same as main.py
-            try:
-                os.startfile("whatsapp:") # Try protocol handler first if possible, else fallback
-            except:
-                pass 
-            # Reverting to original logic for path
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening WhatsApp"
-            else:
-                response = "Opening WhatsApp via protocol"
-                os.system("start whatsapp:")
-            f.pspk(response)
-
-        elif 'open telegram' in query:
-            fdir='C:\\Program Files\\WindowsApps\\TelegramMessengerLLP.TelegramDesktop_5.0.1.0_x64__t4vj0pshhgkwm\\Telegram.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Telegram"
-            else:
-                response = "Telegram executable not found."
-            f.pspk(response)
-        
-        elif 'open spotify' in query:
-            fdir='C:\\Program Files\\WindowsApps\\SpotifyAB.SpotifyMusic_1.239.578.0_x64__zpdnekdrzrea0\\Spotify.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Spotify"
-            else:
-                response = "Spotify executable not found."
-            f.pspk(response)
-
-        elif 'open' in query and 'premere pro' in query:
-            fdir='C:\\Program Files\\Adobe\\Adobe Premiere Pro 2023\\Adobe Premiere Pro.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Premiere Pro"
-            else:
-                response = "Premiere Pro not found."
-            f.pspk(response)
-
-        elif 'open brave' in query:
-            fdir='C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Brave Browser"
-            else:
-                response = "Brave Browser not found."
-            f.pspk(response)
-
-        elif 'open' in query and 'after effects' in query:
-            fdir='C:\\Program Files\\Adobe\\Adobe After Effects 2023\\Support Files\\AfterFX.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening After Effects"
-            else:
-                response = "After Effects not found."
-            f.pspk(response)
-        
-        elif 'open bitdefender' in query:
-            fdir='C:\\Program Files\\Bitdefender\\Bitdefender Security App\\seccenter.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Bitdefender"
-            else:
-                response = "Bitdefender not found."
-            f.pspk(response)
-        
-        elif 'open'in query and 'word' in query:
-            fdir='C:\\Program Files\\Microsoft Office\\root\\Office16\\WINWORD.EXE'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Word"
-            else:
-                response = "Word not found."
-            f.pspk(response)
-
-        elif 'open' in query and 'powerpoint' in query:
-            fdir='C:\\Program Files\\Microsoft Office\\root\\Office16\\POWERPNT.EXE'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening PowerPoint"
-            else:
-                response = "PowerPoint not found."
-            f.pspk(response)
-
-        elif 'open' in query and 'proton' in query and 'vpn' in query or 'open protonvpn' in query:
-            fdir='C:\\Program Files\\Proton\\VPN\\ProtonVPN.Launcher.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening ProtonVPN"
-            else:
-                response = "ProtonVPN not found."
-            f.pspk(response)
-
-        elif 'open blue' in query and 'j' in query or 'open bluej' in query:
-            fdir='C:\\Program Files\\BlueJ\\BlueJ.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening BlueJ"
-            else:
-                response = "BlueJ not found."
-            f.pspk(response)
-
-        elif 'open idm' in query or 'open internet download manager'in query:
-            fdir='C:\\Program Files (x86)\\Internet Download Manager\\IDMan.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening IDM"
-            else:
-                response = "IDM not found."
-            f.pspk(response)
-
-        elif 'open minecraft' in query or 'open tlauncher' in query:
-            fdir='C:\\Users\\user\\Desktop\\TLauncher.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Minecraft Launcher"
-            else:
-                response = "TLauncher not found."
-            f.pspk(response)
-
-        elif 'open discord' in query:
-            fdir='C:\\Users\\user\\AppData\\Local\\Discord\\Update.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening Discord"
-            else:
-                response = "Discord not found."
-            f.pspk(response)
-
-        elif 'open' in query and 'droidcam' in query or 'open droid cam' in query:
-            fdir='C:\\Program Files (x86)\\DroidCam\\DroidCamApp.exe'
-            if os.path.exists(fdir):
-                os.startfile(fdir)
-                response = "Opening DroidCam"
-            else:
-                response = "DroidCam not found."
-            f.pspk(response)
-
-        elif 'use' in query and 'gemini' in query:
-            response = "Gemini mode is integrated directly. Just ask your question."
-            f.pspk(response)
-            # In the GUI version, we can just route everything to Gemini if it's not a command
-            
+        return self.execute_task(query)[0]
+
+    def execute_task(self, query):
+        """Run a Task Mode command; returns ``(response, match)``.
+
+        ``match`` is None when nothing matched; ``match.score`` is below
+        1.0 when the command was recognized through fuzzy matching.
+        """
+        match = self.commands.match(query)
+        if match is not None:
+            self.task_stats['exact'] += 1
+        elif (match := self._installed_app(query)) is not None:
+            self.task_stats['installed'] += 1
         else:
-            # If we are here, it means we are in Task Mode (AI mode returns early)
-            # and no command matched.
+            match = self.fuzzy.match(query)
+            if match is not None:
+                self.task_stats['fuzzy'] += 1
+                logger.info(f"Fuzzy command match: {query!r} -> {match.phrase!r} (score {match.score})")
+        if match is None:
+            self.task_stats['unmatched'] += 1
             response = "Command not recognized in Task Mode."
-            f.pspk(response)
-                
-        return response
+        else:
+            response = self._actions[match.command.action](match)
+        f.pspk(response)
+        return response, match
+
+    def _installed_app(self, query):
+        """Match for "open <name>" when <name> is an installed application without a command.
+
+        Only ``.desktop`` launchers and ``JARVIS_APP_DIRS`` qualify: any
+        client may send this, and PATH holds ``reboot`` and ``poweroff``.
+        """
+        tokens = tokenize(query)
+        if 'open' not in tokens:
+            return None
+        start = tokens.index('open')
+        name = ' '.join(tokens[start + 1:])
+        app = self.apps.resolve(name, listed_only=True) if name else None
+        if app is None:
+            return None
+        command = Command(app.name, 'app', [f"open {name}"], apps=[name])
+        return CommandMatch(command, command.phrases[0], tokens, start, len(tokens))
+
+    def command_stats(self):
+        return dict(self.task_stats, registry=self.commands.stats(), fuzzy=self.fuzzy.stats(),
+                    wikipedia=self.wiki.stats(), apps=self.apps.stats(), launcher=self.launcher.stats())
+
+    # --- Task Mode actions (receive the CommandMatch, return the response) ---
+
+    def _wikipedia(self, match):
+        f.pspk('Searching Wikipedia...')
+        try:
+            results = self.wiki.lookup(match.remainder)
+            return "According to Wikipedia: " + results
+        except WikiTimeout:
+            return "Wikipedia is taking too long to answer. Please try again in a moment."
+        except Exception as e:
+            return f"Could not find results on Wikipedia. Error: {e}"
+
+    def _open_url(self, match):
+        webbrowser.open(match.command.options['target'])
+        return f"Opening {match.command.name}"
+
+    def _open_app(self, match):
+        """Configured path, then the application index (``apps`` names, else the command name), then ``uri``"""
+        command = match.command
+        start = time.perf_counter()
+        argv = next(([path] for path in command.options.get('paths', []) if os.path.exists(path)), None)
+        if argv is None:
+            for name in command.options.get('apps', [command.name]):
+                app = self.apps.resolve(name)
+                if app is not None:
+                    argv = app.argv
+                    break
+        if argv is not None:
+            if self.launcher.launch(argv, start=start):
+                return f"Opening {command.name}"
+            return f"Could not open {command.name}."
+        uri = command.options.get('uri')
+        if uri:
+            if self.launcher.open(uri, start=start):
+                return f"Opening {command.name} via protocol"
+            return f"Could not open {command.name}."
+        return f"{command.name} not found."
+
+    def _open_file(self, match):
+        path = match.command.options['path']
+        if os.path.exists(path) and self.launcher.open(path):
+            return f"Playing {match.command.name}"
+        return f"{match.command.name} not found."
+
+    def _time(self, match):
+        strTime = datetime.datetime.now().strftime("%H:%M:%S")
+        return f"Sir, it's {strTime} right now"
+
+    def _date(self, match):
+        date = datetime.date.today().strftime("%Y-%m-%d")
+        return f"Sir, it's {date} today!"
+
+    def _reply(self, match):
+        return match.command.options['text']
+
+    def _shutdown(self, match):
+        self.is_active = False
+        return "Shutting Down..."
@@ -0,0 +1,134 @@
+"""
+Log Streaming for JARVIS
+Logging handler that keeps recent lines in a numbered ring buffer and
+pushes only new lines, in batches, to clients viewing the logs panel
+"""
+import os
+import logging
+import threading
+from collections import deque
+
+LOGS_ROOM = 'logs'
+
+
+class LogStream(logging.Handler):
+    """Ring buffer of formatted log lines with sequence numbers.
+
+    ``emit`` only appends to the ring; a background task started on the
+    first subscription sends lines added since the previous flush to the
+    ``logs`` room every ``flush_interval`` seconds as one ``logs_append``
+    event: ``{'lines': [[seq, text], ...], 'last_seq': n, 'reset': bool,
+    'run': id}``. ``run`` identifies this server run, since sequence
+    numbers start over after a restart. ``reset`` tells the client to clear
+    its view first (it asked to resume from another run, or from a sequence
+    number that has already left the ring). A batch may repeat lines the
+    subscription backlog already held, so clients skip lines numbered at or
+    below the last one they have.
+    """
+
+    def __init__(self, socketio=None, capacity=500, flush_interval=0.25, max_batch=200):
+        super().__init__()
+        self.socketio = socketio
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._ring = deque(maxlen=capacity)
+        self._seq = 0
+        self._flushed_seq = 0
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._started = False
+        self.run_id = os.urandom(6).hex()  # differs after a restart
+
+        # Stats
+        self.batches_sent = 0
+        self.lines_sent = 0
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._lock:
+            self._seq += 1
+            self._ring.append((self._seq, line))
+
+    def since(self, seq=None):
+        """Return ``(entries, reset)`` for lines after ``seq``.
+
+        ``reset`` is True when ``seq`` is None, ahead of the log (the server
+        restarted) or older than the ring, in which case every buffered line
+        is returned.
+        """
+        with self._lock:
+            oldest = self._ring[0][0] if self._ring else self._seq + 1
+            if seq is None or seq > self._seq or seq < oldest - 1:
+                return list(self._ring), True
+            return [entry for entry in self._ring if entry[0] > seq], False
+
+    def subscribe(self, sid, after=None, run=None):
+        """Register ``sid`` (already joined to the logs room); returns its backlog payload.
+
+        ``after`` only counts when ``run`` is this run's id: the client's
+        lines from an earlier run are replaced.
+        """
+        with self._lock:
+            self._subscribers.add(sid)
+            start = not self._started and self.socketio is not None
+            if start:
+                self._started = True
+                self._flushed_seq = self._seq
+        if start:
+            self.socketio.start_background_task(self._flush_loop)
+        entries, reset = self.since(after if run == self.run_id else None)
+        return self._payload(entries, reset)
+
+    def unsubscribe(self, sid):
+        with self._lock:
+            self._subscribers.discard(sid)
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def _payload(self, entries, reset=False):
+        last = entries[-1][0] if entries else self._seq
+        return {'lines': [list(entry) for entry in entries], 'last_seq': last, 'reset': reset, 'run': self.run_id}
+
+    def flush(self):
+        """Send lines added since the last flush to the logs room"""
+        with self._lock:
+            if self._seq == self._flushed_seq:
+                return 0
+            if not self._subscribers:
+                self._flushed_seq = self._seq
+                return 0
+            entries = [entry for entry in self._ring if entry[0] > self._flushed_seq]
+            self._flushed_seq = self._seq
+        for start in range(0, len(entries), self.max_batch):
+            batch = entries[start:start + self.max_batch]
+            self.socketio.emit('logs_append', self._payload(batch), room=LOGS_ROOM)
+            self.batches_sent += 1
+            self.lines_sent += len(batch)
+        return len(entries)
+
+    def _flush_loop(self):
+        while True:
+            self.socketio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass  # never log from here: it would feed the stream it is flushing
+
+    def stats(self):
+        return {
+            'last_seq': self._seq,
+            'buffered': len(self._ring),
+            'subscribers': self.subscribers,
+            'batches_sent': self.batches_sent,
+            'lines_sent': self.lines_sent,
+        }
@@ -0,0 +1,82 @@
+"""
+Partial Transcripts for JARVIS
+Builds a running hypothesis for the utterance in progress from
+recognition results of overlapping sliding windows
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STRIP = '.,!?;:"\''
+
+
+def _norm(word):
+    return word.lower().strip(_STRIP)
+
+
+def align(previous, hypothesis, lo=0, max_skip=1):
+    """Find where ``hypothesis`` continues ``previous``.
+
+    Looks for the longest run of words shared by ``previous[i:]`` (with
+    ``i >= lo``) and ``hypothesis[j:]`` (with ``j <= max_skip``, since the
+    first word of a window is often cut in half). Returns ``(i, j, length)``
+    or None if there is no convincing overlap: a run of two words, or a
+    single word that ends ``previous``.
+    """
+    a = [_norm(w) for w in previous]
+    b = [_norm(w) for w in hypothesis]
+    best = None
+    for j in range(min(max_skip + 1, len(b))):
+        for i in range(max(0, lo), len(a)):
+            k = 0
+            while i + k < len(a) and j + k < len(b) and a[i + k] == b[j + k]:
+                k += 1
+            if k and (best is None or k > best[2]):
+                best = (i, j, k)
+    if best is None:
+        return None
+    i, j, k = best
+    if k >= 2 or i + k == len(a):
+        return best
+    return None
+
+
+class IncrementalTranscript:
+    """Stitches overlapping window hypotheses into one transcript.
+
+    Each update covers the window ``[start, end]`` seconds of the
+    utterance. Words keep an estimated time (spread evenly over the window
+    that produced them); words from before the new window are kept as is,
+    and the new hypothesis replaces everything from where it overlaps the
+    old text, so words in the overlap never appear twice.
+    """
+
+    def __init__(self, slack=1.0):
+        self.slack = slack  # seconds before the window start still searched for the overlap
+        self._words = []  # (word, estimated time)
+        self.updates = 0
+
+    @property
+    def text(self):
+        return ' '.join(word for word, _ in self._words)
+
+    def update(self, hypothesis, start, end):
+        """Merge the hypothesis for window ``[start, end]`` and return the new text"""
+        words = hypothesis.split()
+        self.updates += 1
+        if not words:
+            return self.text
+        step = (end - start) / len(words)
+        timed = [(word, start + (n + 0.5) * step) for n, word in enumerate(words)]
+
+        previous = [word for word, _ in self._words]
+        lo = next((n for n, (_, t) in enumerate(self._words) if t >= start - self.slack), len(previous))
+        match = align(previous, words, lo) if start > 0 else None
+        if match:
+            i, j, _ = match
+            self._words = self._words[:i] + timed[j:]
+        else:
+            # No overlap found (or the window covers the whole utterance):
+            # keep only words estimated to lie before the window
+            self._words = [(w, t) for w, t in self._words if t < start] + timed
+        return self.text
@@ -0,0 +1,201 @@
+"""
+Recognition Scheduler for JARVIS
+Bounded worker pool that runs speech recognition jobs off the Socket.IO
+handler threads, with one FIFO per session and explicit overflow policies
+"""
+import threading
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('merge', 'drop_oldest', 'drop_newest')
+
+
+class _Job:
+    __slots__ = ('pcm', 'enqueued_at', 'handler', 'optional')
+
+    def __init__(self, pcm, enqueued_at, handler=None, optional=False):
+        self.pcm = pcm
+        self.enqueued_at = enqueued_at
+        self.handler = handler
+        self.optional = optional
+
+
+class RecognitionScheduler:
+    """Fixed-size worker pool with a FIFO of PCM windows per session.
+
+    A session is only ever handled by one worker at a time, so its windows
+    are recognized in order and never concurrently. Sessions with queued
+    work are served round-robin. When a session already has ``max_pending``
+    windows waiting, the overflow policy decides what happens:
+
+    - ``merge``: the new window is appended to the newest queued window
+    - ``drop_oldest``: the oldest queued window is discarded
+    - ``drop_newest``: the new window is discarded
+
+    ``on_backpressure(sid, depth, policy)`` is called whenever a policy is
+    applied.
+
+    Optional jobs (e.g. interim transcripts) are best effort: they are only
+    queued when the session has nothing else waiting, and are evicted
+    first when a regular window finds the queue full.
+    """
+
+    def __init__(self, handler, workers=2, max_pending=2, overflow='merge', on_backpressure=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        self.handler = handler
+        self.max_pending = max(1, max_pending)
+        self.overflow = overflow
+        self.on_backpressure = on_backpressure
+
+        self._queues = {}
+        self._ready = deque()  # sessions with queued work and no active worker
+        self._active = set()
+        self._cond = threading.Condition()
+        self._running = True
+
+        # Stats
+        self._processed = 0
+        self._merged = 0
+        self._dropped = 0
+        self._skipped = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"asr-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, sid, pcm, handler=None, optional=False):
+        """Queue a PCM window (bytes-like) for recognition.
+
+        ``handler`` overrides the scheduler's handler for this job. Returns
+        False if the window was discarded instead of queued.
+        """
+        applied = None
+        with self._cond:
+            if not self._running:
+                self._release(pcm)
+                return False
+            queue = self._queues.setdefault(sid, deque())
+            if optional and queue:
+                self._release(pcm)
+                self._skipped += 1
+                return False
+            if len(queue) >= self.max_pending:
+                stale = next((job for job in queue if job.optional), None)
+                if stale is not None:
+                    queue.remove(stale)
+                    self._release(stale.pcm)
+                    self._skipped += 1
+            if len(queue) >= self.max_pending:
+                applied = self.overflow
+                if self.overflow == 'merge':
+                    last = queue[-1]  # keeps its own handler
+                    merged = bytearray(last.pcm)
+                    merged += pcm
+                    self._release(last.pcm)
+                    self._release(pcm)
+                    last.pcm = merged
+                    self._merged += 1
+                elif self.overflow == 'drop_oldest':
+                    self._release(queue.popleft().pcm)
+                    queue.append(_Job(pcm, time.monotonic(), handler))
+                    self._dropped += 1
+                else:
+                    self._release(pcm)
+                    self._dropped += 1
+            else:
+                queue.append(_Job(pcm, time.monotonic(), handler, optional))
+            if sid not in self._active and sid not in self._ready:
+                self._ready.append(sid)
+                self._cond.notify()
+            depth = len(queue)
+
+        if applied:
+            logger.warning(f"Recognition backlog for {sid}: {depth} windows queued, applied '{applied}'")
+            if self.on_backpressure:
+                self.on_backpressure(sid, depth, applied)
+        return applied != 'drop_newest'
+
+    def discard(self, sid):
+        """Drop all queued windows for a session"""
+        with self._cond:
+            queue = self._queues.pop(sid, None)
+            if sid in self._ready:
+                self._ready.remove(sid)
+        if queue:
+            for job in queue:
+                self._release(job.pcm)
+
+    def depth(self, sid):
+        with self._cond:
+            return len(self._queues.get(sid, ()))
+
+    def queued_bytes(self, sid):
+        """PCM bytes waiting in a session's queue"""
+        with self._cond:
+            return sum(len(job.pcm) for job in self._queues.get(sid, ()))
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while self._running and not self._ready:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                sid = self._ready.popleft()
+                job = self._queues[sid].popleft()
+                self._active.add(sid)
+                waited = time.monotonic() - job.enqueued_at
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+            try:
+                (job.handler or self.handler)(sid, job.pcm)
+            except Exception as e:
+                logger.error(f"Recognition job failed for {sid}: {e}", exc_info=True)
+
+            with self._cond:
+                self._processed += 1
+                self._active.discard(sid)
+                queue = self._queues.get(sid)
+                if queue:
+                    self._ready.append(sid)
+                    self._cond.notify()
+                elif queue is not None:
+                    del self._queues[sid]
+
+    @staticmethod
+    def _release(pcm):
+        if isinstance(pcm, memoryview):
+            pcm.release()
+
+    def stats(self):
+        """Queue depth and wait-time counters for the dashboard"""
+        with self._cond:
+            depths = {sid: len(q) for sid, q in self._queues.items() if q}
+            started = self._processed + len(self._active)
+            return {
+                'workers': len(self._workers),
+                'active': len(self._active),
+                'queued': sum(depths.values()),
+                'max_depth': max(depths.values(), default=0),
+                'processed': self._processed,
+                'merged': self._merged,
+                'dropped': self._dropped,
+                'skipped_optional': self._skipped,
+                'avg_wait_ms': round(self._wait_total / started * 1000, 1) if started else 0.0,
+                'max_wait_ms': round(self._wait_max * 1000, 1),
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
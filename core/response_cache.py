@@ -0,0 +1,237 @@
+"""
+Response Cache for JARVIS
+LRU/TTL cache of complete AI Mode responses, stored as the chunks they
+streamed in so a hit can be replayed through the same events
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import Counter, OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_SPACES = re.compile(r'\s+')
+
+# Greetings and questions about JARVIS itself: their answers don't depend on earlier turns
+_STANDALONE = re.compile(
+    r"^(?:(?:hey|hi|hello|ok|okay),? )?(?:jarvis,? )?(?:"
+    r"hi|hello|hey|good (?:morning|afternoon|evening|night)|thanks|thank you"
+    r"|how are you(?: doing)?|who are you|what are you|who (?:made|created|built) you"
+    r"|what(?:'s| is) your name|what can you do"
+    r")(?:,? jarvis)?$")
+
+
+def normalize_prompt(prompt):
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a prompt"""
+    return _SPACES.sub(' ', prompt.lower()).strip().rstrip('?!. ')
+
+
+def is_standalone(prompt):
+    """True for prompts whose answer doesn't depend on the conversation (greetings, identity questions)"""
+    return bool(_STANDALONE.match(normalize_prompt(prompt)))
+
+
+def make_scope(model_name, generation=None):
+    """What an answer depends on besides the prompt: the model and its generation parameters"""
+    return f"{model_name}\n{json.dumps(generation or {}, sort_keys=True)}"
+
+
+def make_key(prompt, model_name, generation=None):
+    """Cache key for a prompt sent to ``model_name`` with ``generation`` parameters"""
+    raw = f"{make_scope(model_name, generation)}\n{normalize_prompt(prompt)}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('chunks', 'created', 'size', 'prompt', 'scope')
+
+    def __init__(self, chunks, created, prompt=None, scope=None):
+        self.chunks = chunks
+        self.created = created
+        self.prompt = prompt  # normalized prompt, kept to rebuild the semantic index
+        self.scope = scope
+        self.size = sum(len(chunk.encode('utf-8')) for chunk in chunks)
+
+
+class ResponseCache:
+    """Bounded response cache.
+
+    Entries are evicted least-recently-used first once there are more
+    than ``max_entries`` or they hold more than ``max_bytes`` of text, and
+    expire ``ttl`` seconds after they were stored. With ``path`` set the
+    cache is loaded from that JSON file at startup and ``save()`` writes it
+    back (only when something changed).
+
+    ``lookup``/``store`` work on prompts rather than keys; given a
+    ``semantic`` index (``core.semantic_cache.SemanticIndex``) an exact
+    miss falls back to the answer for the closest previously answered
+    prompt with the same model and parameters (the index's scope).
+    """
+
+    def __init__(self, max_entries=256, max_bytes=4 * 1024 * 1024, ttl=3600.0, path=None, semantic=None):
+        self.semantic = semantic
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._prompts = Counter()  # entries per (scope, normalized prompt), to prune the semantic index
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.semantic_hits = 0
+
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached chunks for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.created > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry.chunks)
+
+    def put(self, key, chunks, created=None, prompt=None, scope=None):
+        """Store a complete response as the list of chunks it streamed in.
+
+        With ``prompt`` (normalized) and ``scope`` given, the prompt is
+        also added to the semantic index.
+        """
+        entry = _Entry(list(chunks), created or time.time(), prompt, scope)
+        if not entry.chunks or entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            if entry.prompt is not None:
+                self._prompts[entry.scope, entry.prompt] += 1
+                if self.semantic is not None and entry.scope is not None:
+                    self.semantic.add(entry.prompt, entry.scope)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._dirty = True
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._dirty = True
+        if entry.prompt is not None:
+            name = (entry.scope, entry.prompt)
+            self._prompts[name] -= 1
+            if not self._prompts[name]:
+                # An evicted answer must not stay the nearest match and hide a real hit
+                del self._prompts[name]
+                if self.semantic is not None:
+                    self.semantic.remove(entry.prompt, entry.scope)
+
+    def lookup(self, prompt, model_name, generation=None):
+        """Return ``(chunks, matched_prompt)`` for ``prompt``, or ``(None, None)``"""
+        chunks = self.get(make_key(prompt, model_name, generation))
+        if chunks is not None or self.semantic is None:
+            return chunks, (prompt if chunks is not None else None)
+        match = self.semantic.lookup(normalize_prompt(prompt), make_scope(model_name, generation))
+        if match is None:
+            return None, None
+        key = make_key(match[0], model_name, generation)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.created > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+            self.semantic_hits += 1
+            return list(entry.chunks), match[0]
+
+    def store(self, prompt, model_name, generation, chunks):
+        """Cache a complete response to ``prompt`` (and index it for near-duplicates)"""
+        self.put(make_key(prompt, model_name, generation), chunks, prompt=normalize_prompt(prompt),
+                 scope=make_scope(model_name, generation))
+
+    def clear(self):
+        with self._lock:
+            if self.semantic is not None:
+                for scope, prompt in self._prompts:
+                    self.semantic.remove(prompt, scope)
+            self._entries.clear()
+            self._prompts.clear()
+            self._bytes = 0
+            self._dirty = True
+
+    def load(self):
+        """Read entries persisted by ``save()``; expired ones are skipped"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load response cache from {self.path}: {e}")
+            return 0
+        now = time.time()
+        for item in data.get('entries', []):
+            if now - item['created'] <= self.ttl:
+                self.put(item['key'], item['chunks'], created=item['created'], prompt=item.get('prompt'),
+                         scope=item.get('scope'))
+        self._dirty = False
+        logger.info(f"Loaded {len(self._entries)} cached responses from {self.path}")
+        return len(self._entries)
+
+    def save(self):
+        """Write the cache to ``path`` (atomically) if it changed since the last save"""
+        if not self.path or not self._dirty:
+            return False
+        with self._lock:
+            entries = [{'key': key, 'created': entry.created, 'chunks': entry.chunks, 'prompt': entry.prompt,
+                        'scope': entry.scope}
+                       for key, entry in self._entries.items()]
+            self._dirty = False
+        tmp = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"Could not save response cache to {self.path}: {e}")
+            return False
+        return True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.semantic_hits) / lookups * 100, 1) if lookups else 0.0,
+            'evictions': self.evictions,
+            'semantic_hits': self.semantic_hits,
+            'semantic': self.semantic.stats() if self.semantic is not None else None,
+        }
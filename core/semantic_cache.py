@@ -0,0 +1,260 @@
+"""
+Semantic Prompt Index for JARVIS
+Finds previously answered prompts that are worded almost the same way,
+using local hashed n-gram vectors and cosine similarity (no model calls)
+"""
+import re
+import math
+import zlib
+import threading
+
+import numpy as np
+
+FEATURE_BITS = 20
+
+# Words that don't change what is asked (wake word, politeness, ASR fillers)
+FILLER_WORDS = frozenset({'hey', 'hi', 'ok', 'okay', 'jarvis', 'please', 'so', 'um', 'uh', 'well'})
+
+# Common synonyms and contractions of voice questions, mapped to one spelling
+SYNONYMS = {
+    'created': 'made', 'built': 'made', 'developed': 'made', 'designed': 'made', 'programmed': 'made',
+    'create': 'make', 'build': 'make', 'develop': 'make',
+    'whats': 'what is', "what's": 'what is', 'whos': 'who is', "who's": 'who is',
+    "where's": 'where is', "how's": 'how is', "it's": 'it is', "you're": 'you are',
+}
+
+_WORDS = re.compile(r"[\w']+")
+_PHRASES = re.compile(r"\b(?:%s)\b" % '|'.join(sorted((re.escape(k) for k in SYNONYMS), key=len, reverse=True)))
+
+
+def canonicalize(text):
+    """Lowercased words of ``text`` with fillers dropped and synonyms unified"""
+    text = _PHRASES.sub(lambda m: SYNONYMS[m.group(0)], text.lower())
+    return ' '.join(word for word in _WORDS.findall(text) if word not in FILLER_WORDS)
+
+# Set bits per byte value, for NumPy < 2.0 (no np.bitwise_count)
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def popcount(x, out=None):
+    """Set bits of each element of a contiguous uint64 array, as uint8"""
+    counts = _BYTE_BITS[x.view(np.uint8)].reshape(len(x), 8).sum(axis=1, dtype=np.uint8)
+    if out is None:
+        return counts
+    out[...] = counts
+    return out
+
+
+_bitwise_count = getattr(np, 'bitwise_count', popcount)
+
+
+class HashingVectorizer:
+    """Maps text to a sparse, L2-normalized vector of hashed features.
+
+    Features are ``ngram``-grams of the space-padded UTF-8 text plus
+    whole words, hashed with CRC32 (stable across restarts) into
+    ``buckets`` slots; slot 0 is never used so it can pad fixed-width rows.
+    Counts are dampened with ``1 + log(tf)``.
+    """
+
+    def __init__(self, ngram=3, buckets=1 << FEATURE_BITS):
+        self.ngram = ngram
+        self.buckets = buckets
+
+    def transform(self, text):
+        """Return ``(indices, weights)``: sorted int32 feature ids and float32 weights"""
+        crc32, modulo, n = zlib.crc32, self.buckets - 1, self.ngram
+        counts = {}
+        padded = f" {text} ".encode('utf-8')
+        for i in range(len(padded) - n + 1):
+            h = crc32(padded[i:i + n]) % modulo + 1
+            counts[h] = counts.get(h, 0) + 1
+        for word in text.split():
+            h = crc32(b'w:' + word.encode('utf-8')) % modulo + 1
+            counts[h] = counts.get(h, 0) + 1
+        if not counts:
+            return np.zeros(0, np.int32), np.zeros(0, np.float32)
+        indices = np.fromiter(counts.keys(), np.int32, len(counts))
+        weights = 1.0 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+        order = np.argsort(indices)
+        indices, weights = indices[order], weights[order]
+        weights /= np.linalg.norm(weights)
+        return indices, weights
+
+
+def _mix64(x):
+    """splitmix64 finalizer: well-spread 64-bit hashes of integer arrays"""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class SemanticIndex:
+    """Capacity-bounded index of prompts for near-duplicate lookup.
+
+    Each prompt is stored as a row of two fixed-width NumPy matrices
+    (feature ids and weights, zero padded) plus a ``bits``-bit SimHash
+    signature. A lookup compares the query signature with every stored
+    one at once (XOR + popcount over the signature columns), keeps rows
+    within the Hamming radius that cosine ``threshold`` maps to, and
+    scores only those rows exactly, as one gather and row sum. Prompts
+    are vectorized in their ``canonicalize()`` form, so "hey jarvis who
+    made you" and "who created you" look alike. Every row belongs to a
+    ``scope`` (the response cache uses the model and its generation
+    parameters) and only rows of the query's scope can match. Prompts
+    with more than ``max_features`` features (long, one-off questions)
+    are not indexed; the least recently used prompt is evicted when
+    ``capacity`` is reached.
+    """
+
+    def __init__(self, capacity=10000, threshold=0.85, bits=128, max_features=96,
+                 max_candidates=32, vectorizer=None):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.max_features = max_features
+        self.max_candidates = max_candidates
+        self.vectorizer = vectorizer or HashingVectorizer()
+        # Signature bits differ with probability angle/pi; allow 2 sigma above the threshold's mean
+        p = math.acos(threshold) / math.pi
+        self.radius = int(bits * p + 2 * math.sqrt(bits * p * (1 - p)))
+        self._words = np.arange(bits // 64, dtype=np.uint64)
+        self._sigs = np.zeros((bits // 64, capacity), np.uint64)  # one contiguous column per 64 bits
+        self._feat = np.zeros((capacity, max_features), np.int32)
+        self._wts = np.zeros((capacity, max_features), np.float32)
+        self._used = np.zeros(capacity, np.int64)
+        self._texts = [None] * capacity
+        self._scope = np.zeros(capacity, np.int32)
+        self._scope_ids = {None: 0}
+        self._slots = {}  # (scope id, text) -> row
+        self._query = np.zeros(self.vectorizer.buckets, np.float32)
+        self._xor = np.zeros(capacity, np.uint64)
+        self._dist = np.zeros(capacity, np.uint8)
+        self._part = np.zeros(capacity, np.uint8)
+        self._clock = 0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.lookups = 0
+        self.hits = 0
+        self.candidates = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def signature(self, indices, weights):
+        """SimHash of a sparse vector: sign of its projection on pseudo-random +/-1 planes"""
+        seeds = indices.astype(np.uint64)[:, None] * np.uint64(len(self._words)) + self._words
+        planes = np.unpackbits(_mix64(seeds).view(np.uint8), axis=1).astype(np.float32) * 2 - 1
+        bits = np.packbits((weights @ planes) > 0)
+        return bits.view(np.uint64)
+
+    def _vectorize(self, text):
+        indices, weights = self.vectorizer.transform(canonicalize(text))
+        if not len(indices) or len(indices) > self.max_features:
+            return None
+        return indices, weights
+
+    def add(self, text, scope=None):
+        """Index ``text`` under ``scope``; returns False when it has too many features to index"""
+        vector = self._vectorize(text)
+        if vector is None:
+            return False
+        indices, weights = vector
+        signature = self.signature(indices, weights)
+        with self._lock:
+            self._clock += 1
+            scope_id = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            slot = self._slots.get((scope_id, text))
+            if slot is not None:
+                self._used[slot] = self._clock
+                return True
+            if len(self._slots) < self.capacity:
+                slot = len(self._slots)
+            else:
+                slot = int(np.argmin(self._used))
+                del self._slots[(int(self._scope[slot]), self._texts[slot])]
+                self.evictions += 1
+            self._sigs[:, slot] = signature
+            self._feat[slot] = 0
+            self._wts[slot] = 0
+            self._feat[slot, :len(indices)] = indices
+            self._wts[slot, :len(indices)] = weights
+            self._used[slot] = self._clock
+            self._texts[slot] = text
+            self._scope[slot] = scope_id
+            self._slots[(scope_id, text)] = slot
+        return True
+
+    def remove(self, text, scope=None):
+        """Drop ``text`` of ``scope`` from the index; returns False if it wasn't indexed"""
+        with self._lock:
+            slot = self._slots.pop((self._scope_ids.get(scope), text), None)
+            if slot is None:
+                return False
+            # Keep rows 0..n-1 dense: the last row moves into the freed slot
+            last = len(self._slots)
+            if slot != last:
+                self._sigs[:, slot] = self._sigs[:, last]
+                self._feat[slot] = self._feat[last]
+                self._wts[slot] = self._wts[last]
+                self._used[slot] = self._used[last]
+                self._texts[slot] = self._texts[last]
+                self._scope[slot] = self._scope[last]
+                self._slots[(int(self._scope[slot]), self._texts[slot])] = slot
+            self._used[last] = 0
+            self._texts[last] = None
+            return True
+
+    def lookup(self, text, scope=None):
+        """Return ``(matched_text, similarity)`` for the closest prompt indexed under ``scope``, or None"""
+        vector = self._vectorize(text)
+        if vector is None:
+            return None
+        indices, weights = vector
+        signature = self.signature(indices, weights)
+        with self._lock:
+            self.lookups += 1
+            n = len(self._slots)
+            scope_id = self._scope_ids.get(scope)
+            if not n or scope_id is None:
+                return None
+            xor, dist, part = self._xor[:n], self._dist[:n], self._part[:n]
+            np.bitwise_xor(self._sigs[0, :n], signature[0], out=xor)
+            _bitwise_count(xor, out=dist)
+            for word, column in zip(signature[1:], self._sigs[1:]):
+                np.bitwise_xor(column[:n], word, out=xor)
+                np.add(dist, _bitwise_count(xor, out=part), out=dist)
+            if len(self._scope_ids) > 1:
+                dist[self._scope[:n] != scope_id] = np.iinfo(dist.dtype).max  # other scopes never match
+            candidates = np.flatnonzero(dist <= self.radius)
+            if not len(candidates):
+                return None
+            if len(candidates) > self.max_candidates:
+                nearest = np.argpartition(dist[candidates], self.max_candidates)[:self.max_candidates]
+                candidates = candidates[nearest]
+            self.candidates += len(candidates)
+
+            query = self._query
+            query[indices] = weights
+            scores = (query[self._feat[candidates]] * self._wts[candidates]).sum(axis=1)
+            query[indices] = 0.0
+
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            slot = int(candidates[best])
+            self._clock += 1
+            self._used[slot] = self._clock
+            self.hits += 1
+            return self._texts[slot], float(scores[best])
+
+    def stats(self):
+        return {
+            'entries': len(self._slots),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'avg_candidates': round(self.candidates / self.lookups, 1) if self.lookups else 0.0,
+            'evictions': self.evictions,
+        }
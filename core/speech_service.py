@@ -2,126 +2,241 @@
 Speech Recognition Service for JARVIS
 Handles server-side speech recognition using Python's speech_recognition library
 """
-import speech_recognition as sr
-import io
-import threading
 import time
 import base64
-import wave
-import tempfile
+import threading
 import os
 import glob
-from pydub import AudioSegment
-from pydub.utils import which
+import shutil
+import functools
 from flask_socketio import emit
 import logging
+from .audio_decoder import StreamingDecoder, BYTES_PER_SECOND
+from .recognition_scheduler import RecognitionScheduler
+from .vad import VoiceActivityDetector
+from .wake_word import WakeWordSpotter, WAKE_PHRASES, WAKE, MISS, UNSURE
+from .asr_backends import create_backend, GoogleBackend
+from .partial_transcript import IncrementalTranscript
+from .timer_wheel import TimerWheel
+from .executor import BlockingExecutor
+from .speech_session import SpeechSession
 
 logger = logging.getLogger(__name__)
 
-# Configure FFmpeg path for pydub
+
+@functools.lru_cache(maxsize=None)
 def find_ffmpeg():
-    """Find FFmpeg in winget installation directory"""
-    winget_patterns = [
-        os.path.expandvars(r"$LOCALAPPDATA\Microsoft\WinGet\Packages\Gyan.FFmpeg*\**\bin\ffmpeg.exe"),
-        r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
-        r"C:\ffmpeg\bin\ffmpeg.exe",
-    ]
-    
-    for pattern in winget_patterns:
-        matches = glob.glob(pattern, recursive=True)
-        if matches:
-            return matches[0]
-    
-    # Fall back to system PATH
-    return which("ffmpeg")
+    """Path of the ffmpeg binary, searched for once on first use.
 
-ffmpeg_path = find_ffmpeg()
-if ffmpeg_path:
-    # Set the paths for pydub
-    AudioSegment.converter = ffmpeg_path
-    AudioSegment.ffmpeg = ffmpeg_path
-    AudioSegment.ffprobe = ffmpeg_path.replace("ffmpeg.exe", "ffprobe.exe")
+    ``JARVIS_FFMPEG`` wins; then winget and the usual Windows install
+    folders, then ``PATH``. A found install directory is added to
+    ``PATH`` so ffmpeg's companion tools resolve too.
+    """
+    path = os.getenv('JARVIS_FFMPEG')
+    if not path:
+        winget = os.path.expandvars(r"$LOCALAPPDATA\Microsoft\WinGet\Packages\Gyan.FFmpeg*")
+        patterns = [
+            winget + r"\*\bin\ffmpeg.exe",  # the usual package layout: no recursive walk needed
+            r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
+            r"C:\ffmpeg\bin\ffmpeg.exe",
+            winget + r"\**\bin\ffmpeg.exe",
+        ]
+        for pattern in patterns:
+            matches = glob.glob(pattern, recursive=True)
+            if matches:
+                path = matches[0]
+                break
+        else:
+            # Fall back to system PATH
+            path = shutil.which("ffmpeg")
+    if not path:
+        logger.warning("FFmpeg not found. Audio conversion may fail.")
+        return None
     
     # CRITICAL: Add ffmpeg directory to PATH so subprocess can find it
-    ffmpeg_dir = os.path.dirname(ffmpeg_path)
-    if ffmpeg_dir not in os.environ['PATH']:
+    ffmpeg_dir = os.path.dirname(path)
+    if ffmpeg_dir and ffmpeg_dir not in os.environ['PATH'].split(os.pathsep):
         os.environ['PATH'] = ffmpeg_dir + os.pathsep + os.environ['PATH']
-    
-    logger.info(f"FFmpeg configured at: {ffmpeg_path}")
-    logger.info(f"FFmpeg directory added to PATH: {ffmpeg_dir}")
-else:
-    logger.warning("FFmpeg not found. Audio conversion may fail.")
+        logger.info(f"FFmpeg directory added to PATH: {ffmpeg_dir}")
+    logger.info(f"FFmpeg configured at: {path}")
+    return path
 
 
 class SpeechService:
     """Manages speech recognition for voice input"""
     
-    def __init__(self, socketio):
+    def __init__(self, socketio, timers=None, executor=None):
         self.socketio = socketio
-        self.recognizer = sr.Recognizer()
-        # Adjust for ambient noise
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
+        
+        # Recognition engine (google | vosk | stub)
+        backend = os.getenv('JARVIS_ASR_BACKEND', 'google')
+        try:
+            self.asr = create_backend(backend)
+        except (RuntimeError, ValueError) as e:
+            logger.error(f"Recognition backend '{backend}' unavailable ({e}); using Google")
+            self.asr = GoogleBackend()
+        logger.info(f"Speech recognition backend: {self.asr.name}")
         
         # Session states (per client)
         self.sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._stats_lock = threading.Lock()  # counters updated from several sessions' workers
+        # Sessions with no client activity for this long are reaped (dropped sockets)
+        self.SESSION_TTL = float(os.getenv('JARVIS_SESSION_TTL', '900'))
+        # Ceiling on PCM buffered per session; audio beyond it is refused
+        self.SESSION_MAX_AUDIO_BYTES = int(os.getenv('JARVIS_SESSION_MAX_AUDIO_MB', '8')) * 1024 * 1024
+        self.sessions_reaped = 0
         
         # Audio processing configuration
-        self.ACCUMULATION_DURATION = 3.0  # seconds to accumulate before processing
+        self.ACCUMULATION_DURATION = 3.0  # seconds to accumulate before processing (VAD off)
+        self.VAD_ENABLED = os.getenv('JARVIS_VAD', '1') != '0'
+        self.VAD_POLL_INTERVAL = 0.25  # seconds between VAD passes over new PCM
+        self.VAD_TRAILING_SILENCE_MS = int(os.getenv('JARVIS_VAD_SILENCE_MS', '600'))
+        self.FIXED_WINDOW_SECONDS = 3.0  # window the pre-VAD pipeline sent per recognizer call
+        self.vad_totals = {'windows': 0, 'silent_windows': 0, 'utterances': 0, 'audio_seconds': 0.0}
+        
+        # Incremental transcription (AI Mode, needs VAD): overlapping windows of the
+        # utterance in progress are recognized every PARTIAL_INTERVAL seconds and
+        # stitched into speech_interim updates; the full utterance is still recognized once at the end
+        self.PARTIALS_ENABLED = self.VAD_ENABLED and os.getenv('JARVIS_SPEECH_PARTIALS', '0') == '1'
+        self.PARTIAL_INTERVAL = int(os.getenv('JARVIS_PARTIAL_INTERVAL_MS', '500')) / 1000
+        self.PARTIAL_WINDOW = 3.0  # seconds of audio per interim window
+        
+        # Recognizer calls (network or CPU bound) share the app's bounded executor;
+        # NumPy work (VAD, wake word) goes through its compute() to stay off the eventlet hub
+        self.executor = executor or BlockingExecutor()
+        
+        # Local wake word spotter gates the recognizer while Task Mode is asleep.
+        # Templates are per session (plus the shared JARVIS_WAKE_TEMPLATES). None ship
+        # with JARVIS, so until a session has some, or when the spotter's match is a
+        # near miss, the recognizer looks for the wake phrase (and enrolls it) unless
+        # JARVIS_WAKE_FALLBACK=off.
+        threshold = os.getenv('JARVIS_WAKE_THRESHOLD')
+        self.wake_spotter = WakeWordSpotter(
+            template_dir=os.getenv('JARVIS_WAKE_TEMPLATES') or None,
+            threshold=float(threshold) if threshold else None,
+            unsure_margin=float(os.getenv('JARVIS_WAKE_UNSURE_MARGIN', '1.5')),
+            compute=self.executor.compute,
+        )
+        self.WAKE_ASR_FALLBACK = os.getenv('JARVIS_WAKE_FALLBACK', 'asr') != 'off'
+        if not self.wake_spotter.ready and self.WAKE_ASR_FALLBACK:
+            logger.info("No shared wake word templates: asleep sessions use the recognizer until they enroll one")
+        elif not self.wake_spotter.ready:
+            logger.warning("No wake word templates and JARVIS_WAKE_FALLBACK=off: asleep sessions ignore speech")
+        self.asleep_windows_skipped = 0
+        self.wake_asr_checks = 0
+        self.MIN_PCM_BYTES = int(0.1 * BYTES_PER_SECOND)  # skip windows shorter than 100ms
+        
+        # All session timeouts share one timer thread (the app's, if it passes one in)
+        self.timers = timers or TimerWheel()
+        # Recognition runs on a bounded worker pool, one FIFO per session
+        self.scheduler = RecognitionScheduler(
+            self._recognize_window,
+            workers=int(os.getenv('JARVIS_ASR_WORKERS', '2')),
+            max_pending=int(os.getenv('JARVIS_ASR_MAX_PENDING', '2')),
+            overflow=os.getenv('JARVIS_ASR_OVERFLOW', 'merge'),
+            on_backpressure=self._on_backpressure,
+        )
+        
+        # Idle session reaper
+        self._reaper = threading.Thread(target=self._reap_loop, name='speech-reaper', daemon=True)
+        self._reaper.start()
+    
+    def warm_up(self):
+        """Load the recognizer library and locate ffmpeg before the first audio arrives"""
+        import speech_recognition  # noqa: F401
+        find_ffmpeg()
         
     def create_session(self, sid):
         """Create a new speech session for a client"""
-        self.sessions[sid] = {
-            'mode': 'ai',  # 'ai' or 'task'
-            'is_listening': False,
-            'is_awake': False,  # Task mode state
-            'final_transcript': '',  # AI mode accumulated text
-            'silence_timer': None,
-            'no_input_timer': None,
-            'last_speech_time': None,
-            'audio_buffer': [],  # Accumulate audio chunks
-            'last_process_time': time.time(),  # Track processing intervals
-            'process_timer': None  # Timer for periodic processing
-        }
+        vad = VoiceActivityDetector(trailing_silence_ms=self.VAD_TRAILING_SILENCE_MS) if self.VAD_ENABLED else None
+        session = SpeechSession(sid, vad)
+        with self._sessions_lock:
+            old = self.sessions.get(sid)
+            self.sessions[sid] = session
+        if old:
+            self._close_session(old)
         logger.info(f"Created speech session for {sid}")
+        return session
+    
+    def _session(self, sid):
+        """Return the live session for ``sid`` or None"""
+        session = self.sessions.get(sid)
+        if session is None or session.closed:
+            return None
+        return session
         
     def destroy_session(self, sid):
         """Clean up session"""
-        if sid in self.sessions:
-            session = self.sessions[sid]
-            # Cancel any active timers
-            if session['silence_timer']:
-                session['silence_timer'].cancel()
-            if session['no_input_timer']:
-                session['no_input_timer'].cancel()
-            if session['process_timer']:
-                session['process_timer'].cancel()
-            del self.sessions[sid]
+        with self._sessions_lock:
+            session = self.sessions.pop(sid, None)
+        if session:
+            self._close_session(session)
             logger.info(f"Destroyed speech session for {sid}")
     
+    def _close_session(self, session):
+        """Cancel timers, stop the decoder and drop queued audio"""
+        with session.lock:
+            session.closed = True
+            session.is_listening = False
+            session.cancel_timers()
+            decoder, session.decoder = session.decoder, None
+        if decoder:
+            decoder.close()  # also ends a read in progress
+        if session.vad:
+            with session.decode_lock:
+                session.vad.flush()
+        self.scheduler.discard(session.sid)
+        self.wake_spotter.forget(session.sid)
+    
+    def _reap_loop(self):
+        """Destroy sessions whose client went quiet for longer than SESSION_TTL"""
+        interval = max(1.0, min(60.0, self.SESSION_TTL / 4))
+        while True:
+            time.sleep(interval)
+            try:
+                self.reap_idle_sessions()
+            except Exception as e:
+                logger.error(f"Session reaper error: {e}", exc_info=True)
+    
+    def reap_idle_sessions(self, now=None):
+        """Destroy idle sessions; returns how many were removed"""
+        now = now or time.time()
+        with self._sessions_lock:
+            idle = [sid for sid, session in self.sessions.items()
+                    if session.idle_seconds(now) > self.SESSION_TTL]
+        for sid in idle:
+            logger.info(f"Reaping idle speech session {sid}")
+            self.destroy_session(sid)
+        self.sessions_reaped += len(idle)
+        return len(idle)
+    
     def set_mode(self, sid, mode):
         """Set voice mode (ai or task)"""
-        if sid in self.sessions:
-            self.sessions[sid]['mode'] = mode
-            self.sessions[sid]['is_listening'] = False
-            self.sessions[sid]['is_awake'] = False
-            self.sessions[sid]['final_transcript'] = ''
+        session = self._session(sid)
+        if session:
+            with session.lock:
+                session.touch()
+                session.mode = mode
+                session.is_listening = False
+                session.is_awake = False
+                session.final_transcript = ''
             logger.info(f"Session {sid} mode changed to: {mode}")
     
     def start_listening(self, sid, mode='ai', initial_text=''):
         """Start listening for speech"""
-        if sid not in self.sessions:
-            self.create_session(sid)
-        
-        session = self.sessions[sid]
-        session['mode'] = mode
-        session['is_listening'] = True
-        session['last_speech_time'] = time.time()
+        session = self._session(sid) or self.create_session(sid)
         
-        # Initialize transcript with current text (handles deletions/edits)
-        if mode == 'ai':
-            session['final_transcript'] = initial_text
-            logger.info(f"Initialized transcript with: '{initial_text}'")
+        with session.lock:
+            session.touch()
+            session.mode = mode
+            session.is_listening = True
+            session.last_speech_time = time.time()
+            
+            # Initialize transcript with current text (handles deletions/edits)
+            if mode == 'ai':
+                session.final_transcript = initial_text
+                logger.info(f"Initialized transcript with: '{initial_text}'")
         
         logger.info(f"Started listening for {sid} in {mode} mode")
         
@@ -130,225 +245,403 @@ class SpeechService:
 
     def reset_session_transcript(self, sid):
         """Reset the session transcript"""
-        if sid in self.sessions:
-            self.sessions[sid]['final_transcript'] = ''
+        session = self._session(sid)
+        if session:
+            with session.lock:
+                session.final_transcript = ''
             logger.info(f"Reset transcript for {sid}")
     
     def stop_listening(self, sid):
         """Stop listening"""
-        if sid in self.sessions:
-            session = self.sessions[sid]
-            session['is_listening'] = False
-            
-            # Cancel timers
-            if session['silence_timer']:
-                session['silence_timer'].cancel()
-                session['silence_timer'] = None
-            if session['no_input_timer']:
-                session['no_input_timer'].cancel()
-                session['no_input_timer'] = None
-            if session['process_timer']:
-                session['process_timer'].cancel()
-                session['process_timer'] = None
+        session = self._session(sid)
+        if session:
+            with session.lock:
+                session.touch()
+                session.is_listening = False
+                
+                # Cancel timers
+                session.cancel_timers()
             
-            # Process any remaining audio in buffer
-            if session['audio_buffer']:
-                self._process_accumulated_audio(sid)
+            # Process any remaining audio in the decoder / open utterance in the VAD.
+            # This waits on ffmpeg, so it holds only the session's decode lock
+            self._process_accumulated_audio(sid, wait=True)
+            # The next recording is a new WebM stream (header first): it needs its own decoder
+            with session.decode_lock:
+                with session.lock:
+                    decoder, session.decoder = session.decoder, None
+                if decoder:
+                    decoder.close()
             
             logger.info(f"Stopped listening for {sid}")
             self.socketio.emit('speech_stopped', room=sid)
     
     def process_audio_chunk(self, sid, audio_data):
-        """Accumulate incoming audio chunk"""
-        if sid not in self.sessions:
+        """Accumulate incoming audio chunk (raw bytes or base64 string)"""
+        session = self._session(sid)
+        if session is None:
             logger.warning(f"No session found for {sid}")
             return
         
-        session = self.sessions[sid]
-        if not session['is_listening']:
-            return
-        
+        with session.lock:
+            session.touch()
+            if not session.is_listening:
+                return
+        # Feeding can wait on ffmpeg (a new WebM header ends the previous stream first)
+        with session.decode_lock:
+            self._feed_chunk(session, audio_data)
+    
+    def _feed_chunk(self, session, audio_data):
+        """Decode one chunk into the session (decode lock held)"""
+        sid = session.sid
         try:
-            # Decode base64 audio
-            audio_bytes = base64.b64decode(audio_data)
+            # Binary Socket.IO attachments arrive as bytes; older clients send base64 text
+            if isinstance(audio_data, (bytes, bytearray, memoryview)):
+                audio_bytes = audio_data
+            else:
+                audio_bytes = base64.b64decode(audio_data)
             
-            # Skip empty or very small chunks
-            if len(audio_bytes) < 100:
-                logger.debug(f"Skipping small audio chunk: {len(audio_bytes)} bytes")
+            # Skip empty chunks (small ones may be fragments of a continuous stream, keep them)
+            if not audio_bytes:
                 return
             
             logger.debug(f"Received audio chunk: {len(audio_bytes)} bytes")
+            session.received_bytes += len(audio_bytes)
             
-            # Add to buffer
-            session['audio_buffer'].append(audio_bytes)
+            # Refuse audio while the session holds more PCM than its ceiling
+            held = session.buffered_bytes() + self.scheduler.queued_bytes(sid)
+            if held > self.SESSION_MAX_AUDIO_BYTES:
+                session.dropped_bytes += len(audio_bytes)
+                if not session.over_limit:
+                    session.over_limit = True
+                    logger.warning(f"Session {sid} holds {held} bytes of audio, refusing new chunks")
+                    self.socketio.emit('speech_backpressure', {'queued': self.scheduler.depth(sid), 'policy': 'memory_limit'}, room=sid)
+                return
+            session.over_limit = False
             
-            # Check if we should process accumulated audio
-            time_since_last_process = time.time() - session['last_process_time']
+            # Stream into the session decoder; PCM is collected at processing time.
+            # A legacy client's whole-file chunk starts a new WebM header, on
+            # which the decoder starts a fresh ffmpeg process
+            with session.lock:
+                if not session.is_listening:
+                    return
+                if not session.decoder:
+                    session.decoder = StreamingDecoder(find_ffmpeg())
+                decoder = session.decoder
+            decoder.feed(audio_bytes)
             
-            if time_since_last_process >= self.ACCUMULATION_DURATION:
-                # Process accumulated audio
-                self._process_accumulated_audio(sid)
-            elif not session['process_timer']:
-                # Start timer for periodic processing
-                def process_callback():
-                    self._process_accumulated_audio(sid)
-                
-                session['process_timer'] = threading.Timer(self.ACCUMULATION_DURATION, process_callback)
-                session['process_timer'].start()
+            # Cut a window once the interval has passed; recognition runs on the scheduler
+            with session.lock:
+                if session.is_listening and not session.process_timer:
+                    interval = self.VAD_POLL_INTERVAL if session.vad else self.ACCUMULATION_DURATION
+                    session.process_timer = self.timers.schedule(interval, self._on_process_timer, sid)
                     
         except Exception as e:
             logger.error(f"Error processing audio chunk: {e}", exc_info=True)
     
-    def _process_accumulated_audio(self, sid):
-        """Process accumulated audio chunks"""
-        if sid not in self.sessions:
+    def _on_process_timer(self, sid):
+        """Process timer callback: runs on the wheel thread, so it only hands the cut to the executor"""
+        self.executor.submit(self._process_accumulated_audio, sid)
+    
+    def _process_accumulated_audio(self, sid, wait=False):
+        """Cut the PCM decoded so far into a window and queue it for recognition.
+
+        With ``wait=True`` (used when listening stops) this blocks briefly until
+        the decoder has caught up with all audio fed so far.
+        """
+        session = self._session(sid)
+        if session is None:
             return
-        
-        session = self.sessions[sid]
-        
-        # Cancel process timer if active
-        if session['process_timer']:
-            session['process_timer'].cancel()
-            session['process_timer'] = None
+        with session.decode_lock:
+            self._cut_window(session, wait)
+    
+    def _cut_window(self, session, wait):
+        """Body of _process_accumulated_audio (decode lock held)"""
+        sid = session.sid
+        with session.lock:
+            if session.closed:
+                return
+            # Cancel process timer if active
+            if session.process_timer:
+                session.process_timer.cancel()
+                session.process_timer = None
+            decoder = session.decoder
+            vad = session.vad
         
         # Check if we have audio to process
-        if not session['audio_buffer']:
+        if not decoder or not decoder.pending():
             logger.debug(f"No audio in buffer for {sid}")
+            if wait and vad:
+                # Close the utterance still open in the VAD
+                utterance = vad.flush()
+                if utterance is not None:
+                    with self._stats_lock:
+                        self.vad_totals['utterances'] += 1
+                self._submit_utterances(session, [utterance])
             return
         
         try:
-            # Merge all accumulated chunks
-            merged_audio = b''.join(session['audio_buffer'])
-            total_size = len(merged_audio)
-            chunk_count = len(session['audio_buffer'])
+            # Collect everything decoded since the last window; when listening stops,
+            # end the stream so ffmpeg hands over its last PCM without waiting out a timeout
+            if wait:
+                decoder.flush()
+            pcm = decoder.read(idle=0, timeout=0)
+            total_size = len(pcm)
             
-            logger.info(f"Processing {chunk_count} audio chunks, total {total_size} bytes")
+            # Update process time
+            session.last_process_time = time.time()
             
-            # Clear buffer and update process time
-            session['audio_buffer'] = []
-            session['last_process_time'] = time.time()
+            if vad:
+                # Only complete utterances go to the recognizer; silence never does
+                speech_before = vad.speech_frames
+                utterances = self.executor.compute(vad.process, pcm)
+                pcm.release()
+                if wait:
+                    utterances.append(vad.flush())
+                silent = vad.speech_frames == speech_before and not vad.in_speech
+                self._record_vad_window(total_size, utterances, silent)
+                self._submit_utterances(session, utterances)
+                if self.PARTIALS_ENABLED and not wait and session.mode == 'ai':
+                    self._submit_partial(sid, session, vad)
+                return
             
             # Skip if audio is too small
-            if total_size < 1000:
+            if total_size < self.MIN_PCM_BYTES:
                 logger.debug(f"Skipping processing: audio too small ({total_size} bytes)")
+                pcm.release()
                 return
             
-            # Create temp files for conversion
-            webm_path = None
-            wav_path = None
-            
-            try:
-                with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as webm_file:
-                    webm_file.write(merged_audio)
-                    webm_path = webm_file.name
-                logger.debug(f"Created WebM temp file: {webm_path}")
-            except Exception as e:
-                logger.error(f"Failed to create WebM temp file: {e}")
+            logger.info(f"Queueing {total_size} bytes of PCM ({total_size / BYTES_PER_SECOND:.2f}s) for {sid}")
+            self.scheduler.submit(sid, pcm)
+                    
+        except Exception as e:
+            logger.error(f"Error in _process_accumulated_audio: {e}", exc_info=True)
+    
+    def _submit_utterances(self, session, utterances):
+        """Queue VAD utterances for recognition"""
+        sid = session.sid
+        for utterance in utterances:
+            if utterance is None:
+                continue
+            # Interim windows still queued for this utterance are now stale
+            with session.lock:
+                session.utterance_seq += 1
+                session.partial_mark = 0
+            if len(utterance) < self.MIN_PCM_BYTES:
+                utterance.release()
+                continue
+            logger.info(f"Queueing utterance of {len(utterance) / BYTES_PER_SECOND:.2f}s for {sid}")
+            self.scheduler.submit(sid, utterance)
+    
+    def _submit_partial(self, sid, session, vad):
+        """Queue an interim window over the end of the utterance in progress"""
+        length = vad.utterance_bytes
+        with session.lock:
+            if length - session.partial_mark < self.PARTIAL_INTERVAL * BYTES_PER_SECOND:
                 return
-            
-            try:
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
-                    wav_path = wav_file.name
-                logger.debug(f"Created WAV temp file: {wav_path}")
-            except Exception as e:
-                logger.error(f"Failed to create WAV temp file: {e}")
-                if webm_path and os.path.exists(webm_path):
-                    os.unlink(webm_path)
+            seq = session.utterance_seq
+        window, offset = vad.utterance_tail(int(self.PARTIAL_WINDOW * BYTES_PER_SECOND))
+        start, end = offset / BYTES_PER_SECOND, length / BYTES_PER_SECOND
+        
+        def handler(sid, pcm):
+            self._recognize_partial(sid, pcm, seq, start, end)
+        
+        # Best effort: skipped while the session has recognition work waiting
+        if self.scheduler.submit(sid, window, handler=handler, optional=True):
+            with session.lock:
+                session.partial_mark = length
+    
+    def _recognize(self, pcm, on_partial=None):
+        """Run the recognizer in an executor slot; CPU-bound backends run off the eventlet hub"""
+        if not self.asr.cpu_bound:
+            return self.executor.run(self.asr.recognize, pcm, on_partial)
+        if self.executor.green:
+            on_partial = None  # it would emit from an OS thread, which eventlet doesn't allow
+        return self.executor.run(self.executor.compute, self.asr.recognize, pcm, on_partial)
+    
+    def _recognize_partial(self, sid, pcm, seq, start, end):
+        """Recognize one interim window and emit the stitched hypothesis"""
+        session = self._session(sid)
+        if session is None or session.utterance_seq != seq or not session.is_listening:
+            return  # utterance already finalized
+        import speech_recognition as sr
+        try:
+            text = self._recognize(pcm)
+        except sr.UnknownValueError:
+            return
+        except sr.RequestError as e:
+            logger.debug(f"Interim recognition failed: {e}")
+            return
+        with session.lock:
+            if session.utterance_seq != seq:
+                return
+            if not session.partial or session.partial[0] != seq:
+                session.partial = (seq, IncrementalTranscript())
+            hypothesis = session.partial[1].update(text, start, end)
+        if hypothesis:
+            self._handle_recognition_result(sid, hypothesis, is_final=False)
+    
+    def _record_vad_window(self, size, utterances, silent):
+        totals = self.vad_totals
+        with self._stats_lock:
+            totals['windows'] += 1
+            totals['audio_seconds'] += size / BYTES_PER_SECOND
+            totals['utterances'] += sum(1 for u in utterances if u is not None)
+            if silent:
+                totals['silent_windows'] += 1
+    
+    def _recognize_window(self, sid, pcm):
+        """Run recognition on one PCM window (called on a scheduler worker)"""
+        import speech_recognition as sr
+        try:
+            session = self._session(sid)
+            if session is None:
                 return
             
-            try:
-                # Convert WebM to WAV using pydub
-                logger.debug(f"Converting {webm_path} to WAV...")
-                audio = AudioSegment.from_file(webm_path, format="webm")
-                audio = audio.set_channels(1).set_frame_rate(16000)
-                audio.export(wav_path, format="wav")
-                logger.debug("Conversion successful")
-                
-                # Now use speech_recognition
-                logger.debug(f"Reading WAV file for recognition...")
-                with sr.AudioFile(wav_path) as source:
-                    audio_data = self.recognizer.record(source)
-                
-                # Recognize speech using Google (free, no API key)
-                try:
-                    text = self.recognizer.recognize_google(audio_data)
-                    
-                    if text:
-                        session['last_speech_time'] = time.time()
-                        self._handle_recognition_result(sid, text, is_final=True)
-                        logger.info(f"Successfully recognized: {text}")
-                        
-                except sr.UnknownValueError:
-                    # No speech detected in this chunk
-                    logger.debug("No speech detected in audio")
-                    # Emit empty final speech to reset UI "Transcribing..." state
-                    self.socketio.emit('speech_final', {'text': '', 'full_transcript': session['final_transcript']}, room=sid)
-                    pass
-                except sr.RequestError as e:
-                    logger.error(f"Speech recognition error: {e}")
-                    self.socketio.emit('speech_error', {'error': str(e)}, room=sid)
+            # Task Mode asleep: only the local wake word spotter looks at the audio
+            asleep = session.mode == 'task' and not session.is_awake
+            if asleep:
+                verdict = self.wake_spotter.check(pcm, sid) if self.wake_spotter.ready_for(sid) else UNSURE
+                if verdict == WAKE:
+                    logger.info(f"Wake word spotted locally for {sid}")
+                    self._activate_task_mode(sid)
+                    # Fall through: the same utterance may already carry the command
+                elif verdict == MISS or not self.WAKE_ASR_FALLBACK:
+                    with self._stats_lock:
+                        self.asleep_windows_skipped += 1
+                    return
+                else:
+                    # No templates yet, or a near miss: the recognizer looks for the wake phrase
+                    with self._stats_lock:
+                        self.wake_asr_checks += 1
             
-            except Exception as e:
-                logger.error(f"Conversion/Recognition error: {e}", exc_info=True)
+            # Backends that stream partial hypotheses drive speech_interim (AI Mode only)
+            on_partial = None
+            if self.asr.supports_partials and session.mode == 'ai' and not self.PARTIALS_ENABLED:
+                def on_partial(partial):
+                    self._handle_recognition_result(sid, partial, is_final=False)
             
-            finally:
-                # Clean up temp files
-                try:
-                    if webm_path and os.path.exists(webm_path):
-                        os.unlink(webm_path)
-                        logger.debug(f"Deleted temp file: {webm_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete WebM temp file: {e}")
+            # pcm is a view into the decoder's buffer; backends don't copy it
+            try:
+                text = self._recognize(pcm, on_partial)
                 
-                try:
-                    if wav_path and os.path.exists(wav_path):
-                        os.unlink(wav_path)
-                        logger.debug(f"Deleted temp file: {wav_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete WAV temp file: {e}")
+                if text and session.mode == 'task' and text.lower().strip() in WAKE_PHRASES:
+                    # Audio confirmed to be just the wake phrase: keep it as a template
+                    self.wake_spotter.enroll(pcm, sid)
+                
+                if text:
+                    with session.lock:
+                        session.last_speech_time = time.time()
+                    self._handle_recognition_result(sid, text, is_final=True)
+                    logger.info(f"Successfully recognized: {text}")
                     
+            except sr.UnknownValueError:
+                # No speech detected in this chunk
+                logger.debug("No speech detected in audio")
+                # Emit empty final speech to reset UI "Transcribing..." state
+                self.socketio.emit('speech_final', {'text': '', 'full_transcript': session.final_transcript}, room=sid)
+            except sr.RequestError as e:
+                logger.error(f"Speech recognition error: {e}")
+                self.socketio.emit('speech_error', {'error': str(e)}, room=sid)
+        
         except Exception as e:
-            logger.error(f"Error in _process_accumulated_audio: {e}", exc_info=True)
+            logger.error(f"Recognition error: {e}", exc_info=True)
+        
+        finally:
+            # Hand the buffer space back to the decoder
+            if isinstance(pcm, memoryview):
+                pcm.release()
+    
+    def _on_backpressure(self, sid, depth, policy):
+        """Tell the client its recognition queue is falling behind"""
+        self.socketio.emit('speech_backpressure', {'queued': depth, 'policy': policy}, room=sid)
+    
+    def stats(self):
+        """Recognition queue, VAD, wake word, timer and session statistics"""
+        with self._stats_lock:
+            skipped, asr_checks = self.asleep_windows_skipped, self.wake_asr_checks
+        stats = {
+            'recognition': dict(self.scheduler.stats(), backend=self.asr.name),
+            'wake_word': dict(self.wake_spotter.stats(), asleep_windows_skipped=skipped, asr_checks=asr_checks),
+            'timers': self.timers.stats(),
+            'sessions': self.session_stats(),
+        }
+        if self.VAD_ENABLED:
+            with self._stats_lock:
+                totals = dict(self.vad_totals)
+            # Calls the fixed 3-second windowing would have made for the same audio
+            fixed_calls = totals['audio_seconds'] / self.FIXED_WINDOW_SECONDS
+            saved = 1 - totals['utterances'] / fixed_calls if fixed_calls >= 1 else 0.0
+            stats['vad'] = dict(totals,
+                                audio_seconds=round(totals['audio_seconds'], 1),
+                                asr_calls_saved_pct=round(max(0.0, saved) * 100, 1))
+        return stats
+    
+    def session_stats(self, top=10):
+        """Live sessions and the audio bytes held per session (largest first)"""
+        with self._sessions_lock:
+            sessions = list(self.sessions.values())
+        now = time.time()
+        rows = []
+        for session in sessions:
+            rows.append({
+                'sid': session.sid,
+                'mode': session.mode,
+                'listening': session.is_listening,
+                'idle_s': round(session.idle_seconds(now), 1),
+                'held_bytes': session.buffered_bytes() + self.scheduler.queued_bytes(session.sid),
+                'received_bytes': session.received_bytes,
+                'dropped_bytes': session.dropped_bytes,
+            })
+        rows.sort(key=lambda row: row['held_bytes'], reverse=True)
+        return {
+            'live': len(rows),
+            'listening': sum(1 for row in rows if row['listening']),
+            'reaped': self.sessions_reaped,
+            'held_bytes': sum(row['held_bytes'] for row in rows),
+            'per_session': rows[:top],
+        }
     
     def _handle_recognition_result(self, sid, text, is_final=False):
         """Handle recognized text"""
-        session = self.sessions[sid]
-        mode = session['mode']
+        session = self._session(sid)
+        if session is None:
+            return
+        with session.lock:
+            self._apply_result(session, text, is_final)
+    
+    def _apply_result(self, session, text, is_final):
+        sid = session.sid
+        mode = session.mode
         
         logger.info(f"Recognition result [{mode}]: {text} (final={is_final})")
         
         if mode == 'ai':
             # AI Mode: Append to transcript
             if is_final:
-                session['final_transcript'] += text + ' '
+                session.final_transcript += text + ' '
                 self.socketio.emit('speech_final', {
                     'text': text,
-                    'full_transcript': session['final_transcript']
+                    'full_transcript': session.final_transcript
                 }, room=sid)
             else:
                 self.socketio.emit('speech_interim', {
                     'text': text,
-                    'full_transcript': session['final_transcript'] + text
+                    'full_transcript': session.final_transcript + text
                 }, room=sid)
                 
         else:
             # Task Mode
-            if not session['is_awake']:
+            if not session.is_awake:
                 # Check for wake word
                 lower_text = text.lower()
                 wake_word_found = False
                 command_part = ""
                 
-                if 'hey jarvis' in lower_text:
-                    wake_word_found = True
-                    parts = lower_text.split('hey jarvis', 1)
-                    if len(parts) > 1:
-                        command_part = parts[1].strip()
-                elif 'hello jarvis' in lower_text:
-                    wake_word_found = True
-                    parts = lower_text.split('hello jarvis', 1)
-                    if len(parts) > 1:
-                        command_part = parts[1].strip()
+                for phrase in WAKE_PHRASES:
+                    if phrase in lower_text:
+                        wake_word_found = True
+                        command_part = lower_text.split(phrase, 1)[1].strip()
+                        break
                 
                 if wake_word_found:
                     logger.info(f"Wake word detected! Command part: '{command_part}'")
@@ -364,7 +657,14 @@ class SpeechService:
                         self._reset_no_input_timer(sid)
                         
             else:
-                # Process command
+                # Process command (drop the wake phrase if the spotter woke us on this utterance)
+                lower_text = text.lower()
+                for phrase in WAKE_PHRASES:
+                    if phrase in lower_text:
+                        text = lower_text.split(phrase, 1)[1].strip()
+                        break
+                if not text:
+                    return
                 self.socketio.emit('speech_final', {'text': text}, room=sid)
                 
                 # Reset silence timer
@@ -374,78 +674,82 @@ class SpeechService:
     
     def _activate_task_mode(self, sid):
         """Activate task mode (awake state)"""
-        if sid not in self.sessions:
+        session = self._session(sid)
+        if session is None:
             return
         
-        session = self.sessions[sid]
-        session['is_awake'] = True
-        
-        self.socketio.emit('wake_word_detected', room=sid)
-        
-        # Start no input timer (5s)
-        self._reset_no_input_timer(sid)
+        with session.lock:
+            session.is_awake = True
+            
+            self.socketio.emit('wake_word_detected', room=sid)
+            
+            # Start no input timer (5s)
+            self._reset_no_input_timer(sid)
     
     def _deactivate_task_mode(self, sid):
         """Deactivate task mode (sleep)"""
-        if sid not in self.sessions:
+        session = self._session(sid)
+        if session is None:
             return
         
-        session = self.sessions[sid]
-        session['is_awake'] = False
-        
-        # Cancel timers
-        if session['silence_timer']:
-            session['silence_timer'].cancel()
-            session['silence_timer'] = None
-        if session['no_input_timer']:
-            session['no_input_timer'].cancel()
-            session['no_input_timer'] = None
+        with session.lock:
+            session.is_awake = False
+            
+            # Cancel timers
+            if session.silence_timer:
+                session.silence_timer.cancel()
+                session.silence_timer = None
+            if session.no_input_timer:
+                session.no_input_timer.cancel()
+                session.no_input_timer = None
         
         self.socketio.emit('task_mode_sleep', room=sid)
     
     def _reset_silence_timer(self, sid):
         """Reset auto-send timer (3s in Task Mode)"""
-        if sid not in self.sessions:
+        session = self._session(sid)
+        if session is None:
             return
         
-        session = self.sessions[sid]
-        
-        # Cancel existing timer
-        if session['silence_timer']:
-            session['silence_timer'].cancel()
-        
         # Start new timer
         def on_silence():
             logger.info(f"Silence timeout for {sid}")
             self.socketio.emit('silence_timeout', room=sid)
             self._deactivate_task_mode(sid)
         
-        session['silence_timer'] = threading.Timer(3.0, on_silence)
-        session['silence_timer'].start()
+        with session.lock:
+            # Cancel existing timer
+            if session.silence_timer:
+                session.silence_timer.cancel()
+            session.silence_timer = self.timers.schedule(3.0, on_silence)
     
     def _reset_no_input_timer(self, sid):
         """Reset no-input timer (5s in Task Mode)"""
-        if sid not in self.sessions:
+        session = self._session(sid)
+        if session is None:
             return
         
-        session = self.sessions[sid]
-        
-        # Cancel existing timer
-        if session['no_input_timer']:
-            session['no_input_timer'].cancel()
-        
         # Start new timer
         def on_no_input():
             logger.info(f"No input timeout for {sid}")
             self._deactivate_task_mode(sid)
         
-        session['no_input_timer'] = threading.Timer(5.0, on_no_input)
-        session['no_input_timer'].start()
+        with session.lock:
+            # Cancel existing timer
+            if session.no_input_timer:
+                session.no_input_timer.cancel()
+            session.no_input_timer = self.timers.schedule(5.0, on_no_input)
     
     def manual_wake(self, sid):
         """Manually wake up task mode (mic button click)"""
+        session = self._session(sid)
+        if session:
+            session.touch()
         self._activate_task_mode(sid)
     
     def manual_sleep(self, sid):
         """Manually sleep task mode (mic button click)"""
+        session = self._session(sid)
+        if session:
+            session.touch()
         self._deactivate_task_mode(sid)
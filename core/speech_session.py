@@ -0,0 +1,73 @@
+"""
+Speech Session State for JARVIS
+Per-client state of a voice input session, with locks that guard it
+against the Socket.IO handler, timer and recognition worker threads
+"""
+import threading
+import time
+
+
+class SpeechSession:
+    """State of one client's speech session.
+
+    ``lock`` (re-entrant) must be held to change the session from any
+    thread, and only briefly. ``decode_lock`` serializes the decoder and
+    VAD work, which can wait on ffmpeg; take it before ``lock``, never
+    the other way round, and never on the timer wheel thread.
+    ``last_activity`` is refreshed by ``touch()`` on every client request
+    and is what the idle reaper looks at.
+    """
+
+    __slots__ = (
+        'sid', 'lock', 'decode_lock', 'mode', 'is_listening', 'is_awake', 'final_transcript',
+        'silence_timer', 'no_input_timer', 'process_timer',
+        'last_speech_time', 'last_process_time', 'created_at', 'last_activity',
+        'decoder', 'vad', 'utterance_seq', 'partial_mark', 'partial',
+        'received_bytes', 'dropped_bytes', 'over_limit', 'closed',
+    )
+
+    def __init__(self, sid, vad=None):
+        now = time.time()
+        self.sid = sid
+        self.lock = threading.RLock()
+        self.decode_lock = threading.Lock()
+        self.mode = 'ai'  # 'ai' or 'task'
+        self.is_listening = False
+        self.is_awake = False  # Task mode state
+        self.final_transcript = ''  # AI mode accumulated text
+        self.silence_timer = None
+        self.no_input_timer = None
+        self.process_timer = None  # Timer for periodic processing
+        self.last_speech_time = None
+        self.last_process_time = now  # Track processing intervals
+        self.created_at = now
+        self.last_activity = now
+        self.decoder = None  # Persistent WebM -> PCM decoder (created on first chunk)
+        self.vad = vad
+        self.utterance_seq = 0  # bumped whenever an utterance is finalized
+        self.partial_mark = 0  # utterance bytes covered by the last interim window
+        self.partial = None  # (utterance_seq, IncrementalTranscript)
+        self.received_bytes = 0  # encoded audio received from the client
+        self.dropped_bytes = 0  # encoded audio refused over the memory ceiling
+        self.over_limit = False
+        self.closed = False
+
+    def touch(self):
+        self.last_activity = time.time()
+
+    def idle_seconds(self, now=None):
+        return (now or time.time()) - self.last_activity
+
+    def cancel_timers(self):
+        for name in ('silence_timer', 'no_input_timer', 'process_timer'):
+            timer = getattr(self, name)
+            if timer:
+                timer.cancel()
+                setattr(self, name, None)
+
+    def buffered_bytes(self):
+        """PCM held by the decoder and the open VAD utterance"""
+        held = self.decoder.buffered() if self.decoder else 0
+        if self.vad:
+            held += self.vad.buffered()
+        return held
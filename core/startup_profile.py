@@ -0,0 +1,104 @@
+"""
+Startup Profiling for JARVIS
+``python Jarvis.py --profile-startup`` starts the server under
+``-X importtime`` and reports the slowest imports and the time until it
+answers its first request
+"""
+import os
+import re
+import sys
+import time
+import socket
+import threading
+import subprocess
+import urllib.request
+
+# Budget for importing Jarvis.py (app, engine, services), checked by tests/test_startup.py
+STARTUP_TARGET_MS = 1000
+# Loaded on first use or by the background warm-up, never while the server starts
+LAZY_MODULES = ('google.generativeai', 'wikipedia', 'speech_recognition', 'pydub', 'psutil', 'pyttsx3')
+
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def parse_importtime(output):
+    """``[(module, self_ms, cumulative_ms, depth)]`` from ``python -X importtime`` output"""
+    imports = []
+    for line in output.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            imports.append((m.group(4), int(m.group(1)) / 1000, int(m.group(2)) / 1000, len(m.group(3)) // 2))
+    return imports
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def profile(script, timeout=60.0):
+    """Start ``script`` as a server.
+
+    Returns ``(first_request_ms, warm_up_ms, imports)``; the times are
+    since launch, None if not reached within ``timeout``.
+    """
+    port = _free_port()
+    env = dict(os.environ, JARVIS_HOST='127.0.0.1', JARVIS_PORT=str(port), JARVIS_DEBUG='0')
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime', script], env=env, cwd=os.path.dirname(script),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace')
+    lines = []
+    warmed = {}
+
+    def read():
+        for line in proc.stderr:
+            lines.append(line)
+            if 'Warmed up' in line or 'Warm-up of' in line:
+                warmed.setdefault('ms', (time.perf_counter() - start) * 1000)
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    first_request = None
+    try:
+        while proc.poll() is None and time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1) as response:
+                    response.read()
+                first_request = (time.perf_counter() - start) * 1000
+                break
+            except OSError:
+                time.sleep(0.01)
+        # The background warm-up (heavy imports, Gemini connection) finishes after the server is up
+        while first_request and 'ms' not in warmed and proc.poll() is None and time.perf_counter() - start < timeout:
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        reader.join(timeout=5)
+    return first_request, warmed.get('ms'), parse_importtime(''.join(lines))
+
+
+def main(script, top=15):
+    first_request, warm_up, imports = profile(script)
+    roots = sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])
+    print("--------------------------------------------------")
+    print(f"JARVIS startup profile ({os.getenv('JARVIS_ASYNC_MODE', 'threading')} mode)")
+    if first_request is None:
+        print("  The server did not answer; run it without --profile-startup to see why.")
+        return 1
+    print(f"  time to first request   {first_request:8.0f} ms")
+    if warm_up is not None:
+        print(f"  background warm-up done {warm_up:8.0f} ms")
+    print(f"  top-level imports       {sum(i[2] for i in roots):8.0f} ms ({len(imports)} modules)")
+    print("  slowest imports (cumulative, then own time):")
+    for name, own, cumulative, _ in roots[:top]:
+        print(f"    {cumulative:8.1f} ms {own:8.1f} ms  {name}")
+    loaded = {name for name, _, _, _ in imports}
+    for name in LAZY_MODULES:
+        state = 'loaded in the background' if name in loaded else 'not loaded'
+        print(f"  deferred  {name:22s} {state}")
+    print("--------------------------------------------------")
+    return 0
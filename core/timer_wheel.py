@@ -0,0 +1,153 @@
+"""
+Timer Wheel for JARVIS
+One thread that runs every session timeout (silence, no-input, audio
+processing) instead of a threading.Timer thread per timeout
+"""
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """A scheduled callback; ``cancel()`` stops it if it hasn't fired yet"""
+
+    __slots__ = ('deadline', 'callback', 'args', 'rounds', 'slot', 'cancelled', '_wheel')
+
+    def __init__(self, wheel, deadline, callback, args):
+        self._wheel = wheel
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.rounds = 0
+        self.slot = None
+        self.cancelled = False
+
+    def cancel(self):
+        self._wheel._cancel(self)
+
+
+class TimerWheel:
+    """Hashed timer wheel driven by a single daemon thread.
+
+    Time is divided into ``tick``-second ticks and timers are hashed into
+    ``slots`` buckets by the tick they are due; a timer further away than
+    one revolution carries a round count. Scheduling and cancelling are
+    O(1); each tick only looks at one bucket. Timers fire up to one tick
+    late and never early.
+
+    Callbacks run on the wheel thread, so they must be short; hand longer
+    work off to a worker.
+    """
+
+    def __init__(self, tick=0.01, slots=512, name='timer-wheel'):
+        self.tick = tick
+        self._slots = [set() for _ in range(slots)]
+        self._origin = time.monotonic()
+        self._next_tick = 0  # next tick to process
+        self._count = 0
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+        # Stats
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+        self._late_total = 0.0
+        self._late_max = 0.0
+
+    def _tick_at(self, when):
+        return int((when - self._origin) / self.tick)
+
+    def schedule(self, delay, callback, *args):
+        """Run ``callback(*args)`` after ``delay`` seconds; returns a TimerHandle"""
+        deadline = time.monotonic() + max(0.0, delay)
+        handle = TimerHandle(self, deadline, callback, args)
+        with self._cond:
+            if not self._count:
+                # Skip the ticks that passed while the wheel was idle
+                self._next_tick = max(self._next_tick, self._tick_at(time.monotonic()))
+            # Due on the first tick that starts at or after the deadline
+            target = max(self._next_tick, -int(-(deadline - self._origin) // self.tick))
+            slots = len(self._slots)
+            handle.rounds = (target - self._next_tick) // slots
+            handle.slot = self._slots[target % slots]
+            handle.slot.add(handle)
+            self._count += 1
+            self.scheduled += 1
+            if self._count == 1:
+                self._cond.notify()
+        return handle
+
+    def _cancel(self, handle):
+        with self._cond:
+            if handle.slot is not None and not handle.cancelled:
+                handle.slot.discard(handle)
+                handle.slot = None
+                self._count -= 1
+                self.cancelled += 1
+            handle.cancelled = True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._count:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                due = self._tick_at(time.monotonic())
+                expired = []
+                slots = len(self._slots)
+                while self._next_tick <= due:
+                    slot = self._slots[self._next_tick % slots]
+                    for handle in list(slot):
+                        if handle.rounds:
+                            handle.rounds -= 1
+                        else:
+                            slot.discard(handle)
+                            handle.slot = None
+                            expired.append(handle)
+                    self._next_tick += 1
+                self._count -= len(expired)
+                self._next_tick = max(self._next_tick, due + 1)
+                wait = self._origin + self._next_tick * self.tick - time.monotonic()
+
+            now = time.monotonic()
+            for handle in expired:
+                if handle.cancelled:
+                    continue
+                late = now - handle.deadline
+                self._late_total += late
+                self._late_max = max(self._late_max, late)
+                self.fired += 1
+                try:
+                    handle.callback(*handle.args)
+                except Exception as e:
+                    logger.error(f"Timer callback failed: {e}", exc_info=True)
+
+            if wait > 0:
+                with self._cond:
+                    if self._running and self._count:
+                        self._cond.wait(wait)
+
+    def pending(self):
+        with self._cond:
+            return self._count
+
+    def stats(self):
+        return {
+            'pending': self.pending(),
+            'scheduled': self.scheduled,
+            'fired': self.fired,
+            'cancelled': self.cancelled,
+            'avg_late_ms': round(self._late_total / self.fired * 1000, 2) if self.fired else 0.0,
+            'max_late_ms': round(self._late_max * 1000, 2),
+        }
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
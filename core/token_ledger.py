@@ -0,0 +1,243 @@
+"""
+Token Usage Ledger for JARVIS
+Records tokens per session, per model and per time bucket, prefers the
+counts reported by the model, enforces per-session budgets and persists
+the totals in batches
+"""
+import os
+import re
+import json
+import math
+import time
+import threading
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text):
+    """Local token estimate for when the model reports no usage.
+
+    Words of up to 6 letters are one token and longer ones one per 4
+    letters (rounded up), digits cost one per 3, and every punctuation
+    mark or symbol one token.
+    """
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        if piece[0].isalpha():
+            tokens += 1 if len(piece) <= 6 else math.ceil(len(piece) / 4)
+        elif piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        else:
+            tokens += 1
+    return tokens
+
+
+def _totals():
+    return {'prompt': 0, 'output': 0, 'total': 0, 'requests': 0}
+
+
+def _add(totals, prompt, output):
+    totals['prompt'] += prompt
+    totals['output'] += output
+    totals['total'] += prompt + output
+    totals['requests'] += 1
+
+
+class BudgetExceeded(Exception):
+    """A request would take a session past its token budget"""
+
+
+class TokenLedger:
+    """Aggregated token usage.
+
+    Totals are kept overall, per session (in memory only), per model and
+    per ``bucket_seconds`` time bucket (the last ``max_buckets``). With
+    ``path`` set, the persistent totals are loaded at startup and written
+    back by ``flush()``, which only touches the disk when requests were
+    recorded since the previous flush. ``session_budget`` (0 = no limit)
+    caps the tokens one client may use per ``budget_window`` seconds.
+    Budgets are kept per budget key (the client's address in Jarvis), not
+    per session, so reconnecting does not reset them; ``drop_session()``
+    only forgets the session's totals. ``reserve()`` checks the budget
+    before a request is sent and holds the prompt's tokens until
+    ``record()`` settles them (or ``release()`` returns them), so
+    concurrent requests can't all pass the same check.
+    """
+
+    def __init__(self, path=None, session_budget=0, bucket_seconds=3600, max_buckets=168, budget_window=86400):
+        self.path = path
+        self.session_budget = session_budget
+        self.budget_window = budget_window
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.totals = _totals()
+        self.models = {}
+        self.buckets = OrderedDict()
+        self.sessions = {}
+        self.budgets = {}  # budget key -> {'started', 'spent', 'reserved'}
+        self.reported = 0  # requests counted from model usage metadata
+        self.estimated = 0  # requests counted with the local estimator
+        self.rejected = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    @property
+    def total(self):
+        return self.totals['total']
+
+    def session_total(self, sid):
+        totals = self.sessions.get(sid)
+        return totals['total'] if totals else 0
+
+    def _budget(self, key, now=None):
+        """The budget entry for ``key``, started afresh once its window has passed"""
+        now = now or time.time()
+        budget = self.budgets.get(key)
+        if budget is None or (now - budget['started'] >= self.budget_window and not budget['reserved']):
+            budget = self.budgets[key] = {'started': now, 'spent': 0, 'reserved': 0}
+        return budget
+
+    def remaining(self, key, now=None):
+        """Tokens ``key`` may still use (less what is reserved), or None without a budget"""
+        if not self.session_budget:
+            return None
+        with self._lock:
+            budget = self._budget(key, now)
+            return max(0, self.session_budget - budget['spent'] - budget['reserved'])
+
+    def reserve(self, key, prompt_tokens, now=None):
+        """Hold ``prompt_tokens`` of ``key``'s budget for a request; returns the tokens held.
+
+        Raises BudgetExceeded if they would pass the budget. Pass the
+        result to ``record(reserved=...)`` or ``release()``.
+        """
+        if not self.session_budget:
+            return 0
+        with self._lock:
+            budget = self._budget(key, now)
+            remaining = max(0, self.session_budget - budget['spent'] - budget['reserved'])
+            if prompt_tokens > remaining:
+                self.rejected += 1
+                raise BudgetExceeded(f"Token budget exhausted: {remaining} of {self.session_budget} tokens left "
+                                     f"for this client, the request needs about {prompt_tokens}")
+            budget['reserved'] += prompt_tokens
+        return prompt_tokens
+
+    def release(self, key, reserved):
+        """Return tokens held by ``reserve()`` for a request that was not sent or failed"""
+        if reserved:
+            with self._lock:
+                self._release(key, reserved)
+
+    def _release(self, key, reserved):
+        budget = self.budgets.get(key)
+        if budget is not None:
+            budget['reserved'] = max(0, budget['reserved'] - reserved)
+
+    def record(self, sid, model_name, prompt_tokens, output_tokens, reported=True, now=None,
+               budget_key=None, reserved=0):
+        """Add one request's usage and charge it to ``budget_key`` (default: ``sid``),
+        settling the ``reserved`` tokens held for it"""
+        now = now or time.time()
+        bucket = int(now // self.bucket_seconds * self.bucket_seconds)
+        budget_key = sid if budget_key is None else budget_key
+        with self._lock:
+            if reserved:
+                self._release(budget_key, reserved)
+            if self.session_budget and budget_key is not None:
+                self._budget(budget_key, now)['spent'] += prompt_tokens + output_tokens
+            _add(self.totals, prompt_tokens, output_tokens)
+            _add(self.models.setdefault(model_name, _totals()), prompt_tokens, output_tokens)
+            if sid is not None:
+                _add(self.sessions.setdefault(sid, _totals()), prompt_tokens, output_tokens)
+            if bucket not in self.buckets:
+                self.buckets[bucket] = _totals()
+                while len(self.buckets) > self.max_buckets:
+                    self.buckets.popitem(last=False)
+            _add(self.buckets[bucket], prompt_tokens, output_tokens)
+            if reported:
+                self.reported += 1
+            else:
+                self.estimated += 1
+            self._pending += 1
+
+    def drop_session(self, sid):
+        """Forget a session's totals; budgets stay until their window passes"""
+        with self._lock:
+            self.sessions.pop(sid, None)
+
+    def prune_budgets(self, now=None):
+        """Drop budget entries whose window has passed"""
+        now = now or time.time()
+        with self._lock:
+            expired = [key for key, budget in self.budgets.items()
+                       if now - budget['started'] >= self.budget_window and not budget['reserved']]
+            for key in expired:
+                del self.budgets[key]
+        return len(expired)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load token ledger from {self.path}: {e}")
+            return False
+        with self._lock:
+            self.totals.update(data.get('totals', {}))
+            self.models = data.get('models', {})
+            self.buckets = OrderedDict((int(k), v) for k, v in sorted(data.get('buckets', {}).items(), key=lambda kv: int(kv[0])))
+        return True
+
+    def flush(self):
+        """Write the persistent totals if requests were recorded since the last flush"""
+        if not self.path or not self._pending:
+            return 0
+        with self._lock:
+            batch, self._pending = self._pending, 0
+            data = {'version': 1, 'totals': dict(self.totals),
+                    'models': {name: dict(t) for name, t in self.models.items()},
+                    'buckets': {str(k): dict(v) for k, v in self.buckets.items()}}
+        tmp = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            with self._lock:
+                self._pending += batch
+            logger.warning(f"Could not write token ledger to {self.path}: {e}")
+            return 0
+        return batch
+
+    def stats(self):
+        bucket = int(time.time() // self.bucket_seconds * self.bucket_seconds)
+        with self._lock:
+            current = self.buckets.get(bucket)
+            return {
+                'total': self.totals['total'],
+                'prompt': self.totals['prompt'],
+                'output': self.totals['output'],
+                'requests': self.totals['requests'],
+                'models': {name: t['total'] for name, t in self.models.items()},
+                'current_bucket': current['total'] if current else 0,
+                'sessions': len(self.sessions),
+                'budgets': len(self.budgets),
+                'reported': self.reported,
+                'estimated': self.estimated,
+                'rejected': self.rejected,
+                'session_budget': self.session_budget,
+            }
@@ -0,0 +1,153 @@
+"""
+Voice Activity Detection for JARVIS
+Energy / zero-crossing speech detector over 16 kHz PCM that drops silence
+before it reaches the recognizer and groups speech into utterances
+"""
+import logging
+from collections import deque
+
+import numpy as np
+
+from .audio_decoder import AudioBuffer, SAMPLE_RATE, SAMPLE_WIDTH, BYTES_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    """Per-session VAD and utterance segmenter.
+
+    PCM is split into fixed frames; frame energy (dBFS) and zero-crossing
+    rate are computed for a whole window at once with NumPy. A frame counts
+    as speech when its energy clears an adaptive noise floor by
+    ``margin_db`` (never below ``min_energy_db``) and its zero-crossing rate is below ``zcr_max`` (broadband
+    hiss crosses zero on almost every other sample).
+
+    An utterance starts after ``min_speech_ms`` of speech (with
+    ``preroll_ms`` of audio kept from before the onset) and ends after
+    ``trailing_silence_ms`` of silence, or when it reaches
+    ``max_utterance_s``.
+    """
+
+    def __init__(self, frame_ms=30, trailing_silence_ms=600, min_speech_ms=90,
+                 preroll_ms=210, max_utterance_s=15.0, min_energy_db=-50.0,
+                 margin_db=12.0, zcr_max=0.45, initial_noise_db=-60.0):
+        self.frame_samples = SAMPLE_RATE * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        self.trailing_frames = max(1, trailing_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_utterance_bytes = int(max_utterance_s * BYTES_PER_SECOND)
+        self.min_energy_db = min_energy_db
+        self.margin_db = margin_db
+        self.zcr_max = zcr_max
+
+        self.noise_db = initial_noise_db
+        self._pending = b''  # trailing partial frame from the previous window
+        self._preroll = deque(maxlen=max(self.min_speech_frames, preroll_ms // frame_ms))
+        self._utterance = AudioBuffer()
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+        # Stats
+        self.frames = 0
+        self.speech_frames = 0
+        self.utterances = 0
+
+    @property
+    def in_speech(self):
+        return self._in_speech
+
+    def classify(self, samples):
+        """Return (is_speech, energy_db) arrays for whole frames of int16 ``samples``"""
+        count = len(samples) // self.frame_samples
+        frames = samples[:count * self.frame_samples].reshape(count, self.frame_samples)
+        frames = frames.astype(np.float32) / 32768.0
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20.0 * np.log10(rms + 1e-9)
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+        # Track the noise floor from the quietest frames of each window
+        if count:
+            quiet = float(np.percentile(energy_db, 10))
+            if quiet < self.noise_db:
+                self.noise_db = quiet
+            elif not self._in_speech:
+                # Rise slowly, and never while an utterance is open
+                self.noise_db = 0.95 * self.noise_db + 0.05 * quiet
+
+        threshold = max(self.min_energy_db, self.noise_db + self.margin_db)
+        return (energy_db > threshold) & (zcr < self.zcr_max), energy_db
+
+    def process(self, pcm):
+        """Feed a PCM window and return the utterances it completed.
+
+        Utterances are returned as ``memoryview`` objects; release them when
+        done. Returns an empty list for windows that hold no speech.
+        """
+        data = self._pending + bytes(pcm) if self._pending else pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = bytes(data[usable:])
+        if not usable:
+            return []
+
+        samples = np.frombuffer(data, dtype='<i2', count=usable // SAMPLE_WIDTH)
+        is_speech, _ = self.classify(samples)
+        del samples  # drop the buffer export so the caller can release pcm
+        self.frames += len(is_speech)
+        self.speech_frames += int(np.count_nonzero(is_speech))
+
+        completed = []
+        with memoryview(data) as view:
+            for i, speech in enumerate(is_speech.tolist()):
+                frame = view[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+                if not self._in_speech:
+                    self._preroll.append(bytes(frame))
+                    self._speech_run = self._speech_run + 1 if speech else 0
+                    if self._speech_run >= self.min_speech_frames:
+                        self._in_speech = True
+                        self._silence_run = 0
+                        for held in self._preroll:
+                            self._utterance.write(held)
+                        self._preroll.clear()
+                    continue
+
+                self._utterance.write(frame)
+                self._silence_run = 0 if speech else self._silence_run + 1
+                if self._silence_run >= self.trailing_frames or len(self._utterance) >= self.max_utterance_bytes:
+                    completed.append(self._end_utterance())
+        return completed
+
+    def utterance_tail(self, size):
+        """Return ``(pcm, offset)``: a copy of the last ``size`` bytes of the
+        utterance in progress and the byte offset where it starts"""
+        length = self.utterance_bytes
+        if not length:
+            return b'', 0
+        return self._utterance.tail(size), max(0, length - size)
+
+    @property
+    def utterance_bytes(self):
+        """Bytes of audio in the utterance in progress"""
+        return len(self._utterance) if self._in_speech else 0
+
+    def buffered(self):
+        """Bytes held for the utterance in progress (including pre-roll)"""
+        return len(self._pending) + len(self._utterance) + sum(len(f) for f in self._preroll)
+
+    def _end_utterance(self):
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self.utterances += 1
+        return self._utterance.take()
+
+    def flush(self):
+        """Close any utterance in progress (e.g. when listening stops)"""
+        self._pending = b''
+        self._preroll.clear()
+        if self._in_speech and len(self._utterance):
+            return self._end_utterance()
+        self._in_speech = False
+        self._speech_run = 0
+        return None
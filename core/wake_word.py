@@ -0,0 +1,291 @@
+"""
+Wake Word Spotter for JARVIS
+Local "hey jarvis" detector (MFCC features + template matching with DTW)
+that gates the full recognizer while Task Mode is asleep
+"""
+import os
+import glob
+import wave
+import threading
+import time
+import logging
+
+import numpy as np
+
+from .audio_decoder import SAMPLE_RATE, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+WAKE_PHRASES = ('hey jarvis', 'hello jarvis')
+
+# WakeWordSpotter.check verdicts
+WAKE = 'wake'
+UNSURE = 'unsure'  # near miss: let the recognizer decide
+MISS = 'miss'
+
+# MFCC configuration (25 ms frames, 10 ms hop)
+FRAME_LEN = 400
+HOP_LEN = 160
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+
+
+def _mel_filterbank():
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(20.0), hz_to_mel(SAMPLE_RATE / 2), N_MELS + 2)
+    bins = np.floor((N_FFT + 1) * mel_to_hz(mels) / SAMPLE_RATE).astype(int)
+    bank = np.zeros((N_MELS, N_FFT // 2 + 1), dtype=np.float32)
+    for m in range(1, N_MELS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+def _dct_matrix():
+    n = np.arange(N_MELS)
+    k = np.arange(N_MFCC)[:, None]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * N_MELS)) * np.sqrt(2.0 / N_MELS)).astype(np.float32)
+
+
+_MEL_BANK = _mel_filterbank()
+_DCT = _dct_matrix()
+_WINDOW = np.hamming(FRAME_LEN).astype(np.float32)
+
+
+def mfcc(pcm):
+    """Return MFCCs c1..c12 (frames x N_MFCC-1) for 16 kHz s16le PCM"""
+    samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+    if len(samples) < FRAME_LEN:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+    samples = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])  # pre-emphasis
+    count = 1 + (len(samples) - FRAME_LEN) // HOP_LEN
+    index = np.arange(FRAME_LEN)[None, :] + HOP_LEN * np.arange(count)[:, None]
+    frames = samples[index] * _WINDOW
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    energies = np.log(power @ _MEL_BANK.T + 1e-10)
+    # c0 tracks loudness only; dropping it makes matching level-independent.
+    # No per-utterance mean normalization: the query may hold a command after
+    # the wake phrase, which would shift the mean away from the templates.
+    return (energies @ _DCT.T)[:, 1:]
+
+
+def trim_silence(pcm, floor_db=35.0):
+    """Strip leading/trailing 10 ms blocks more than ``floor_db`` below the peak"""
+    samples = np.frombuffer(pcm, dtype='<i2')
+    count = len(samples) // HOP_LEN
+    if not count:
+        return pcm
+    blocks = samples[:count * HOP_LEN].reshape(count, HOP_LEN).astype(np.float32)
+    energy_db = 10.0 * np.log10(np.mean(blocks * blocks, axis=1) + 1e-9)
+    loud = np.flatnonzero(energy_db > energy_db.max() - floor_db)
+    start, end = loud[0] * HOP_LEN, (loud[-1] + 1) * HOP_LEN
+    return samples[start:end].tobytes()
+
+
+def subsequence_dtw(template, query):
+    """Best normalized DTW cost of ``template`` against any stretch of ``query``.
+
+    Uses the (1,1), (1,2), (2,1) step pattern so each template row can be
+    computed for all query frames at once; warping is limited to 2x.
+    """
+    m, n = len(template), len(query)
+    if m == 0 or n < (m + 1) // 2:
+        return np.inf
+    cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+    inf = np.inf
+    prev2 = np.full(n, inf)
+    prev = cost[0].copy()  # free start anywhere in the query
+    for i in range(1, m):
+        row = np.full(n, inf)
+        best = prev[:-1].copy()                            # (1,1)
+        best[1:] = np.minimum(best[1:], prev[:-2])          # (1,2)
+        if i > 1:
+            best = np.minimum(best, prev2[:-1])             # (2,1)
+        row[1:] = cost[i, 1:] + best
+        prev2, prev = prev, row
+    return float(prev.min() / m)
+
+
+def template_features(pcm):
+    """MFCC sequence of a wake phrase recording, without its leading and trailing silence"""
+    return mfcc(trim_silence(pcm))
+
+
+class WakeWordSpotter:
+    """Template-matching wake word detector.
+
+    Templates are MFCC sequences of the wake phrase. Shared ones (key
+    ``None``) are loaded from ``template_dir`` (16 kHz mono WAV files
+    the operator recorded). Templates enrolled at runtime, from audio the
+    recognizer confirmed as just the wake phrase, belong to the session
+    (``key``) that spoke it: one client's voice never wakes, or skews the
+    threshold of, another. ``check`` matches a session against its own
+    templates plus the shared ones. Until a session has any,
+    ``ready_for`` is False and callers fall back to the full recognizer.
+    The MFCC and DTW work goes through ``compute(fn, *args)``
+    (``BlockingExecutor.compute`` keeps it off the eventlet hub); by
+    default it runs in the caller's thread.
+    """
+
+    DEFAULT_THRESHOLD = 4.0  # used until there are two templates to calibrate from
+
+    def __init__(self, template_dir=None, threshold=None, max_templates=5, search_seconds=3.0,
+                 unsure_margin=1.5, compute=None):
+        self.template_dir = template_dir
+        self._compute = compute or (lambda fn, *args: fn(*args))
+        self.fixed_threshold = threshold
+        self.max_templates = max_templates
+        self.unsure_margin = unsure_margin
+        self.search_frames = int(search_seconds * SAMPLE_RATE / HOP_LEN)
+        self._sets = {}  # key -> (templates, threshold); None holds the shared templates
+        self._own = {}  # key -> templates enrolled by that session
+        self._lock = threading.Lock()
+
+        # Stats
+        self.checks = 0
+        self.detections = 0
+        self.unsure = 0
+        self.cpu_seconds = 0.0
+
+        if template_dir:
+            for path in sorted(glob.glob(os.path.join(template_dir, '*.wav'))):
+                try:
+                    self._add(self._read_wav(path), None)
+                except Exception as e:
+                    logger.warning(f"Skipping wake word template {path}: {e}")
+            if self._sets:
+                logger.info(f"Loaded {len(self._sets[None][0])} wake word templates from {template_dir}")
+
+    @property
+    def ready(self):
+        """True if there are shared templates"""
+        return None in self._sets
+
+    def ready_for(self, key):
+        return key in self._sets or None in self._sets
+
+    @property
+    def threshold(self):
+        return self._set(None)[1]
+
+    def _set(self, key):
+        return self._sets.get(key) or self._sets.get(None) or ((), self.fixed_threshold or self.DEFAULT_THRESHOLD)
+
+    def _derive_threshold(self, templates):
+        """Distance below which a match counts as the wake word.
+
+        Derived from the spread between templates when there are several,
+        so it scales with the speaker and microphone.
+        """
+        if self.fixed_threshold is not None:
+            return self.fixed_threshold
+        pairs = [subsequence_dtw(a, b) for i, a in enumerate(templates) for b in templates[i + 1:]]
+        finite = [p for p in pairs if np.isfinite(p)]
+        return 1.5 * float(np.median(finite)) if finite else self.DEFAULT_THRESHOLD
+
+    def _add(self, pcm, key):
+        features = self._compute(template_features, pcm)
+        if len(features) < 20:
+            return False
+        with self._lock:
+            shared = list(self._sets[None][0]) if None in self._sets else []
+            if key is None:
+                shared = (shared + [features])[-self.max_templates:]
+                own = None
+            else:
+                own = (self._own.get(key, []) + [features])[-self.max_templates:]
+        templates = shared if own is None else shared + own
+        threshold = self._compute(self._derive_threshold, templates)
+        with self._lock:
+            if own is not None:
+                self._own[key] = own
+            self._sets[key] = (templates, threshold)
+        return True
+
+    def score(self, pcm, key=None):
+        """Lowest template distance within the first ``search_seconds`` of ``pcm``"""
+        query = mfcc(pcm)[:self.search_frames]
+        templates = self._set(key)[0]
+        return min((subsequence_dtw(t, query) for t in templates), default=np.inf)
+
+    def check(self, pcm, key=None):
+        """``WAKE`` if the wake word occurs in the first ``search_seconds`` of ``pcm``.
+
+        ``UNSURE`` when the best distance is within ``unsure_margin`` times
+        the threshold (the recognizer should confirm), else ``MISS``.
+        """
+        start = time.process_time()
+        threshold = self._set(key)[1]
+        distance = self._compute(self.score, pcm, key)
+        if distance <= threshold:
+            verdict = WAKE
+        elif distance <= threshold * self.unsure_margin:
+            verdict = UNSURE
+        else:
+            verdict = MISS
+        with self._lock:
+            self.cpu_seconds += time.process_time() - start
+            self.checks += 1
+            if verdict == WAKE:
+                self.detections += 1
+            elif verdict == UNSURE:
+                self.unsure += 1
+        logger.debug(f"Wake word distance {distance:.2f} (threshold {threshold:.2f}): {verdict}")
+        return verdict
+
+    def detect(self, pcm, key=None):
+        """True if the wake word occurs in the first ``search_seconds`` of ``pcm``"""
+        return self.check(pcm, key) == WAKE
+
+    def enroll(self, pcm, key=None):
+        """Add a confirmed wake-phrase recording as a template of session ``key``.
+
+        Shared templates (``key=None``) are also saved to ``template_dir``.
+        """
+        if not self._add(bytes(pcm), key):
+            return
+        logger.info(f"Enrolled wake word template ({len(self._set(key)[0])} for {key or 'all sessions'})")
+        if self.template_dir and key is None:
+            try:
+                os.makedirs(self.template_dir, exist_ok=True)
+                path = os.path.join(self.template_dir, f"wake_{int(time.time() * 1000)}.wav")
+                with wave.open(path, 'wb') as wav:
+                    wav.setnchannels(1)
+                    wav.setsampwidth(SAMPLE_WIDTH)
+                    wav.setframerate(SAMPLE_RATE)
+                    wav.writeframes(pcm)
+            except OSError as e:
+                logger.warning(f"Could not save wake word template: {e}")
+
+    def forget(self, key):
+        """Drop the templates of a session that ended"""
+        with self._lock:
+            self._own.pop(key, None)
+            if key is not None:
+                self._sets.pop(key, None)
+
+    @staticmethod
+    def _read_wav(path):
+        with wave.open(path, 'rb') as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError("expected 16 kHz mono 16-bit WAV")
+            return wav.readframes(wav.getnframes())
+
+    def stats(self):
+        return {
+            'templates': len(self._sets[None][0]) if None in self._sets else 0,
+            'sessions_enrolled': len(self._own),
+            'checks': self.checks,
+            'detections': self.detections,
+            'unsure': self.unsure,
+            'avg_cpu_ms': round(self.cpu_seconds / self.checks * 1000, 2) if self.checks else 0.0,
+        }
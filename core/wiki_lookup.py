@@ -0,0 +1,280 @@
+"""
+Wikipedia Lookups for JARVIS
+Cached, deadline-bounded summaries, online through the ``wikipedia``
+package or offline from a local SQLite FTS5 index of article abstracts
+"""
+import os
+import re
+import gzip
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+WIKI_MODES = ('online', 'offline', 'auto')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_WORD = re.compile(r'\w+')
+
+
+class WikiTimeout(Exception):
+    """The online lookup did not finish before the deadline"""
+
+
+def first_sentences(text, sentences):
+    parts = _SENTENCE_END.split(text.strip())
+    return ' '.join(parts[:sentences]) if sentences else text.strip()
+
+
+def _online_summary(query, sentences):
+    import wikipedia
+    return wikipedia.summary(query, sentences=sentences)
+
+
+def build_index(dump_path, index_path, batch=5000):
+    """Build an offline index from a Wikipedia abstracts dump.
+
+    ``dump_path`` is an ``enwiki-*-abstract.xml`` file (optionally
+    ``.gz``) as published on dumps.wikimedia.org. Returns the number of
+    articles indexed.
+    """
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    db = sqlite3.connect(index_path)
+    db.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE pages (id INTEGER PRIMARY KEY, title TEXT NOT NULL COLLATE NOCASE, abstract TEXT NOT NULL);
+        CREATE VIRTUAL TABLE pages_fts USING fts5(title, abstract, content='pages', content_rowid='id');
+    """)
+    opener = gzip.open if dump_path.endswith('.gz') else open
+    rows, count = [], 0
+    with opener(dump_path, 'rb') as fh:
+        for _, element in ElementTree.iterparse(fh, events=('end',)):
+            if element.tag != 'doc':
+                continue
+            title = (element.findtext('title') or '').removeprefix('Wikipedia: ').strip()
+            abstract = (element.findtext('abstract') or '').strip()
+            element.clear()
+            if title and abstract:
+                rows.append((title, abstract))
+            if len(rows) >= batch:
+                db.executemany("INSERT INTO pages (title, abstract) VALUES (?, ?)", rows)
+                count += len(rows)
+                rows = []
+    if rows:
+        db.executemany("INSERT INTO pages (title, abstract) VALUES (?, ?)", rows)
+        count += len(rows)
+    db.executescript("""
+        CREATE INDEX pages_title ON pages (title);
+        INSERT INTO pages_fts (pages_fts) VALUES ('rebuild');
+        INSERT INTO pages_fts (pages_fts) VALUES ('optimize');
+    """)
+    db.commit()
+    db.close()
+    return count
+
+
+class OfflineWikiIndex:
+    """Read-only lookups in an index made by ``build_index``.
+
+    An exact (case-insensitive) title wins, then the best-ranked title
+    containing every query word, then the first abstract containing
+    them all. Each thread gets its own SQLite connection.
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Wikipedia index not found: {path}")
+        self.path = path
+        self._local = threading.local()
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.db = db
+        return db
+
+    def search(self, query):
+        """``(title, abstract)`` of the best article for ``query``, or None"""
+        words = _WORD.findall(query.lower())
+        if not words:
+            return None
+        db = self._db()
+        row = db.execute("SELECT title, abstract FROM pages WHERE title = ? LIMIT 1", (' '.join(words),)).fetchone()
+        if row:
+            return row
+        terms = ' '.join('"' + w.replace('"', '') + '"' for w in words)
+        # Ranking is limited to title hits, which stay few however common the words are
+        row = db.execute(
+            "SELECT pages.title, pages.abstract FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid "
+            "WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts) LIMIT 1", (f"title : ({terms})",)).fetchone()
+        if row:
+            return row
+        # Last resort: the first article (dump order) whose abstract has every word
+        return db.execute(
+            "SELECT pages.title, pages.abstract FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid "
+            "WHERE pages_fts MATCH ? LIMIT 1", (f"abstract : ({terms})",)).fetchone()
+
+
+class _CachedError:
+    """A failure kept in the cache: its type and arguments, not the exception object.
+
+    Re-raising one object on every hit would grow its traceback (and keep
+    the frames it references alive); each hit raises a fresh exception.
+    """
+
+    __slots__ = ('type', 'args', 'message')
+
+    def __init__(self, error):
+        self.type = type(error)
+        self.args = error.args
+        self.message = str(error)
+
+    def exception(self):
+        try:
+            return self.type(*self.args)
+        except Exception:
+            return LookupError(self.message)
+
+
+class WikiLookup:
+    """Summaries for Task Mode's Wikipedia command.
+
+    Results (and, for ``error_ttl`` seconds, failures such as missing or
+    ambiguous pages) are kept in an LRU/TTL cache. ``mode`` picks the
+    source: ``online`` (the ``wikipedia`` package), ``offline`` (an
+    ``OfflineWikiIndex``) or ``auto`` (offline first, online for
+    articles the index doesn't have). Online fetches run on a small
+    thread pool; concurrent lookups of the same query share one fetch,
+    and the caller gives up after ``timeout`` seconds with
+    ``WikiTimeout``. The fetch still completes and fills the cache.
+    """
+
+    def __init__(self, mode='online', index=None, sentences=2, timeout=3.0, max_entries=512, ttl=86400,
+                 error_ttl=600, workers=4, fetch=_online_summary):
+        if mode not in WIKI_MODES:
+            raise ValueError(f"Unknown Wikipedia mode: {mode}")
+        if mode != 'online' and index is None:
+            raise ValueError(f"Wikipedia mode {mode!r} needs an offline index")
+        self.mode = mode
+        self.index = index
+        self.sentences = sentences
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.fetch = fetch
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wiki')
+        self._entries = OrderedDict()  # key -> (expires, summary or _CachedError)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.offline = 0
+        self.online = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(query):
+        return ' '.join(_WORD.findall(query.lower()))
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, query):
+        """Summary text for ``query``.
+
+        Raises ``WikiTimeout`` past the deadline, ``LookupError`` when
+        the offline index has no match (offline mode), and whatever the
+        ``wikipedia`` package raised for missing or ambiguous pages.
+        """
+        key = self._key(query)
+        entry = self._cached(key)
+        if entry is not None:
+            self.hits += 1
+            if isinstance(entry[1], _CachedError):
+                raise entry[1].exception()
+            return entry[1]
+        self.misses += 1
+
+        if self.index is not None:
+            found = self.index.search(key)
+            if found is not None:
+                self.offline += 1
+                summary = first_sentences(found[1], self.sentences)
+                self._store(key, summary, self.ttl)
+                return summary
+            if self.mode == 'offline':
+                error = LookupError(f"No article for {query!r} in the offline index")
+                self._store(key, _CachedError(error), self.error_ttl)
+                raise error
+
+        try:
+            return self.prefetch(query).result(timeout=self.timeout)
+        except FutureTimeout:
+            self.timeouts += 1
+            raise WikiTimeout(f"Wikipedia did not answer within {self.timeout:.0f}s") from None
+
+    def prefetch(self, query):
+        """Start (or join) the online fetch for ``query``; returns its future"""
+        key = self._key(query)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._pool.submit(self._fetch, key, query)
+                self._inflight[key] = future
+        return future
+
+    def _fetch(self, key, query):
+        self.online += 1
+        try:
+            summary = self.fetch(query, self.sentences)
+        except Exception as e:
+            self.errors += 1
+            self._store(key, _CachedError(e), self.error_ttl)
+            raise
+        else:
+            self._store(key, summary, self.ttl)
+            return summary
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'mode': self.mode,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'offline': self.offline,
+            'online': self.online,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+        }
@@ -0,0 +1,33 @@
+"""
+Build the offline Wikipedia index used when JARVIS_WIKI_MODE is offline or auto.
+
+Download an abstracts dump first, e.g.
+https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-abstract.xml.gz
+
+Usage:
+    python scripts/build_wiki_index.py enwiki-latest-abstract.xml.gz [data/wiki_abstracts.db]
+"""
+import os
+import sys
+import argparse
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.wiki_lookup import build_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('dump', help='enwiki-*-abstract.xml[.gz]')
+    parser.add_argument('index', nargs='?', default='data/wiki_abstracts.db')
+    args = parser.parse_args()
+
+    start = time.time()
+    count = build_index(args.dump, args.index)
+    size = os.path.getsize(args.index) / (1024 * 1024)
+    print(f"Indexed {count} articles into {args.index} ({size:.0f} MB) in {time.time() - start:.0f}s")
+
+
+if __name__ == '__main__':
+    main()
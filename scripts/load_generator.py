@@ -0,0 +1,238 @@
+"""
+Socket.IO load generator: concurrent chat and audio clients against a running JARVIS server.
+
+Chat clients send user_message (AI Mode) back to back, --think-ms apart,
+timing the first streamed frame and bot_response_complete. Audio clients
+stream a WebM clip as audio_chunk frames at real-time pace (one every
+250 ms, like the browser's MediaRecorder) between start_speech and
+stop_speech, timing stop_speech -> speech_stopped, i.e. the final
+recognition of the utterance. Clients start evenly over --ramp seconds;
+throughput and latency percentiles are reported per traffic type.
+
+For capacity planning without API traffic, start the server with the
+local fake Gemini backend and the stub recognizer, e.g.
+
+    JARVIS_GEMINI_BACKEND=fake JARVIS_FAKE_TTFT_MS=300 JARVIS_FAKE_TOKENS_PER_S=50 \\
+        JARVIS_FAKE_ERROR_RATE=0.01 JARVIS_ASR_BACKEND=stub python Jarvis.py
+
+The clients run in this process, so on a small host they compete with
+the server for CPU; results are then a lower bound.
+
+Usage:
+    python scripts/load_generator.py [--url http://127.0.0.1:5000] [--clients 20] [--audio-clients 5]
+        [--duration 30] [--ramp 5] [--think-ms 0] [--audio benchmarks/fixtures/utterance_3s.webm] [--json out.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AUDIO_CHUNKS = 12  # a 3 s clip at MediaRecorder's 250 ms timeslice
+AUDIO_INTERVAL = 0.25
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))] if values else float('nan')
+
+
+class Results:
+    """Latencies (ms) and counters shared by the client threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {'first_chunk': [], 'complete': [], 'speech_final': []}
+        self.counts = {'messages': 0, 'message_errors': 0, 'message_timeouts': 0, 'sessions': 0,
+                       'sessions_recognized': 0, 'speech_errors': 0, 'speech_timeouts': 0, 'backpressure': 0,
+                       'connect_failures': 0}
+
+    def add(self, name, ms):
+        with self.lock:
+            self.latencies[name].append(ms)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counts[name] += n
+
+
+def chat_client(n, args, results, stop):
+    import socketio
+    sio = socketio.Client(reconnection=False)
+    state = {}
+    first = threading.Event()
+    done = threading.Event()
+
+    def on_chunk(text):
+        if not first.is_set():
+            state['first'] = time.perf_counter()
+            state['error'] = text.startswith('Error: ')  # gemini_chat_stream reports upstream failures in-band
+            first.set()
+
+    def on_system_message(data):
+        if data.get('type') == 'error':
+            state['error'] = True
+
+    sio.on('bot_response_chunk', lambda data: on_chunk(data.get('chunk', '')))
+    sio.on('bot_response', lambda data: on_chunk(data.get('response', '')))
+    sio.on('system_message', on_system_message)
+    sio.on('processing_end', lambda data=None: done.set())
+    try:
+        sio.connect(args.url, transports=['websocket'], wait_timeout=args.timeout)
+    except Exception:
+        results.count('connect_failures')
+        return
+    i = 0
+    while not stop.is_set():
+        state.clear()
+        first.clear()
+        done.clear()
+        start = time.perf_counter()
+        sio.emit('user_message', {'message': f"client {n} question {i}", 'mode': 'ai'})
+        if not done.wait(args.timeout):
+            results.count('message_timeouts')
+            break  # the server is saturated; a later message would supersede this one
+        results.count('messages')
+        if state.get('error'):
+            results.count('message_errors')
+        else:
+            results.add('first_chunk', (state['first'] - start) * 1000)
+            results.add('complete', (time.perf_counter() - start) * 1000)
+        i += 1
+        stop.wait(args.think_ms / 1000)
+    sio.disconnect()
+
+
+def audio_client(n, args, results, stop, chunks):
+    import socketio
+    sio = socketio.Client(reconnection=False)
+    state = {}
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def on_final(data):
+        if data.get('text'):
+            state['recognized'] = True
+
+    def on_error(data):
+        state['error'] = True
+
+    sio.on('speech_final', on_final)
+    sio.on('speech_error', on_error)
+    sio.on('speech_backpressure', lambda data: results.count('backpressure'))
+    sio.on('speech_started', lambda data=None: started.set())
+    sio.on('speech_stopped', lambda data=None: stopped.set())
+    try:
+        sio.connect(args.url, transports=['websocket'], wait_timeout=args.timeout)
+    except Exception:
+        results.count('connect_failures')
+        return
+    while not stop.is_set():
+        state.clear()
+        started.clear()
+        stopped.clear()
+        sio.emit('start_speech', {'mode': 'ai', 'current_text': ''})
+        # Events are handled concurrently; the first chunk (the WebM header) must not beat the session
+        if not started.wait(args.timeout):
+            results.count('speech_timeouts')
+            break
+        for chunk in chunks:
+            sio.emit('audio_chunk', {'audio': chunk})
+            time.sleep(AUDIO_INTERVAL)  # sessions in flight at the deadline still finish
+        start = time.perf_counter()
+        sio.emit('stop_speech')
+        if not stopped.wait(args.timeout):
+            results.count('speech_timeouts')
+            break
+        results.count('sessions')
+        results.add('speech_final', (time.perf_counter() - start) * 1000)
+        if state.get('error'):
+            results.count('speech_errors')
+        if state.get('recognized'):
+            results.count('sessions_recognized')
+    sio.disconnect()
+
+
+def run(args):
+    with open(args.audio, 'rb') as fh:
+        clip = fh.read()
+    size = -(-len(clip) // AUDIO_CHUNKS)
+    chunks = [clip[offset:offset + size] for offset in range(0, len(clip), size)]
+
+    results = Results()
+    stop = threading.Event()
+    total = args.clients + args.audio_clients
+    threads = []
+    for n in range(total):
+        if n < args.clients:
+            thread = threading.Thread(target=chat_client, args=(n, args, results, stop), daemon=True)
+        else:
+            thread = threading.Thread(target=audio_client, args=(n, args, results, stop, chunks), daemon=True)
+        threads.append(thread)
+
+    start = time.perf_counter()
+    for n, thread in enumerate(threads):
+        if args.ramp and total > 1:
+            time.sleep(max(0.0, start + args.ramp * n / (total - 1) - time.perf_counter()))
+        thread.start()
+    stop.wait(max(0.0, start + args.ramp + args.duration - time.perf_counter()))
+    stop.set()
+    for thread in threads:
+        thread.join(args.timeout + AUDIO_INTERVAL * AUDIO_CHUNKS)
+    return results, time.perf_counter() - start
+
+
+def summary(results, elapsed):
+    report = {'elapsed_s': round(elapsed, 2), 'counts': dict(results.counts)}
+    for name, values in results.latencies.items():
+        report[name] = {'count': len(values), **{f'p{q}': round(percentile(values, q), 1) for q in (50, 90, 99)},
+                        'max': round(max(values), 1) if values else None}
+    report['messages_per_s'] = round(results.counts['messages'] / elapsed, 2)
+    report['sessions_per_s'] = round(results.counts['sessions'] / elapsed, 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default=f"http://127.0.0.1:{os.getenv('JARVIS_PORT', '5000')}")
+    parser.add_argument('--clients', type=int, default=20, help='chat clients sending user_message')
+    parser.add_argument('--audio-clients', type=int, default=0, help='clients streaming audio_chunk sessions')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of load after the ramp')
+    parser.add_argument('--ramp', type=float, default=5, help='seconds over which clients connect')
+    parser.add_argument('--think-ms', type=float, default=0, help='pause between a reply and the next message')
+    parser.add_argument('--audio', default=os.path.join(ROOT, 'benchmarks', 'fixtures', 'utterance_3s.webm'))
+    parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for a reply')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    print(f"{args.clients} chat + {args.audio_clients} audio clients against {args.url}, "
+          f"{args.ramp:.0f}s ramp + {args.duration:.0f}s")
+    report = summary(*run(args))
+    counts = report['counts']
+    print("--------------------------------------------------")
+    if args.clients:
+        print(f"  chat     {counts['messages']:6d} replies  {report['messages_per_s']:7.2f}/s  "
+              f"errors {counts['message_errors']}  timeouts {counts['message_timeouts']}")
+        for name, label in (('first_chunk', 'first frame'), ('complete', 'complete')):
+            r = report[name]
+            print(f"    {label:12s} p50 {r['p50']:8.0f} ms  p90 {r['p90']:8.0f} ms  p99 {r['p99']:8.0f} ms")
+    if args.audio_clients:
+        r = report['speech_final']
+        print(f"  audio    {counts['sessions']:6d} sessions {report['sessions_per_s']:7.2f}/s  "
+              f"recognized {counts['sessions_recognized']}  errors {counts['speech_errors']}  "
+              f"timeouts {counts['speech_timeouts']}  backpressure {counts['backpressure']}")
+        print(f"    {'final':12s} p50 {r['p50']:8.0f} ms  p90 {r['p90']:8.0f} ms  p99 {r['p99']:8.0f} ms")
+    if counts['connect_failures']:
+        print(f"  {counts['connect_failures']} clients failed to connect")
+    print("--------------------------------------------------")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if counts['connect_failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,17 @@ const errorMessage = document.getElementById('error-message');
 const navItems = document.querySelectorAll('.nav-item');
 const views = document.querySelectorAll('.view-section');
 
+// Logs panel: the server streams new lines only while it is open
+const MAX_LOG_LINES = 500;
+let logsOpen = false;
+let lastLogSeq = null; // sequence number of the newest line shown
+let logRun = null; // server run the shown lines came from
+
+function subscribeLogs() {
+    // Resume after the last line we have (also after a reconnect)
+    socket.emit('logs_subscribe', { after: lastLogSeq, run: logRun });
+}
+
 navItems.forEach(item => {
     item.addEventListener('click', () => {
         navItems.forEach(nav => nav.classList.remove('active'));
@@ -29,7 +40,12 @@ navItems.forEach(item => {
             viewElement.classList.add('active');
         }
 
-        if (item.id === 'nav-logs') socket.emit('get_logs');
+        const showLogs = item.id === 'nav-logs';
+        if (showLogs !== logsOpen) {
+            logsOpen = showLogs;
+            if (logsOpen) subscribeLogs();
+            else socket.emit('logs_unsubscribe');
+        }
         if (item.id === 'nav-settings') socket.emit('get_models');
     });
 });
@@ -65,6 +81,8 @@ let isAwake = false; // Task Mode state
 let finalTranscript = ''; // To accumulate text in AI mode
 let messageSent = false; // Track if message was sent to clear transcript
 
+const AUDIO_TIMESLICE_MS = 250; // Size of each streamed audio fragment
+
 const audioConstraints = {
     audio: {
         channelCount: 1,
@@ -98,73 +116,56 @@ function startRecording() {
         return;
     }
 
-    // Reset placeholder to Listening if we are restarting the loop in AI mode
+    // Already streaming (e.g. speech_started received twice)
+    if (mediaRecorder && mediaRecorder.state === 'recording') {
+        return;
+    }
+
     if (mode === 'ai' && isManualListening) {
         userInput.placeholder = "Listening...";
     }
 
     const options = { mimeType: 'audio/webm' };
-    mediaRecorder = new MediaRecorder(audioStream, options);
+    const recorder = new MediaRecorder(audioStream, options);
+    mediaRecorder = recorder;
 
-    let accumulatedChunks = [];
+    // Fragments are sent in order as binary Socket.IO attachments
+    let sendChain = Promise.resolve();
 
-    mediaRecorder.ondataavailable = (event) => {
+    recorder.ondataavailable = (event) => {
         if (event.data.size > 0) {
-            accumulatedChunks.push(event.data);
+            const blob = event.data;
+            sendChain = sendChain
+                .then(() => blob.arrayBuffer())
+                .then((buffer) => socket.emit('audio_chunk', { audio: buffer }));
         }
     };
 
-    mediaRecorder.onstop = () => {
-        if (accumulatedChunks.length > 0) {
-            // Merge all chunks into a single blob
-            const completeBlob = new Blob(accumulatedChunks, { type: 'audio/webm' });
-
-            // Show transcribing indicator ONLY if we are in AI mode and manually listening
-            // This prevents it from showing when we stop (toggle off) or in Task Mode
-            if (mode === 'ai' && isManualListening) {
-                userInput.placeholder = "Transcribing...";
-            }
-
-            // Convert blob to base64 and send to server
-            const reader = new FileReader();
-            reader.onloadend = () => {
-                const base64Audio = reader.result.split(',')[1];
-                socket.emit('audio_chunk', { audio: base64Audio });
-            };
-            reader.readAsDataURL(completeBlob);
-
-            accumulatedChunks = [];
-        }
-
-        // Restart recording if still listening or in Task Mode (to catch wake word)
-        if (isManualListening || mode === 'task') {
-            setTimeout(() => {
-                if (mediaRecorder && (isManualListening || mode === 'task')) {
-                    startRecording();
-                }
-            }, 100);
-        }
+    recorder.onstop = () => {
+        sendChain.then(() => {
+            if (recorder.onStopped) recorder.onStopped();
+        });
     };
 
-    mediaRecorder.onerror = (error) => {
+    recorder.onerror = (error) => {
         console.error("MediaRecorder error:", error);
     };
 
-    // Record for 3 seconds then stop (creates complete WebM file)
-    mediaRecorder.start();
-    setTimeout(() => {
-        if (mediaRecorder && mediaRecorder.state === 'recording') {
-            mediaRecorder.stop();
-        }
-    }, 3000);
+    // One continuous recording, delivered in short fragments. The server decodes the
+    // stream incrementally and its VAD decides where utterances begin and end.
+    recorder.start(AUDIO_TIMESLICE_MS);
 
-    console.log("Recording started - will capture 3-second chunks");
+    console.log(`Recording started - streaming ${AUDIO_TIMESLICE_MS}ms fragments`);
 }
 
-function stopRecording() {
+function stopRecording(onStopped) {
     if (mediaRecorder && mediaRecorder.state !== 'inactive') {
+        // Runs after the final fragment has been sent
+        mediaRecorder.onStopped = onStopped;
         mediaRecorder.stop();
         console.log("Recording stopped");
+    } else if (onStopped) {
+        onStopped();
     }
 }
 
@@ -301,6 +302,11 @@ socket.on('silence_timeout', () => {
     }
 });
 
+socket.on('speech_backpressure', (data) => {
+    // Server-side recognition is behind; it has merged or dropped queued audio
+    console.warn(`Speech backlog: ${data.queued} windows queued (${data.policy})`);
+});
+
 socket.on('speech_error', (data) => {
     console.error("Speech error:", data.error);
     showError("Speech recognition error: " + data.error);
@@ -339,9 +345,9 @@ modeToggle.addEventListener('change', () => {
 micBtn.addEventListener('click', () => {
     if (mode === 'ai') {
         if (isManualListening) {
-            // Stop (Manual)
+            // Stop (Manual) - flush the last fragment before the server finalizes
             isManualListening = false;
-            socket.emit('stop_speech');
+            stopRecording(() => socket.emit('stop_speech'));
             micBtn.classList.remove('listening');
             voiceVisualizer.classList.remove('active');
             userInput.placeholder = "Write or speak...";
@@ -399,6 +405,7 @@ socket.on('connect', () => {
 // SocketIO Events
 socket.on('connect', () => {
     console.log('Connected');
+    if (logsOpen) subscribeLogs(); // rejoin the logs room after a reconnect
     // Initialize mode
     mode = modeToggle.checked ? 'ai' : 'task';
     if (mode === 'task') {
@@ -449,6 +456,7 @@ let currentStreamingContent = null;
 
 socket.on('bot_response_start', () => {
     hideThinking();
+    pendingChunkText = ''; // Drop leftovers of a reply that was cancelled
 
     // Create message structure
     const messageDiv = document.createElement('div');
@@ -473,14 +481,30 @@ socket.on('bot_response_start', () => {
     chatArea.scrollTop = chatArea.scrollHeight;
 });
 
-socket.on('bot_response_chunk', (data) => {
-    if (currentStreamingContent) {
-        currentStreamingContent.textContent += data.chunk;
+// Chunks arriving within one animation frame are appended (and scrolled) together
+let pendingChunkText = '';
+let chunkFrameRequested = false;
+
+function flushPendingChunks() {
+    chunkFrameRequested = false;
+    if (currentStreamingContent && pendingChunkText) {
+        currentStreamingContent.textContent += pendingChunkText;
         chatArea.scrollTop = chatArea.scrollHeight; // Auto-scroll
     }
+    pendingChunkText = '';
+}
+
+socket.on('bot_response_chunk', (data) => {
+    if (!currentStreamingContent) return;
+    pendingChunkText += data.chunk;
+    if (!chunkFrameRequested) {
+        chunkFrameRequested = true;
+        requestAnimationFrame(flushPendingChunks);
+    }
 });
 
 socket.on('bot_response_complete', (data) => {
+    flushPendingChunks();
     if (currentStreamingMessage && currentStreamingContent) {
         // Add timestamp and stats
         const timestamp = document.createElement('span');
@@ -496,8 +520,8 @@ socket.on('bot_response_complete', (data) => {
             currentStreamingContent.parentElement.appendChild(statsDiv);
         }
 
-        // Speak the complete message
-        speak(currentStreamingContent.textContent);
+        // Speak the complete message (not a reply the user stopped)
+        if (!data.cancelled) speak(currentStreamingContent.textContent);
 
         if (data.context_usage) updateContextBar(data.context_usage);
 
@@ -508,14 +532,28 @@ socket.on('bot_response_complete', (data) => {
 
 socket.on('system_stats', (data) => updateDashboard(data));
 socket.on('error_message', (data) => showError(data.error));
-socket.on('logs_update', (data) => {
+socket.on('logs_append', (data) => {
     const logsArea = document.getElementById('logs-area');
-    if (logsArea) {
-        // Highlight errors
-        const formattedLogs = data.logs.replace(/ERROR/g, '<span class="log-error">ERROR</span>');
-        logsArea.innerHTML = formattedLogs; // Use innerHTML for spans
-        logsArea.scrollTop = logsArea.scrollHeight;
+    if (!logsArea) return;
+    if (data.reset) {
+        logsArea.textContent = '';
+        lastLogSeq = null;
+    }
+    logRun = data.run;
+    const fragment = document.createDocumentFragment();
+    data.lines.forEach(([seq, text]) => {
+        if (lastLogSeq !== null && seq <= lastLogSeq) return; // already shown
+        const line = document.createElement('div');
+        if (text.includes('ERROR')) line.className = 'log-error'; // Highlight errors
+        line.textContent = text;
+        fragment.appendChild(line);
+        lastLogSeq = seq;
+    });
+    logsArea.appendChild(fragment);
+    while (logsArea.childElementCount > MAX_LOG_LINES) {
+        logsArea.removeChild(logsArea.firstElementChild);
     }
+    logsArea.scrollTop = logsArea.scrollHeight;
 });
 
 // TTS
@@ -540,6 +578,10 @@ sendBtn.addEventListener('click', sendMessage);
 
 // Handle Enter key - send on Enter, new line on Shift+Enter
 userInput.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape' && currentStreamingMessage) {
+        socket.emit('cancel_generation'); // Stop the reply that is streaming
+        return;
+    }
     if (e.key === 'Enter' && !e.shiftKey) {
         e.preventDefault();
         sendMessage();
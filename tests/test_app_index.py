@@ -0,0 +1,117 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import pytest
+
+from core.app_index import AppIndex, Launcher, parse_desktop_file
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='POSIX executables and .desktop files')
+
+
+def make_executable(directory, name, body='#!/bin/sh\nexit 0\n'):
+    path = directory / name
+    path.write_text(body)
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    bin_dir, apps_dir, extra = tmp_path / 'bin', tmp_path / 'applications', tmp_path / 'opt'
+    for d in (bin_dir, apps_dir, extra):
+        d.mkdir()
+    make_executable(bin_dir, 'code')
+    make_executable(bin_dir, 'telegram-desktop')
+    (bin_dir / 'README').write_text('not executable')
+    (apps_dir / 'code.desktop').write_text(
+        "[Desktop Entry]\nType=Application\nName=Visual Studio Code\nExec=/usr/share/code/code --unity-launch %F\n"
+        "[Desktop Action new-empty-window]\nName=New Empty Window\nExec=/usr/share/code/code --new-window %F\n")
+    (apps_dir / 'hidden.desktop').write_text("[Desktop Entry]\nType=Application\nName=Hidden\nExec=hidden\nNoDisplay=true\n")
+    make_executable(extra, 'DroidCam')
+    return bin_dir, apps_dir, extra
+
+
+def test_desktop_entries_drop_field_codes_and_skip_hidden(dirs):
+    _, apps_dir, _ = dirs
+    app = parse_desktop_file(str(apps_dir / 'code.desktop'))
+    assert app.name == 'Visual Studio Code'
+    assert app.argv == ['/usr/share/code/code', '--unity-launch']
+    assert parse_desktop_file(str(apps_dir / 'hidden.desktop')) is None
+
+
+def test_resolves_spoken_names_from_every_source(dirs):
+    bin_dir, apps_dir, extra = dirs
+    index = AppIndex(dirs=[str(extra)], path_dirs=[str(bin_dir)], desktop_dirs=[str(apps_dir)])
+    index.refresh()
+    assert index.resolve('visual studio code').argv[0] == '/usr/share/code/code'
+    # The .desktop entry also claims its executable's name, and wins over PATH
+    assert index.resolve('Code').source.endswith('code.desktop')
+    assert index.resolve('telegram desktop').argv == [str(bin_dir / 'telegram-desktop')]
+    assert index.resolve('droid cam').argv == [str(extra / 'DroidCam')]
+    assert index.resolve('readme') is None
+    assert index.resolve('hidden') is None
+    assert index.stats()['misses'] == 2
+
+
+def test_refresh_only_rescans_changed_directories(dirs):
+    bin_dir, apps_dir, extra = dirs
+    index = AppIndex(dirs=[str(extra)], path_dirs=[str(bin_dir)], desktop_dirs=[str(apps_dir)])
+    assert index.refresh() == 3
+    assert index.refresh() == 0
+    make_executable(bin_dir, 'spotify')
+    os.utime(bin_dir, ns=(time.time_ns(), time.time_ns() + 10 ** 9))  # coarse mtime filesystems
+    assert index.refresh() == 1
+    assert index.resolve('spotify') is not None
+
+
+def test_background_start_builds_the_index(dirs):
+    bin_dir, apps_dir, _ = dirs
+    index = AppIndex(path_dirs=[str(bin_dir)], desktop_dirs=[str(apps_dir)]).start()
+    try:
+        assert index.ready.wait(5)
+        assert index.resolve('code') is not None
+    finally:
+        index.stop()
+
+
+def test_launch_does_not_wait_for_the_application(tmp_path):
+    slow = make_executable(tmp_path, 'slow', '#!/bin/sh\nsleep 5\n')
+    launcher = Launcher()
+    start = time.perf_counter()
+    assert launcher.launch([slow])
+    assert time.perf_counter() - start < 2
+    assert not launcher.launch([str(tmp_path / 'missing')])
+    stats = launcher.stats()
+    assert stats['launches'] == 1 and stats['failures'] == 1 and stats['last_ms'] > 0
+
+
+def test_exited_applications_are_reaped_on_the_next_launch(tmp_path):
+    quick = make_executable(tmp_path, 'quick', '#!/bin/sh\nexit 0\n')
+    launcher = Launcher()
+    assert launcher.launch([quick])
+    first = launcher._children[0]
+    for _ in range(100):  # until it has exited (a zombie on Linux)
+        if not os.path.exists('/proc'):
+            time.sleep(0.5)
+            break
+        with open(f"/proc/{first.pid}/stat") as f:
+            if f.read().split()[2] == 'Z':
+                break
+        time.sleep(0.05)
+    assert launcher.launch([quick])
+    assert first.returncode == 0  # waited for, so no zombie is left behind
+    assert first not in launcher._children
+
+
+def test_listed_only_skips_bare_path_executables(dirs):
+    bin_dir, apps_dir, extra = dirs
+    make_executable(bin_dir, 'reboot')
+    index = AppIndex(dirs=[str(extra)], path_dirs=[str(bin_dir)], desktop_dirs=[str(apps_dir)])
+    index.refresh()
+    assert index.resolve('reboot') is not None
+    assert index.resolve('reboot', listed_only=True) is None
+    assert index.resolve('telegram desktop', listed_only=True) is None
+    assert index.resolve('code', listed_only=True).source.endswith('code.desktop')
+    assert index.resolve('droid cam', listed_only=True).source == 'dir'
@@ -0,0 +1,36 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import speech_recognition as sr
+
+from core.asr_backends import StubBackend, create_backend
+
+PCM = bytes(32000)
+
+
+def test_stub_cycles_scripted_transcripts():
+    backend = StubBackend(['hello jarvis', '', 'open notepad'])
+    assert backend.recognize(PCM) == 'hello jarvis'
+    with pytest.raises(sr.UnknownValueError):
+        backend.recognize(PCM)
+    assert backend.recognize(PCM) == 'open notepad'
+    assert backend.recognize(PCM) == 'hello jarvis'
+    assert backend.calls == 4
+
+
+def test_stub_partials_reveal_words_in_order():
+    backend = StubBackend(['what time is it'], latency=0.02, supports_partials=True)
+    partials = []
+    assert backend.recognize(PCM, partials.append) == 'what time is it'
+    assert partials == ['what', 'what time', 'what time is']
+
+
+def test_create_backend_from_env(monkeypatch):
+    monkeypatch.setenv('JARVIS_ASR_STUB_TRANSCRIPTS', 'one | two')
+    monkeypatch.setenv('JARVIS_ASR_STUB_LATENCY_MS', '5')
+    backend = create_backend('stub')
+    assert backend.name == 'stub' and backend.latency == 0.005
+    assert [backend.recognize(PCM), backend.recognize(PCM)] == ['one', 'two']
+    with pytest.raises(ValueError):
+        create_backend('nonexistent')
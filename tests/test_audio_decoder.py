@@ -0,0 +1,104 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from core.audio_decoder import AudioBuffer
+
+
+def test_take_returns_view_without_copy():
+    buf = AudioBuffer(capacity=16)
+    buf.write(b'abcd')
+    buf.write(b'efgh')
+    view = buf.take()
+    assert isinstance(view, memoryview)
+    assert bytes(view) == b'abcdefgh'
+    assert len(buf) == 0
+
+
+def test_live_view_is_not_overwritten():
+    buf = AudioBuffer(capacity=8)
+    buf.write(b'abcdef')
+    view = buf.take()
+    buf.write(b'12345678')  # needs the front of the buffer back
+    assert bytes(view) == b'abcdef'
+    assert bytes(buf.take()) == b'12345678'
+
+
+def test_released_space_is_reused_in_place():
+    buf = AudioBuffer(capacity=8)
+    buf.write(b'abcdef')
+    buf.take().release()
+    buf.write(b'12345678')
+    assert buf.capacity == 8
+    assert bytes(buf.take()) == b'12345678'
+
+
+def test_grows_when_full():
+    buf = AudioBuffer(capacity=4)
+    buf.write(b'x' * 10)
+    assert buf.capacity >= 10
+    assert len(buf) == 10
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as fh:
+        return fh.read()
+
+
+def _seconds(pcm):
+    from core.audio_decoder import BYTES_PER_SECOND
+    seconds = len(pcm) / BYTES_PER_SECOND
+    pcm.release()
+    return seconds
+
+
+@pytest.fixture
+def decoder():
+    from core.audio_decoder import StreamingDecoder
+    from core.speech_service import find_ffmpeg
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        pytest.skip('ffmpeg not available')
+    decoder = StreamingDecoder(ffmpeg)
+    yield decoder
+    decoder.close()
+
+
+def test_consecutive_webm_files_all_decode(decoder):
+    utterance, silence = _fixture('utterance_3s.webm'), _fixture('silence_3s.webm')
+    lengths = []
+    for clip in (utterance, silence, utterance, silence):
+        decoder.feed(clip)
+        lengths.append(_seconds(decoder.read()))
+    assert lengths == pytest.approx([3.0] * 4, abs=0.1)
+    assert decoder.restarts == 3
+
+
+def test_fragments_of_one_stream_share_a_process(decoder):
+    clip = _fixture('utterance_3s.webm')
+    size = -(-len(clip) // 12)  # MediaRecorder's 250 ms timeslice
+    for recording in range(2):
+        for offset in range(0, len(clip), size):
+            decoder.feed(clip[offset:offset + size])
+        assert _seconds(decoder.read()) == pytest.approx(3.0, abs=0.1)
+    assert decoder.restarts == 1  # only the second recording's header
+
+
+def test_flush_hands_over_the_rest_without_waiting_out_the_timeout(decoder):
+    import time
+    clip = _fixture('utterance_3s.webm')
+    size = -(-len(clip) // 12)
+    for offset in range(0, len(clip), size):
+        decoder.feed(clip[offset:offset + size])
+    start = time.perf_counter()
+    decoder.flush()
+    pcm = decoder.read(idle=0, timeout=0)
+    assert time.perf_counter() - start < 0.5
+    assert _seconds(pcm) == pytest.approx(3.0, abs=0.1)
+    decoder.feed(clip)  # the next recording starts a new process
+    assert _seconds(decoder.read()) == pytest.approx(3.0, abs=0.1)
+    assert decoder.restarts == 0
@@ -0,0 +1,89 @@
+import sys, os, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.chunk_coalescer import ChunkCoalescer
+from core.timer_wheel import TimerWheel
+
+
+class _ManualTimers:
+    """Collects scheduled callbacks; the test fires them"""
+
+    class _Handle:
+        def __init__(self, callback):
+            self.callback = callback
+            self.cancelled = False
+
+        def cancel(self):
+            self.cancelled = True
+
+    def __init__(self):
+        self.handles = []
+
+    def schedule(self, delay, callback, *args):
+        handle = self._Handle(callback)
+        self.handles.append(handle)
+        return handle
+
+    def fire(self):
+        for handle in self.handles:
+            if not handle.cancelled:
+                handle.callback()
+        self.handles = []
+
+
+def test_first_chunk_is_sent_immediately_then_merged():
+    frames = []
+    coalescer = ChunkCoalescer(frames.append, window=10, max_bytes=1000)
+    assert coalescer.push("Hello")
+    assert not coalescer.push(" there")
+    assert not coalescer.push(", friend")
+    assert frames == ["Hello"]
+    coalescer.close()
+    assert frames == ["Hello", " there, friend"]
+    assert (coalescer.chunks, coalescer.frames) == (3, 2)
+
+
+def test_byte_threshold_flushes():
+    frames = []
+    coalescer = ChunkCoalescer(frames.append, window=10, max_bytes=8)
+    for chunk in ("a", "bbbb", "cccc", "d"):
+        coalescer.push(chunk)
+    assert frames == ["a", "bbbbcccc"]
+
+
+def test_window_flushes_while_upstream_is_stalled():
+    frames = []
+    timers = _ManualTimers()
+    coalescer = ChunkCoalescer(frames.append, window=0.04, timers=timers)
+    coalescer.push("first")
+    coalescer.push("held")
+    assert frames == ["first"] and len(timers.handles) == 1
+    timers.fire()
+    assert frames == ["first", "held"]
+
+
+def test_window_deadline_with_real_timer_wheel():
+    frames = []
+    timers = TimerWheel(tick=0.005)
+    try:
+        coalescer = ChunkCoalescer(frames.append, window=0.03, timers=timers)
+        coalescer.push("first")
+        coalescer.push("second")
+        deadline = time.monotonic() + 1
+        while len(frames) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert frames == ["first", "second"]
+    finally:
+        timers.shutdown()
+
+
+def test_discard_drops_held_text_and_timer():
+    frames = []
+    timers = _ManualTimers()
+    coalescer = ChunkCoalescer(frames.append, window=0.04, timers=timers)
+    coalescer.push("first")
+    coalescer.push("stale")
+    coalescer.discard()
+    timers.fire()
+    coalescer.close()
+    assert frames == ["first"]
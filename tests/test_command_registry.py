@@ -0,0 +1,59 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+from core.command_registry import Command, CommandRegistry
+from core.jarvis_engine import DEFAULT_COMMANDS_FILE
+
+
+def _registry():
+    return CommandRegistry([
+        Command('Word', 'app', ['open word']),
+        Command('WordPad', 'app', ['open wordpad']),
+        Command('VS Code', 'app', ['open vs code', 'open visual studio code']),
+        Command('Code search', 'url', ['code']),
+        Command('Wikipedia', 'wikipedia', ['wikipedia']),
+    ])
+
+
+def test_phrases_match_whole_words():
+    registry = _registry()
+    assert registry.match('open wordpad').command.name == 'WordPad'
+    assert registry.match('please open word now').command.name == 'Word'
+    assert registry.match('open words') is None
+    assert registry.match('open visual studio') is None
+
+
+def test_longest_phrase_wins_wherever_it_starts():
+    registry = _registry()
+    match = registry.match('Open VS Code!')
+    assert match.command.name == 'VS Code'
+    assert (match.start, match.end) == (0, 3)
+    assert registry.match('code').command.name == 'Code search'
+
+
+def test_remainder_is_the_rest_of_the_query():
+    match = _registry().match('albert einstein wikipedia')
+    assert match.command.name == 'Wikipedia'
+    assert match.remainder == 'albert einstein'
+
+
+def test_load_skips_unknown_actions(tmp_path):
+    path = tmp_path / 'commands.json'
+    path.write_text(json.dumps({'commands': [
+        {'name': 'Gmail', 'action': 'url', 'target': 'www.gmail.com', 'phrases': ['open gmail']},
+        {'name': 'Lights', 'action': 'smart_home', 'phrases': ['lights on']},
+        {'name': 'Broken', 'action': 'url'},
+    ]}))
+    registry = CommandRegistry.load(str(path), actions={'url'})
+    assert [c.name for c in registry.commands] == ['Gmail']
+    assert registry.match('open gmail').command.options == {'target': 'www.gmail.com'}
+
+
+def test_bundled_config_resolves_the_old_misfires():
+    registry = CommandRegistry.load(DEFAULT_COMMANDS_FILE)
+    assert registry.match('open vs code').command.name == 'VS Code'
+    assert registry.match('open wordpad') is None
+    assert registry.match('what is the date').command.name == 'date'
+    assert registry.match('open the update center') is None
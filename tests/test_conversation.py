@@ -0,0 +1,46 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.conversation import Conversation, ConversationStore
+from core.Gemini import build_contents, build_prompt
+
+
+def test_running_total_and_eviction_of_oldest_exchanges():
+    conversation = Conversation(max_tokens=100)
+    conversation.add_exchange("first", "answer one", 20, 20)
+    conversation.add_exchange("second", "answer two", 20, 20)
+    assert conversation.tokens == 80 and len(conversation) == 4
+    conversation.add_exchange("third", "answer three", 20, 20)
+    assert conversation.tokens == 80 and conversation.evicted == 1
+    assert conversation.history()[0] == ('user', 'second')
+    assert conversation.history()[-1] == ('model', 'answer three')
+
+
+def test_oversized_exchange_leaves_empty_history():
+    conversation = Conversation(max_tokens=10)
+    conversation.add_exchange("question", "a very long answer", 5, 50)
+    assert conversation.tokens == 0 and conversation.history() == []
+
+
+def test_memory_stays_flat_over_many_messages():
+    conversation = Conversation(max_tokens=1000)
+    for i in range(10000):
+        conversation.add_exchange(f"question {i}", "x" * 400)
+    assert conversation.tokens <= 1000 and len(conversation) <= 20
+
+
+def test_store_is_per_sid_and_drops_on_disconnect():
+    store = ConversationStore(max_tokens=100)
+    store.get('a').add_exchange("hi", "hello")
+    assert store.get('b').history() == []
+    assert store.stats()['sessions'] == 2
+    store.drop('a')
+    assert store.get('a').history() == []
+
+
+def test_history_becomes_multi_turn_contents():
+    assert build_contents("hello") == [build_prompt("hello")]
+    contents = build_contents("and tomorrow?", [('user', 'weather today?'), ('model', 'Sunny.')])
+    assert [c['role'] for c in contents] == ['user', 'model', 'user']
+    assert contents[1]['parts'] == ['Sunny.']
+    assert contents[2]['parts'] == [build_prompt("and tomorrow?")]
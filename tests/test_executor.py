@@ -0,0 +1,77 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+
+import pytest
+
+from core.executor import BlockingExecutor
+
+
+def test_run_returns_result_and_counts_calls():
+    executor = BlockingExecutor(max_workers=2)
+    assert executor.run(lambda a, b=0: a + b, 1, b=2) == 3
+    stats = executor.stats()
+    assert (stats['calls'], stats['active'], stats['waiting']) == (1, 0, 0)
+
+
+def test_concurrent_calls_are_bounded():
+    executor = BlockingExecutor(max_workers=2)
+    release = threading.Event()
+    threads = [threading.Thread(target=executor.run, args=(release.wait,)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    deadline = time.time() + 2
+    while executor.waiting < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert executor.active == 2 and executor.waiting == 3
+    release.set()
+    for t in threads:
+        t.join()
+    assert executor.stats()['peak'] == 2 and executor.calls == 5
+
+
+def test_iterate_yields_items_and_closes_the_source():
+    executor = BlockingExecutor(max_workers=1)
+    closed = []
+
+    def source():
+        try:
+            yield from 'abc'
+        finally:
+            closed.append(True)
+
+    stream = executor.iterate(source())
+    assert next(stream) == 'a'
+    stream.close()
+    assert closed == [True]
+    assert list(executor.iterate(iter('xyz'))) == ['x', 'y', 'z']
+    assert executor.active == 0
+
+
+def test_compute_is_a_plain_call_in_threading_mode():
+    executor = BlockingExecutor()
+    assert executor.compute(threading.get_ident) == threading.get_ident()
+    stats = executor.stats()
+    assert stats['computes'] == 1 and stats['compute_threads'] == 0 and stats['calls'] == 0
+
+
+def test_compute_runs_on_an_os_thread_in_green_mode():
+    pytest.importorskip('eventlet')
+    executor = BlockingExecutor(green=True, compute_threads=1)
+    assert executor.compute(threading.get_ident) != threading.get_ident()
+    assert executor.compute(sum, [1, 2, 3]) == 6
+    assert executor.stats()['computes'] == 2
+
+
+def test_submit_runs_in_the_background_through_a_slot():
+    executor = BlockingExecutor(max_workers=1)
+    release = threading.Event()
+    start = time.perf_counter()
+    first = executor.submit(release.wait, 2)
+    second = executor.submit(lambda: 'done')
+    assert time.perf_counter() - start < 0.5  # neither call waited
+    release.set()
+    assert first.result(2) is True and second.result(2) == 'done'
+    assert executor.stats()['peak'] == 1 and executor.calls == 2
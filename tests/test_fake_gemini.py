@@ -0,0 +1,70 @@
+import sys, os, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from core import Gemini
+from core.fake_gemini import FakeGenAI, FakeGeminiError
+
+
+def _stream(backend, usage=None):
+    original = Gemini.registry
+    Gemini.registry = Gemini.ModelRegistry(backend=backend, key_loader=lambda: 'fake')
+    try:
+        return list(Gemini.gemini_chat_stream('hello', usage=usage))
+    finally:
+        Gemini.registry = original
+
+
+def test_streams_the_configured_size_in_chunks():
+    usage = {}
+    chunks = _stream(FakeGenAI(ttft=0, tokens_per_second=0, tokens=10, chunk_tokens=4), usage)
+    assert [len(chunk.split()) for chunk in chunks] == [4, 4, 2]
+    assert usage == {}  # the app keeps its own estimates
+
+
+def test_time_to_first_token_and_rate():
+    backend = FakeGenAI(ttft=0.05, tokens_per_second=100, tokens=5, chunk_tokens=1)
+    stream = backend.GenerativeModel('m').generate_content('hi', stream=True)
+    start = time.perf_counter()
+    chunks = iter(stream)
+    next(chunks)
+    first = time.perf_counter() - start
+    list(chunks)
+    total = time.perf_counter() - start
+    assert 0.05 <= first < 0.5
+    assert total >= 0.05 + 4 * 0.01
+
+
+def test_closed_stream_stops_early():
+    backend = FakeGenAI(ttft=0, tokens_per_second=0, tokens=20, chunk_tokens=1)
+    stream = backend.GenerativeModel('m').generate_content('hi', stream=True)
+    received = []
+    for chunk in stream:
+        received.append(chunk)
+        stream.close()
+    assert len(received) == 1
+
+
+def test_error_rate_injects_failures():
+    backend = FakeGenAI(ttft=0, tokens_per_second=0, tokens=3, error_rate=0.5, seed=7)
+    model = backend.GenerativeModel('m')
+    failures = 0
+    for _ in range(200):
+        try:
+            model.generate_content('hi')
+        except FakeGeminiError:
+            failures += 1
+    assert 60 < failures < 140 and backend.stats()['errors'] == failures
+    always = FakeGenAI(ttft=0, error_rate=1.0)
+    assert _stream(always)[0].startswith('Error: ')
+    with pytest.raises(FakeGeminiError):
+        always.GenerativeModel('m').generate_content('hi')
+
+
+def test_profile_from_env(monkeypatch):
+    monkeypatch.setenv('JARVIS_FAKE_TTFT_MS', '120')
+    monkeypatch.setenv('JARVIS_FAKE_TOKENS', '5-9')
+    monkeypatch.setenv('JARVIS_FAKE_ERROR_RATE', '0.25')
+    backend = FakeGenAI.from_env()
+    assert (backend.ttft, backend.tokens, backend.error_rate) == (0.12, (5, 9), 0.25)
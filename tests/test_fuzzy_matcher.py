@@ -0,0 +1,120 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+from core.command_registry import Command
+from core.fuzzy_matcher import FuzzyCommandMatcher, best_substring_distance, fold, prefix_distances
+
+
+def _reference_distance(pattern, text):
+    """Plain DP: edits from pattern to the best substring of text"""
+    prev = list(range(len(pattern) + 1))
+    best = prev[-1]
+    for ch in text:
+        cur = [0]
+        for i, p in enumerate(pattern, 1):
+            cur.append(min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (p != ch)))
+        best = min(best, cur[-1])
+        prev = cur
+    return best
+
+
+def test_bit_parallel_distance_matches_dynamic_programming():
+    rng = random.Random(20)
+    for _ in range(300):
+        pattern = ''.join(rng.choice('abcd') for _ in range(rng.randint(1, 70)))
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 90)))
+        assert best_substring_distance(pattern, text)[0] == _reference_distance(pattern, text)
+
+
+def test_fold_merges_spellings_that_sound_alike():
+    assert fold('spotify') == fold('spotifi')
+    assert fold('netflix') == fold('netfliks')
+    assert fold('tell') == 'tel'
+
+
+def _matcher(**kwargs):
+    return FuzzyCommandMatcher([
+        Command('Spotify', 'app', ['open spotify']),
+        Command('Telegram', 'app', ['open telegram']),
+        Command('Discord', 'app', ['open discord']),
+        Command('Wikipedia', 'wikipedia', ['wikipedia']),
+    ], **kwargs)
+
+
+def test_misheard_commands_resolve_with_a_score():
+    matcher = _matcher()
+    match = matcher.match('open spot if I')
+    assert match.command.name == 'Spotify' and match.score == 1.0
+    match = matcher.match('hey jarvis open tell a gram please')
+    assert match.command.name == 'Telegram' and 0.75 <= match.score < 1.0
+    assert match.tokens[match.start:match.end] == ['open', 'tell', 'a', 'gram']
+
+
+def test_remainder_excludes_the_fuzzy_span():
+    match = _matcher().match('wiki pedia alan turing')
+    assert match.command.name == 'Wikipedia'
+    assert match.remainder == 'alan turing'
+
+
+def test_unrelated_queries_are_rejected():
+    matcher = _matcher()
+    assert matcher.match('open the door') is None
+    assert matcher.match('') is None
+    assert _matcher(threshold=0.95).match('open tell a gram') is None
+    assert matcher.stats()['rejected'] == 2
+
+
+def test_prefix_distances_match_dynamic_programming():
+    rng = random.Random(21)
+    for _ in range(200):
+        pattern = ''.join(rng.choice('abc') for _ in range(rng.randint(1, 70)))
+        text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 80)))
+        distances = prefix_distances(pattern, text)
+        for j in (0, len(text) // 2, len(text)):
+            assert distances[j] == _reference_levenshtein(pattern, text[:j])
+
+
+def _reference_levenshtein(a, b):
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def _config_matcher():
+    return FuzzyCommandMatcher([
+        Command('Word', 'app', ['open word', 'open microsoft word']),
+        Command('time', 'time', ['the time', 'what time is it']),
+        Command('date', 'date', ['date']),
+        Command('Shutdown', 'shutdown', ['shutdown', 'shut down']),
+        Command('Telegram', 'app', ['open telegram']),
+    ])
+
+
+def test_matches_cover_whole_words_only():
+    matcher = _config_matcher()
+    assert matcher.match('open wordpad') is None
+    assert matcher.match('start the timer') is None
+    match = matcher.match('open micro soft word')
+    assert match.command.name == 'Word' and match.end == len(match.tokens)
+
+
+def test_short_phrases_only_match_exactly():
+    matcher = _config_matcher()
+    assert matcher.match('open gate') is None
+    assert matcher.match('open data folder') is None
+    # 8-11 characters tolerate one edit, not two
+    assert _matcher().match('wiki pedia').score == 1.0
+    assert _matcher().match('wika pedie') is None
+
+
+def test_destructive_actions_are_never_fuzzy():
+    matcher = _config_matcher()
+    assert matcher.match('shut dawn') is None
+    assert matcher.match('shutdown now') is None
+    assert matcher.stats()['phrases'] == 4
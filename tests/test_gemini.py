@@ -1,8 +1,13 @@
 import sys, os
-sys.path.append('w:/JARVIS 1.0')
-try:
-    from core import Gemini
-    print('Gemini imported')
-    print('format_response test:', Gemini.format_response('Hello *world*'))
-except Exception as e:
-    print('Error:', e)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import Gemini
+
+
+def test_format_response_trims_whitespace():
+    assert Gemini.format_response('  Hello *world*\n') == 'Hello *world*'
+
+
+def test_build_prompt_includes_the_system_instruction():
+    prompt = Gemini.build_prompt('hi')
+    assert prompt.startswith(Gemini.SYSTEM_INSTRUCTION) and prompt.endswith('User: hi')
@@ -0,0 +1,115 @@
+import sys, os, threading, queue, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import Gemini
+from core.generation import GenerationManager
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _BlockingStream:
+    """Streaming response whose chunks arrive only when the test says so"""
+
+    def __init__(self):
+        self.chunks = queue.Queue()
+        self.cancelled = False
+        self._iterator = self
+
+    def cancel(self):
+        self.cancelled = True
+        self.chunks.put(RuntimeError("stream cancelled"))
+
+    def __iter__(self):
+        while True:
+            item = self.chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield _Chunk(item)
+
+
+class _Model:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def generate_content(self, contents, stream=False):
+        return self.stream
+
+
+class _Registry:
+    def __init__(self, model):
+        self.model = model
+
+    def get(self, model_name, **generation):
+        return self.model
+
+
+def test_new_generation_supersedes_running_one():
+    manager = GenerationManager()
+    first = manager.start('a')
+    closed = []
+    first.attach(lambda: closed.append('first'))
+    second = manager.start('a')
+    assert first.cancelled and first.reason == 'superseded' and closed == ['first']
+    assert not second.cancelled
+    assert manager.cancel('b') is False
+    assert manager.cancel('a', 'client') and second.reason == 'client'
+    assert manager.cancel('a') is False  # already cancelled
+
+
+def test_closer_attached_after_cancel_runs_at_once():
+    manager = GenerationManager()
+    generation = manager.start('a')
+    generation.cancel()
+    closed = []
+    generation.attach(lambda: closed.append(True))
+    assert closed == [True]
+
+
+def test_tokens_saved_use_average_reply_length():
+    manager = GenerationManager()
+    for tokens in (100, 300):
+        manager.finish(manager.start('a'), tokens)
+    generation = manager.start('a')
+    generation.cancel()
+    assert manager.finish(generation, 50) == 150
+    assert manager.stats() == {'active': 0, 'completed': 2, 'cancelled': 1, 'tokens_saved': 150}
+    manager.finish(manager.start('b'))  # failed or cached: not counted
+    assert manager.stats()['completed'] == 2
+
+
+def test_cancel_releases_blocked_stream(monkeypatch):
+    stream = _BlockingStream()
+    monkeypatch.setattr(Gemini, 'registry', _Registry(_Model(stream)))
+    manager = GenerationManager()
+    generation = manager.start('a')
+    received = []
+
+    def consume():
+        for chunk in Gemini.gemini_chat_stream("hello", generation=generation):
+            received.append(chunk)
+
+    worker = threading.Thread(target=consume)
+    worker.start()
+    stream.chunks.put("Hel")
+    while not received:
+        time.sleep(0.001)
+    manager.cancel('a')  # the consumer is blocked waiting for the next chunk
+    worker.join(timeout=2)
+    assert not worker.is_alive()
+    assert stream.cancelled
+    assert received == ["Hel"]  # no "Error: ..." chunk for a cancelled stream
+
+
+def test_closing_generator_early_closes_upstream(monkeypatch):
+    stream = _BlockingStream()
+    monkeypatch.setattr(Gemini, 'registry', _Registry(_Model(stream)))
+    stream.chunks.put("one")
+    chunks = Gemini.gemini_chat_stream("hello")
+    assert next(chunks) == "one"
+    chunks.close()
+    assert stream.cancelled
@@ -0,0 +1,84 @@
+import sys, os, logging
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_stream import LogStream, LOGS_ROOM
+
+
+class _Socket:
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, data=None, room=None):
+        self.emitted.append((event, data, room))
+
+    def start_background_task(self, target):
+        self.tasks.append(target)  # flushed by hand in these tests
+
+
+def _logger(stream):
+    logger = logging.getLogger(f"test_log_stream.{id(stream)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(stream)
+    return logger
+
+
+def test_ring_keeps_last_lines_with_sequence_numbers():
+    stream = LogStream(capacity=3)
+    logger = _logger(stream)
+    for i in range(5):
+        logger.info(f"line {i}")
+    entries, reset = stream.since(3)
+    assert entries == [(4, 'line 3'), (5, 'line 4')] and not reset
+    # Resuming from a line that already left the ring (or a future one) resets
+    assert stream.since(1) == ([(3, 'line 2'), (4, 'line 3'), (5, 'line 4')], True)
+    assert stream.since(99)[1] and stream.since(None)[1]
+
+
+def test_only_new_lines_reach_subscribers_in_batches():
+    socket = _Socket()
+    stream = LogStream(socket, max_batch=2)
+    logger = _logger(stream)
+    logger.info("before anyone listens")
+    assert stream.flush() == 0 and socket.emitted == []
+
+    backlog = stream.subscribe('a')
+    assert backlog == {'lines': [[1, 'before anyone listens']], 'last_seq': 1, 'reset': True, 'run': stream.run_id}
+    assert len(socket.tasks) == 1
+    for i in range(3):
+        logger.info(f"new {i}")
+    assert stream.flush() == 3
+    assert [data['lines'] for _, data, _ in socket.emitted] == [[[2, 'new 0'], [3, 'new 1']], [[4, 'new 2']]]
+    assert all(event == 'logs_append' and room == LOGS_ROOM for event, _, room in socket.emitted)
+    assert stream.flush() == 0  # nothing new
+
+    stream.unsubscribe('a')
+    logger.info("nobody listening")
+    assert stream.flush() == 0 and len(socket.emitted) == 2
+
+
+def test_resubscribe_resumes_after_last_seen():
+    stream = LogStream(_Socket())
+    logger = _logger(stream)
+    for i in range(4):
+        logger.info(f"line {i}")
+    payload = stream.subscribe('a', after=2, run=stream.run_id)
+    assert payload == {'lines': [[3, 'line 2'], [4, 'line 3']], 'last_seq': 4, 'reset': False, 'run': stream.run_id}
+    assert stream.subscribe('a', after=4, run=stream.run_id)['lines'] == []
+
+
+def test_resubscribe_after_a_restart_resets_the_view():
+    old = LogStream(_Socket())
+    logger = _logger(old)
+    for i in range(3):
+        logger.info(f"old {i}")
+    seen = old.subscribe('a')
+    # The restarted server has logged more lines than the client saw, so only the run id tells them apart
+    new = LogStream(_Socket())
+    logger = _logger(new)
+    for i in range(5):
+        logger.info(f"new {i}")
+    assert new.run_id != old.run_id
+    payload = new.subscribe('a', after=seen['last_seq'], run=seen['run'])
+    assert payload['reset'] and len(payload['lines']) == 5
@@ -0,0 +1,40 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.Gemini import ModelRegistry
+
+
+class _FakeGenAI:
+    def __init__(self):
+        self.configured = []
+        self.built = []
+
+    def configure(self, api_key=None):
+        self.configured.append(api_key)
+
+    def GenerativeModel(self, model_name, generation_config=None, safety_settings=None):
+        model = object()
+        self.built.append((model_name, generation_config['temperature']))
+        return model
+
+
+def test_models_are_reused_per_name_and_parameters():
+    backend = _FakeGenAI()
+    registry = ModelRegistry(backend=backend, key_loader=lambda: 'key')
+    first = registry.get('gemini-2.0-flash-lite')
+    assert registry.get('gemini-2.0-flash-lite') is first
+    assert registry.get('gemini-2.0-flash-lite', temperature=1.0) is first  # same as the default
+    assert registry.get('gemini-2.0-flash-lite', temperature=0.2) is not first
+    assert registry.get('gemini-1.5-pro') is not first
+    assert backend.configured == ['key']
+    assert registry.stats() == {'models': 3, 'hits': 2, 'misses': 3}
+
+
+def test_new_api_key_reconfigures_and_rebuilds():
+    backend = _FakeGenAI()
+    keys = iter(['old', 'old', 'new'])
+    registry = ModelRegistry(backend=backend, key_loader=lambda: next(keys))
+    first = registry.get('gemini-2.0-flash-lite')
+    assert registry.get('gemini-2.0-flash-lite') is first
+    assert registry.get('gemini-2.0-flash-lite') is not first
+    assert backend.configured == ['old', 'new']
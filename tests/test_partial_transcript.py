@@ -0,0 +1,38 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.partial_transcript import IncrementalTranscript, align
+
+TRUTH = "please remind me to call my mother tomorrow morning about the dinner plans".split()
+TIMES = [0.3 + 0.35 * i for i in range(len(TRUTH))]
+
+
+def _windows(width=3.0, hop=0.5, mangle_first=False):
+    end = hop
+    while end <= TIMES[-1] + 0.6:
+        start = max(0.0, end - width)
+        words = [w for w, t in zip(TRUTH, TIMES) if start <= t - 0.1 and t + 0.1 <= end]
+        if mangle_first and start > 0 and words:
+            words[0] = words[0][:2] + 'x'  # word cut in half at the window edge
+        yield ' '.join(words), start, end
+        end += hop
+
+
+def test_overlapping_windows_stitch_without_duplicates():
+    transcript = IncrementalTranscript()
+    for text, start, end in _windows():
+        result = transcript.update(text, start, end)
+    assert result == ' '.join(TRUTH)
+
+
+def test_cut_first_word_is_replaced_by_earlier_hypothesis():
+    transcript = IncrementalTranscript()
+    for text, start, end in _windows(mangle_first=True):
+        transcript.update(text, start, end)
+    assert transcript.text == ' '.join(TRUTH)
+
+
+def test_align_requires_convincing_overlap():
+    assert align("turn on the".split(), "the lights".split()) == (2, 0, 1)
+    assert align("the lights are on".split(), "the kitchen".split()) is None
+    assert align("open the door".split(), "pen the door now".split()) == (1, 1, 2)
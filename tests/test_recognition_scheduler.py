@@ -0,0 +1,93 @@
+import sys, os, threading, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.recognition_scheduler import RecognitionScheduler
+
+
+def _blocking_scheduler(overflow, events):
+    gate = threading.Event()
+    handled = []
+
+    def handler(sid, pcm):
+        gate.wait(2)
+        handled.append((sid, bytes(pcm)))
+
+    scheduler = RecognitionScheduler(
+        handler, workers=1, max_pending=1, overflow=overflow,
+        on_backpressure=lambda sid, depth, policy: events.append(policy),
+    )
+    return scheduler, gate, handled
+
+
+def _drain(scheduler):
+    deadline = time.time() + 2
+    while time.time() < deadline:
+        stats = scheduler.stats()
+        if not stats['queued'] and not stats['active']:
+            break
+        time.sleep(0.01)
+    scheduler.shutdown()
+
+
+def test_merge_policy_appends_to_queued_window():
+    events = []
+    scheduler, gate, handled = _blocking_scheduler('merge', events)
+    scheduler.submit('a', b'1')
+    time.sleep(0.05)  # worker picks up '1' and blocks
+    scheduler.submit('a', b'2')
+    scheduler.submit('a', b'3')
+    gate.set()
+    _drain(scheduler)
+    assert handled == [('a', b'1'), ('a', b'23')]
+    assert events == ['merge']
+
+
+def test_drop_oldest_policy_keeps_latest_window():
+    events = []
+    scheduler, gate, handled = _blocking_scheduler('drop_oldest', events)
+    scheduler.submit('a', b'1')
+    time.sleep(0.05)
+    scheduler.submit('a', b'2')
+    scheduler.submit('a', b'3')
+    gate.set()
+    _drain(scheduler)
+    assert handled == [('a', b'1'), ('a', b'3')]
+    assert scheduler.stats()['dropped'] == 1
+
+
+def test_session_windows_never_run_concurrently():
+    running = set()
+    overlaps = []
+    lock = threading.Lock()
+
+    def handler(sid, pcm):
+        with lock:
+            if sid in running:
+                overlaps.append(sid)
+            running.add(sid)
+        time.sleep(0.01)
+        with lock:
+            running.discard(sid)
+
+    scheduler = RecognitionScheduler(handler, workers=4, max_pending=10)
+    for i in range(20):
+        scheduler.submit(f"s{i % 3}", b'x')
+    _drain(scheduler)
+    assert overlaps == []
+    assert scheduler.stats()['processed'] == 20
+
+
+def test_optional_jobs_skip_when_busy_and_yield_to_windows():
+    events = []
+    scheduler, gate, handled = _blocking_scheduler('drop_newest', events)
+    interim = []
+    scheduler.submit('a', b'1')
+    time.sleep(0.05)  # worker blocks on '1'
+    assert scheduler.submit('a', b'p1', handler=lambda sid, pcm: interim.append(bytes(pcm)), optional=True)
+    assert not scheduler.submit('a', b'p2', optional=True)  # '1' still has p1 waiting
+    scheduler.submit('a', b'2')  # queue full: evicts p1 instead of dropping '2'
+    gate.set()
+    _drain(scheduler)
+    assert handled == [('a', b'1'), ('a', b'2')]
+    assert interim == [] and events == []
+    assert scheduler.stats()['skipped_optional'] == 2
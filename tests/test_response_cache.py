@@ -0,0 +1,64 @@
+import sys, os, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.response_cache import ResponseCache, make_key, is_standalone
+
+GENERATION = {'temperature': 1.0, 'top_p': 0.95}
+
+
+def test_key_ignores_case_spacing_and_trailing_punctuation():
+    key = make_key("What can you do?", 'gemini-2.0-flash-lite', GENERATION)
+    assert make_key("  what   can you DO ", 'gemini-2.0-flash-lite', GENERATION) == key
+    assert make_key("What can you do?", 'gemini-2.5-flash', GENERATION) != key
+    assert make_key("What can you do?", 'gemini-2.0-flash-lite', dict(GENERATION, temperature=0.2)) != key
+
+
+def test_hits_replay_chunks_and_count():
+    cache = ResponseCache()
+    assert cache.get('k') is None
+    cache.put('k', ['Hello', ' there.'])
+    assert cache.get('k') == ['Hello', ' there.']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (1, 1, 1, 12)
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put('a', ['aaaa'])
+    cache.put('b', ['bbbb'])
+    cache.get('a')  # 'b' is now least recently used
+    cache.put('c', ['cc'])
+    assert cache.get('b') is None and cache.get('a') and cache.get('c')
+
+    cache.put('d', ['dddddd'])  # 4 + 2 + 6 bytes > 10
+    assert cache.stats()['bytes'] <= 10
+    assert cache.get('d') == ['dddddd']
+    cache.put('huge', ['x' * 11])  # larger than the whole cache: not stored
+    assert cache.get('huge') is None
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=60)
+    cache.put('k', ['old'], created=time.time() - 61)
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'cache' / 'responses.json')
+    cache = ResponseCache(path=path)
+    cache.put('k', ['Hi', '!'])
+    cache.put('stale', ['x'], created=time.time() - 7200)
+    assert cache.save()
+    assert not cache.save()  # nothing changed since
+
+    restored = ResponseCache(path=path, ttl=3600)
+    assert restored.get('k') == ['Hi', '!']
+    assert restored.get('stale') is None
+
+
+def test_greetings_and_identity_questions_are_standalone():
+    for prompt in ("Hello!", "Hey Jarvis, who made you?", "what's your name", "What can you do, Jarvis?"):
+        assert is_standalone(prompt)
+    for prompt in ("why?", "what can you do with it", "who made the first computer", "tell me more"):
+        assert not is_standalone(prompt)
@@ -0,0 +1,118 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from core import semantic_cache
+from core.semantic_cache import HashingVectorizer, SemanticIndex, popcount
+from core.response_cache import ResponseCache
+
+
+def test_vectorizer_is_stable_and_normalized():
+    vectorizer = HashingVectorizer()
+    indices, weights = vectorizer.transform("what can you do")
+    again, _ = HashingVectorizer().transform("what can you do")
+    assert np.array_equal(indices, again)
+    assert indices.min() > 0 and np.all(np.diff(indices) > 0)
+    assert abs(float(np.linalg.norm(weights)) - 1.0) < 1e-5
+
+
+def test_finds_reworded_prompt_but_not_unrelated_ones():
+    index = SemanticIndex(capacity=100, threshold=0.85)
+    for text in ("what is the weather like in london", "what can you do", "open notepad"):
+        index.add(text)
+    match = index.lookup("whats the weather like in london")
+    assert match[0] == "what is the weather like in london" and match[1] >= 0.85
+    assert index.lookup("so what can you do")[0] == "what can you do"
+    assert index.lookup("tell me a joke") is None
+    assert index.stats()['hits'] == 2
+
+
+def test_evicts_least_recently_used_prompt():
+    index = SemanticIndex(capacity=2)
+    index.add("turn on the lights")
+    index.add("play some music")
+    index.lookup("turn on the lights")
+    index.add("set a timer for ten minutes")
+    assert len(index) == 2 and index.stats()['evictions'] == 1
+    assert index.lookup("play some music") is None
+    assert index.lookup("turn on the lights") is not None
+
+
+def test_long_prompts_are_not_indexed():
+    index = SemanticIndex(max_features=20)
+    assert not index.add("please write me a detailed essay about the history of the roman empire")
+    assert index.add("hello")
+
+
+def test_response_cache_falls_back_to_near_duplicate():
+    cache = ResponseCache(semantic=SemanticIndex(capacity=100))
+    cache.store("What can you do?", 'gemini-2.0-flash-lite', {}, ['I can ', 'help.'])
+    assert cache.lookup("so what can you do", 'gemini-2.0-flash-lite', {}) == (['I can ', 'help.'], "what can you do")
+    assert cache.lookup("so what can you do", 'gemini-2.5-flash', {}) == (None, None)
+    assert cache.stats()['semantic_hits'] == 1
+
+
+def test_paraphrases_and_wake_words_find_the_same_answer():
+    cache = ResponseCache(semantic=SemanticIndex(capacity=100))
+    cache.store("who made you", 'gemini-2.0-flash-lite', {}, ['Tony Stark.'])
+    for prompt in ("who created you", "Hey Jarvis, who made you?", "ok jarvis who built you"):
+        assert cache.lookup(prompt, 'gemini-2.0-flash-lite', {}) == (['Tony Stark.'], "who made you")
+    assert cache.lookup("who are you", 'gemini-2.0-flash-lite', {}) == (None, None)
+
+
+def test_lookups_only_match_the_same_model_and_generation():
+    index = SemanticIndex(capacity=10)
+    index.add("what can you do", scope='flash')
+    index.add("what can you do now", scope='pro')
+    assert index.lookup("so what can you do", scope='flash')[0] == "what can you do"
+    assert index.lookup("what can you do now", scope='flash')[0] == "what can you do"  # not the pro row
+    assert index.lookup("what can you do", scope='lite') is None
+    assert index.remove("what can you do", scope='flash') and not index.remove("what can you do now")
+    assert index.lookup("what can you do", scope='pro')[0] == "what can you do now"
+
+    cache = ResponseCache(semantic=SemanticIndex(capacity=10))
+    cache.store("what can you do", 'gemini-2.0-flash-lite', {'temperature': 1.0}, ['Plenty.'])
+    assert cache.lookup("so what can you do", 'gemini-2.0-flash-lite', {'temperature': 0.2}) == (None, None)
+
+
+def test_restored_cache_rebuilds_the_scoped_index(tmp_path):
+    path = str(tmp_path / 'responses.json')
+    cache = ResponseCache(path=path, semantic=SemanticIndex(capacity=10))
+    cache.store("who made you", 'gemini-2.0-flash-lite', {}, ['Tony Stark.'])
+    assert cache.save()
+    restored = ResponseCache(path=path, semantic=SemanticIndex(capacity=10))
+    assert restored.lookup("who created you", 'gemini-2.0-flash-lite', {})[0] == ['Tony Stark.']
+    assert restored.lookup("who created you", 'gemini-2.5-flash', {}) == (None, None)
+
+
+def test_popcount_fallback_matches_numpy():
+    values = np.random.default_rng(13).integers(0, 2 ** 63, 1000, dtype=np.uint64) * np.uint64(3)
+    expected = [bin(int(v)).count('1') for v in values]
+    assert popcount(values).tolist() == expected
+    out = np.zeros(len(values), np.uint8)
+    assert popcount(values, out=out) is out and out.tolist() == expected
+
+
+def test_removed_prompts_stop_matching():
+    index = SemanticIndex(capacity=10)
+    for text in ("what can you do", "play some music", "open notepad"):
+        index.add(text)
+    assert index.remove("what can you do") and not index.remove("what can you do")
+    assert index.lookup("so what can you do") is None
+    assert index.lookup("play some music")[0] == "play some music"
+    assert index.lookup("open notepad")[0] == "open notepad" and len(index) == 2
+
+
+def test_evicted_responses_leave_the_semantic_index():
+    cache = ResponseCache(max_entries=1, semantic=SemanticIndex(capacity=100))
+    cache.store("What can you do?", 'gemini-2.0-flash-lite', {}, ['I can help.'])
+    cache.store("What can you not do?", 'gemini-2.0-flash-lite', {}, ['Nothing.'])
+    assert len(cache.semantic) == 1
+    # The evicted near-duplicate no longer shadows the answer still cached
+    assert cache.lookup("so what can you not do", 'gemini-2.0-flash-lite', {})[1] == "what can you not do"
+
+
+def test_lookup_without_numpy_bitwise_count(monkeypatch):
+    monkeypatch.setattr(semantic_cache, '_bitwise_count', popcount)  # NumPy 1.x
+    test_finds_reworded_prompt_but_not_unrelated_ones()
@@ -0,0 +1,202 @@
+import sys, os, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.speech_service import SpeechService
+
+
+class _Socket:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data=None, room=None):
+        self.events.append((event, data, room))
+
+
+class _Decoder:
+    """Decoder stand-in that keeps every chunk it is fed"""
+
+    def __init__(self):
+        self.held = 0
+        self.closed = False
+
+    def feed(self, data):
+        self.held += len(data)
+
+    def buffered(self):
+        return self.held
+
+    def pending(self):
+        return False
+
+    def close(self):
+        self.closed = True
+
+
+def _service():
+    service = SpeechService(_Socket())
+    service.timers.shutdown()  # no processing timers in these tests
+    return service
+
+
+def test_idle_sessions_are_reaped():
+    service = _service()
+    service.start_listening('idle')
+    service.start_listening('active')
+    decoder = service.sessions['idle'].decoder = _Decoder()
+    later = time.time() + service.SESSION_TTL - 1
+    service.sessions['active'].last_activity = later
+    assert service.reap_idle_sessions(now=later + 2) == 1
+    assert list(service.sessions) == ['active'] and decoder.closed
+    assert service.session_stats()['reaped'] == 1
+    service.scheduler.shutdown()
+
+
+def test_audio_over_the_ceiling_is_refused():
+    service = _service()
+    service.SESSION_MAX_AUDIO_BYTES = 1000
+    service.start_listening('a')
+    decoder = service.sessions['a'].decoder = _Decoder()
+    for _ in range(5):
+        service.process_audio_chunk('a', b'\x01' * 400)
+    session = service.sessions['a']
+    assert decoder.held == 1200  # third chunk crossed the ceiling, the rest were refused
+    assert session.received_bytes == 2000 and session.dropped_bytes == 800
+    warnings = [data for event, data, _ in service.socketio.events if event == 'speech_backpressure']
+    assert warnings == [{'queued': 0, 'policy': 'memory_limit'}]
+    service.scheduler.shutdown()
+
+
+def test_session_stats_report_bytes_held():
+    service = _service()
+    for sid, size in (('small', 10), ('big', 5000)):
+        service.start_listening(sid)
+        service.sessions[sid].decoder = _Decoder()
+        service.process_audio_chunk(sid, b'\x00' * size)
+    stats = service.stats()['sessions']
+    assert stats['live'] == 2 and stats['listening'] == 2
+    assert stats['held_bytes'] == 5010
+    assert [row['sid'] for row in stats['per_session']] == ['big', 'small']
+    service.destroy_session('big')
+    assert service.session_stats()['live'] == 1
+    service.scheduler.shutdown()
+
+
+def test_stop_listening_closes_the_decoder():
+    service = _service()
+    service.start_listening('sid')
+    decoder = service.sessions['sid'].decoder = _Decoder()
+    service.stop_listening('sid')
+    assert decoder.closed and service.sessions['sid'].decoder is None
+
+
+def test_legacy_whole_file_chunks_all_decode(monkeypatch):
+    import base64
+    import pytest
+    from core.audio_decoder import BYTES_PER_SECOND
+    from core.speech_service import find_ffmpeg
+    if not find_ffmpeg():
+        pytest.skip('ffmpeg not available')
+    monkeypatch.setenv('JARVIS_VAD', '0')
+    service = _service()
+    windows = []
+    service.scheduler.submit = lambda sid, pcm: windows.append(len(pcm) / BYTES_PER_SECOND)
+    fixtures = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+    clips = []
+    for name in ('utterance_3s.webm', 'silence_3s.webm', 'utterance_3s.webm'):
+        with open(os.path.join(fixtures, name), 'rb') as fh:
+            clips.append(base64.b64encode(fh.read()).decode('ascii'))
+    service.start_listening('legacy')
+    for clip in clips:  # one complete MediaRecorder file per cycle, as base64 text
+        service.process_audio_chunk('legacy', clip)
+        service._process_accumulated_audio('legacy', wait=True)
+    assert windows == pytest.approx([3.0, 3.0, 3.0], abs=0.1)
+    service.destroy_session('legacy')
+    service.scheduler.shutdown()
+
+
+def test_asleep_sessions_fall_back_to_the_recognizer_unless_the_spotter_misses():
+    from core.asr_backends import StubBackend
+    from core.wake_word import WAKE, MISS, UNSURE
+    service = _service()
+    service.asr = StubBackend(['what time is it'])
+    service.start_listening('s', mode='task')
+    verdicts = []
+    service.wake_spotter.ready_for = lambda sid: bool(verdicts)
+    service.wake_spotter.check = lambda pcm, sid: verdicts.pop(0)
+    pcm = b'\x00' * 3200
+    service._recognize_window('s', pcm)  # no templates for this session yet
+    assert service.asr.calls == 1
+    verdicts.append(MISS)
+    service._recognize_window('s', pcm)
+    verdicts.append(UNSURE)
+    service._recognize_window('s', pcm)
+    assert service.asr.calls == 2 and not service.sessions['s'].is_awake
+    verdicts.append(WAKE)
+    service._recognize_window('s', pcm)
+    assert service.asr.calls == 3 and service.sessions['s'].is_awake
+    stats = service.stats()['wake_word']
+    assert stats['asleep_windows_skipped'] == 1 and stats['asr_checks'] == 2
+    service.destroy_session('s')
+    service.scheduler.shutdown()
+
+
+def test_without_templates_the_recognizer_finds_and_enrolls_the_wake_phrase(monkeypatch):
+    import numpy as np
+    from core.asr_backends import StubBackend
+    monkeypatch.delenv('JARVIS_WAKE_TEMPLATES', raising=False)
+    phrase = np.random.default_rng(5).normal(0, 3000, 16000).astype('<i2').tobytes()  # 1 s of "hey jarvis"
+    service = _service()
+    assert not service.wake_spotter.ready  # no templates ship with JARVIS
+    service.asr = StubBackend(['hey jarvis'])
+    service.start_listening('s', mode='task')
+    service._recognize_window('s', phrase)
+    assert service.asr.calls == 1 and service.sessions['s'].is_awake
+    assert service.wake_spotter.ready_for('s')  # later wake-ups are spotted locally
+    assert service.stats()['wake_word']['asr_checks'] == 1
+    service.destroy_session('s')
+    service.scheduler.shutdown()
+
+    monkeypatch.setenv('JARVIS_WAKE_FALLBACK', 'off')
+    service = _service()
+    service.asr = StubBackend(['hey jarvis'])
+    service.start_listening('s', mode='task')
+    service._recognize_window('s', phrase)
+    assert service.asr.calls == 0 and not service.sessions['s'].is_awake
+    assert service.stats()['wake_word']['asleep_windows_skipped'] == 1
+    service.destroy_session('s')
+    service.scheduler.shutdown()
+
+
+class _SlowDecoder(_Decoder):
+    """Decoder that waits on ffmpeg when its stream ends"""
+
+    def pending(self):
+        return True
+
+    def flush(self):
+        time.sleep(0.5)
+
+    def read(self, idle=0.05, timeout=1.0):
+        return memoryview(b'')
+
+
+def test_a_slow_decoder_does_not_stall_the_timer_wheel(monkeypatch):
+    import threading
+    monkeypatch.setenv('JARVIS_VAD', '0')
+    service = SpeechService(_Socket())
+    service.start_listening('a')
+    service.sessions['a'].decoder = _SlowDecoder()
+    stopping = threading.Thread(target=service.stop_listening, args=('a',))
+    stopping.start()
+    time.sleep(0.05)  # stop_listening is now waiting on the decoder
+    # The process timer of the same session fires meanwhile, then another session's timer
+    service.timers.schedule(0, service._on_process_timer, 'a')
+    due = time.monotonic() + 0.05
+    fired = []
+    service.timers.schedule(0.05, lambda: fired.append(time.monotonic() - due))
+    time.sleep(0.2)
+    assert fired and fired[0] < 0.1
+    stopping.join()
+    assert service.sessions['a'].decoder is None
+    service.timers.shutdown()
+    service.scheduler.shutdown()
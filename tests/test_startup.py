@@ -0,0 +1,38 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+
+import pytest
+
+from core.startup_profile import STARTUP_TARGET_MS, LAZY_MODULES, parse_importtime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def imports():
+    """Import Jarvis.py (without serving) in a fresh interpreter under -X importtime"""
+    env = dict(os.environ, JARVIS_ASYNC_MODE='threading', JARVIS_TOKEN_LEDGER_FILE='')  # no usage file from tests
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import Jarvis'], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return parse_importtime(result.stderr)
+
+
+def test_parse_importtime():
+    output = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |     _json\n"
+              "import time:      2500 |       2620 |   json\n"
+              "some log line\n")
+    assert parse_importtime(output) == [('_json', 0.12, 0.12, 2), ('json', 2.5, 2.62, 1)]
+
+
+def test_heavy_dependencies_are_not_imported_at_startup(imports):
+    loaded = {name for name, _, _, _ in imports}
+    assert not loaded & set(LAZY_MODULES)
+
+
+def test_startup_import_time_within_target(imports):
+    jarvis = next(i for i in imports if i[0] == 'Jarvis')
+    assert jarvis[2] < STARTUP_TARGET_MS, f"importing Jarvis.py took {jarvis[2]:.0f} ms"
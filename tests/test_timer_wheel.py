@@ -0,0 +1,64 @@
+import sys, os, threading, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.timer_wheel import TimerWheel
+from core.speech_service import SpeechService
+
+
+class _Socket:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data=None, room=None):
+        self.events.append((event, room))
+
+
+def test_timers_fire_in_order_and_cancel():
+    wheel = TimerWheel(tick=0.005, slots=8)  # small wheel: delays span several revolutions
+    fired = []
+    for delay in (0.12, 0.03, 0.08):
+        wheel.schedule(delay, fired.append, delay)
+    wheel.schedule(0.05, fired.append, 'cancelled').cancel()
+    time.sleep(0.25)
+    wheel.shutdown()
+    assert fired == [0.03, 0.08, 0.12]
+    assert wheel.stats()['cancelled'] == 1 and wheel.pending() == 0
+
+
+def test_never_fires_early():
+    wheel = TimerWheel(tick=0.01)
+    lateness = []
+    for i in range(50):
+        due = time.monotonic() + 0.01 * i
+        wheel.schedule(0.01 * i, lambda due=due: lateness.append(time.monotonic() - due))
+    time.sleep(0.7)
+    wheel.shutdown()
+    assert len(lateness) == 50 and min(lateness) >= 0
+
+
+def test_thousand_sessions_share_one_timer_thread():
+    service = SpeechService(_Socket())
+    threads_before = threading.active_count()
+    sessions = [f"sid{i}" for i in range(1000)]
+    for sid in sessions:
+        service.create_session(sid)
+        service.set_mode(sid, 'task')
+    # Task Mode resets both timeouts on every phrase; do that a few times per session
+    for _ in range(5):
+        for sid in sessions:
+            service._reset_silence_timer(sid)
+            service._reset_no_input_timer(sid)
+    assert threading.active_count() == threads_before
+    stats = service.timers.stats()
+    assert stats['pending'] == 2000 and stats['cancelled'] == 8000
+
+    # Every silence timeout fires once, ~3s after its last reset
+    time.sleep(3.3)
+    timeouts = [room for event, room in service.socketio.events if event == 'silence_timeout']
+    assert sorted(timeouts) == sorted(sessions)
+    assert service.timers.stats()['max_late_ms'] < 100
+    for sid in sessions:
+        service.destroy_session(sid)
+    assert service.timers.pending() == 0
+    service.timers.shutdown()
+    service.scheduler.shutdown()
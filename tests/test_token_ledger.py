@@ -0,0 +1,87 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from core.token_ledger import TokenLedger, BudgetExceeded, estimate_tokens
+
+
+def test_estimator_counts_words_numbers_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hi there") == 2
+    assert estimate_tokens("internationalization") == 5
+    assert estimate_tokens("It's 2024!") == 6  # it ' s 202 4 !
+
+
+def test_aggregates_per_session_model_and_bucket():
+    ledger = TokenLedger(bucket_seconds=3600)
+    ledger.record('a', 'flash', 10, 5, now=7200)
+    ledger.record('a', 'pro', 20, 10, now=7300)
+    ledger.record('b', 'flash', 1, 1, reported=False, now=10800)
+    assert ledger.total == 47
+    assert ledger.session_total('a') == 45 and ledger.session_total('b') == 2
+    assert ledger.models['flash']['total'] == 17
+    assert {k: v['requests'] for k, v in ledger.buckets.items()} == {7200: 2, 10800: 1}
+    stats = ledger.stats()
+    assert (stats['reported'], stats['estimated']) == (2, 1)
+
+
+def test_old_buckets_are_dropped():
+    ledger = TokenLedger(bucket_seconds=60, max_buckets=2)
+    for minute in range(5):
+        ledger.record(None, 'flash', 1, 1, now=minute * 60)
+    assert list(ledger.buckets) == [180, 240]
+    assert ledger.total == 10
+
+
+def test_session_budget_is_checked_before_sending():
+    ledger = TokenLedger(session_budget=100)
+    reserved = ledger.reserve('a', 60)
+    assert ledger.remaining('a') == 40
+    ledger.record('a', 'flash', 60, 30, reserved=reserved)
+    assert ledger.remaining('a') == 10
+    with pytest.raises(BudgetExceeded):
+        ledger.reserve('a', 20)
+    ledger.reserve('b', 20)  # other sessions are unaffected
+    assert ledger.stats()['rejected'] == 1
+    assert TokenLedger().remaining('a') is None
+
+
+def test_concurrent_requests_cannot_overspend():
+    ledger = TokenLedger(session_budget=100)
+    first = ledger.reserve('a', 60)  # in flight, not recorded yet
+    with pytest.raises(BudgetExceeded):
+        ledger.reserve('a', 60)
+    ledger.release('a', first)  # the first request failed
+    assert ledger.remaining('a') == 100
+    assert ledger.reserve('a', 60) == 60
+
+
+def test_budget_survives_reconnects_until_its_window_passes():
+    ledger = TokenLedger(session_budget=100, budget_window=3600)
+    reserved = ledger.reserve('127.0.0.1', 50, now=1000)
+    ledger.record('sid1', 'flash', 50, 40, now=1000, budget_key='127.0.0.1', reserved=reserved)
+    ledger.drop_session('sid1')  # disconnect
+    assert ledger.session_total('sid1') == 0
+    with pytest.raises(BudgetExceeded):
+        ledger.reserve('127.0.0.1', 50, now=2000)  # same client, new session
+    assert ledger.prune_budgets(now=2000) == 0
+    assert ledger.remaining('127.0.0.1', now=4600) == 100
+    assert ledger.prune_budgets(now=9000) == 1 and ledger.budgets == {}
+
+
+def test_totals_are_flushed_in_batches_and_survive_restart(tmp_path):
+    path = str(tmp_path / 'usage.json')
+    ledger = TokenLedger(path=path)
+    assert ledger.flush() == 0
+    ledger.record('a', 'flash', 10, 5)
+    ledger.record('a', 'flash', 10, 5)
+    assert ledger.flush() == 2
+    assert ledger.flush() == 0
+
+    restored = TokenLedger(path=path)
+    assert restored.total == 30
+    assert restored.models['flash']['requests'] == 2
+    assert restored.session_total('a') == 0  # sessions are not persisted
+    restored.record('b', 'flash', 1, 1)
+    assert restored.total == 32
@@ -0,0 +1,42 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from core.vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+def _pcm(seconds, amplitude, rng):
+    n = np.arange(int(seconds * RATE)) / RATE
+    tone = amplitude * np.sin(2 * np.pi * 180 * n) if amplitude else 0
+    return np.clip(rng.normal(0, 40, len(n)) + tone, -32768, 32767).astype('<i2').tobytes()
+
+
+def test_silence_produces_no_utterances():
+    vad = VoiceActivityDetector()
+    rng = np.random.default_rng(0)
+    assert vad.process(_pcm(3.0, 0, rng)) == []
+    assert vad.speech_frames == 0
+    assert vad.flush() is None
+
+
+def test_speech_ends_on_trailing_silence():
+    vad = VoiceActivityDetector(trailing_silence_ms=300)
+    rng = np.random.default_rng(1)
+    stream = _pcm(0.5, 0, rng) + _pcm(1.0, 6000, rng) + _pcm(1.0, 0, rng)
+    utterances = []
+    for offset in range(0, len(stream), 8000):  # 250 ms windows
+        utterances += vad.process(stream[offset:offset + 8000])
+    assert len(utterances) == 1
+    seconds = len(utterances[0]) / (RATE * 2)
+    assert 1.0 <= seconds <= 1.6  # speech plus preroll and trailing silence
+
+
+def test_flush_returns_open_utterance():
+    vad = VoiceActivityDetector()
+    rng = np.random.default_rng(2)
+    assert vad.process(_pcm(1.0, 6000, rng)) == []
+    assert vad.in_speech
+    assert vad.flush() is not None
@@ -0,0 +1,79 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from core.wake_word import WakeWordSpotter, mfcc, WAKE, MISS, UNSURE
+
+RATE = 16000
+
+
+def _chirp(start_hz, end_hz, seconds, rng, pad=0.3):
+    n = np.arange(int(seconds * RATE)) / RATE
+    phase = 2 * np.pi * (start_hz * n + (end_hz - start_hz) * n ** 2 / (2 * seconds))
+    tone = 8000 * (np.sin(phase) + 0.5 * np.sin(2 * phase))
+    silence = np.zeros(int(pad * RATE))
+    audio = np.concatenate([silence, tone, silence]) + rng.normal(0, 50, len(tone) + 2 * len(silence))
+    return audio.astype('<i2').tobytes()
+
+
+def test_mfcc_shape():
+    features = mfcc(np.zeros(RATE, dtype='<i2').tobytes())
+    assert features.shape == (98, 12)
+
+
+def test_spotter_not_ready_without_templates():
+    assert not WakeWordSpotter().ready
+
+
+def test_detects_enrolled_phrase_and_rejects_others():
+    rng = np.random.default_rng(0)
+    spotter = WakeWordSpotter()
+    for seconds in (0.55, 0.6, 0.65):
+        spotter.enroll(_chirp(300, 1500, seconds, rng))
+    assert spotter.ready
+
+    assert spotter.detect(_chirp(300, 1500, 0.62, rng))
+    # Wake phrase followed by more speech still fires
+    assert spotter.detect(_chirp(300, 1500, 0.6, rng) + _chirp(900, 400, 1.0, rng))
+    assert not spotter.detect(_chirp(1500, 300, 0.6, rng))
+    assert spotter.stats()['checks'] == 3
+
+
+def test_templates_are_kept_per_session():
+    rng = np.random.default_rng(1)
+    spotter = WakeWordSpotter()
+    for seconds in (0.55, 0.6, 0.65):
+        spotter.enroll(_chirp(300, 1500, seconds, rng), 'alice')
+    assert spotter.ready_for('alice') and not spotter.ready_for('bob') and not spotter.ready
+    assert spotter.detect(_chirp(300, 1500, 0.62, rng), 'alice')
+    # Alice's voice doesn't wake Bob's session: Bob has no templates to match
+    assert spotter.check(_chirp(300, 1500, 0.62, rng), 'bob') == MISS
+    assert spotter.stats()['sessions_enrolled'] == 1
+    spotter.forget('alice')
+    assert not spotter.ready_for('alice') and spotter.stats()['sessions_enrolled'] == 0
+
+
+def test_session_templates_add_to_the_shared_ones():
+    rng = np.random.default_rng(2)
+    spotter = WakeWordSpotter()
+    spotter.enroll(_chirp(300, 1500, 0.6, rng))
+    spotter.enroll(_chirp(900, 2500, 0.6, rng), 'alice')
+    assert spotter.ready_for('bob')  # shared templates cover every session
+    assert spotter.detect(_chirp(900, 2500, 0.6, rng), 'alice')
+    assert spotter.detect(_chirp(300, 1500, 0.6, rng), 'alice')
+    assert spotter.stats()['templates'] == 1
+
+
+def test_near_misses_are_unsure():
+    rng = np.random.default_rng(0)
+    template, pcm = _chirp(300, 1500, 0.6, rng), _chirp(300, 1500, 0.6, rng)
+    probe = WakeWordSpotter()
+    probe.enroll(template)
+    distance = probe.score(pcm)
+    verdicts = []
+    for threshold in (distance * 1.1, distance / 1.5, distance / 3):
+        spotter = WakeWordSpotter(threshold=threshold, unsure_margin=2.0)
+        spotter.enroll(template)
+        verdicts.append(spotter.check(pcm))
+    assert verdicts == [WAKE, UNSURE, MISS]
@@ -0,0 +1,123 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import threading
+
+import pytest
+
+from core.wiki_lookup import WikiLookup, WikiTimeout, OfflineWikiIndex, build_index, first_sentences
+
+DUMP = """<feed>
+<doc><title>Wikipedia: Alan Turing</title><url>u</url>
+<abstract>Alan Mathison Turing was an English mathematician. He was highly influential. He was born in London.</abstract></doc>
+<doc><title>Wikipedia: Turing machine</title><url>u</url>
+<abstract>A Turing machine is a mathematical model of computation.</abstract></doc>
+<doc><title>Wikipedia: Empty</title><url>u</url><abstract></abstract></doc>
+</feed>"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    dump = tmp_path / 'abstract.xml.gz'
+    with gzip.open(dump, 'wt', encoding='utf-8') as fh:
+        fh.write(DUMP)
+    path = str(tmp_path / 'wiki.db')
+    assert build_index(str(dump), path) == 2
+    return OfflineWikiIndex(path)
+
+
+def test_offline_index_prefers_exact_titles_then_full_text(index):
+    assert index.search('Turing Machine')[0] == 'Turing machine'
+    assert index.search('alan turing')[0] == 'Alan Turing'
+    assert index.search('english mathematician')[0] == 'Alan Turing'
+    assert index.search('quantum chromodynamics') is None
+
+
+def test_offline_mode_never_goes_online(index):
+    def fetch(query, sentences):
+        raise AssertionError('online fetch in offline mode')
+    wiki = WikiLookup(mode='offline', index=index, fetch=fetch)
+    assert wiki.lookup(' Alan Turing ') == 'Alan Mathison Turing was an English mathematician. He was highly influential.'
+    with pytest.raises(LookupError):
+        wiki.lookup('quantum chromodynamics')
+    with pytest.raises(LookupError):
+        wiki.lookup('quantum chromodynamics')  # the miss is cached too
+    assert wiki.stats()['offline'] == 1 and wiki.stats()['hits'] == 1
+
+
+def test_online_results_are_cached():
+    calls = []
+    def fetch(query, sentences):
+        calls.append(query)
+        return f"{query} summary"
+    wiki = WikiLookup(fetch=fetch)
+    assert wiki.lookup('Python') == 'Python summary'
+    assert wiki.lookup('python?') == 'Python summary'
+    assert calls == ['Python']
+
+
+class _PageError(Exception):
+    def __init__(self, pageid=None, *args):
+        self.pageid = pageid  # like wikipedia.PageError: no super().__init__
+
+
+class _Unrebuildable(Exception):
+    def __init__(self, title, options):
+        super().__init__(f"{title} may refer to {', '.join(options)}")
+
+
+def test_cached_failures_raise_a_fresh_exception_each_hit():
+    calls = []
+    def fetch(query, sentences):
+        calls.append(query)
+        raise _PageError(query)
+    wiki = WikiLookup(fetch=fetch)
+    raised = []
+    for _ in range(3):
+        with pytest.raises(_PageError) as info:
+            wiki.lookup('Nowhere')
+        raised.append(info.value)
+    assert calls == ['Nowhere'] and wiki.stats()['hits'] == 2
+    assert raised[1] is not raised[2] and raised[2].pageid == 'Nowhere'
+    # The traceback doesn't grow with every hit
+    assert len(list(_frames(raised[2].__traceback__))) == len(list(_frames(raised[1].__traceback__)))
+
+    def ambiguous(query, sentences):
+        raise _Unrebuildable(query, ['planet', 'element'])
+    wiki = WikiLookup(fetch=ambiguous)
+    with pytest.raises(_Unrebuildable):
+        wiki.lookup('Mercury')
+    with pytest.raises(LookupError, match='may refer to planet, element'):
+        wiki.lookup('Mercury')
+
+
+def _frames(tb):
+    while tb is not None:
+        yield tb
+        tb = tb.tb_next
+
+
+def test_slow_lookups_time_out_and_fill_the_cache_later():
+    release = threading.Event()
+    def fetch(query, sentences):
+        release.wait(5)
+        return 'late answer'
+    wiki = WikiLookup(fetch=fetch, timeout=0.05)
+    with pytest.raises(WikiTimeout):
+        wiki.lookup('slow topic')
+    release.set()
+    wiki.prefetch('slow topic').result(5)
+    assert wiki.lookup('slow topic') == 'late answer'
+    assert wiki.stats()['timeouts'] == 1 and wiki.stats()['online'] == 1
+
+
+def test_cache_is_bounded():
+    wiki = WikiLookup(fetch=lambda q, s: q, max_entries=2)
+    for topic in ('a', 'b', 'c'):
+        wiki.lookup(topic)
+    assert wiki.stats()['entries'] == 2
+
+
+def test_first_sentences():
+    assert first_sentences('One. Two! Three?', 2) == 'One. Two!'